@@ -0,0 +1,40 @@
+"""Add notification_counter table
+
+Revision ID: 30ce0e1da8bd
+Revises: f1db4624ba7c
+Create Date: 2026-10-19 11:20:47.502116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30ce0e1da8bd'
+down_revision: Union[str, None] = 'f1db4624ba7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_counter',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill counters from existing notifications
+    op.execute("""
+        INSERT INTO notification_counter (user_id, total_count, unread_count)
+        SELECT recipient_id, count(*), count(*) FILTER (WHERE NOT is_read)
+        FROM notification
+        GROUP BY recipient_id;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('notification_counter')
@@ -0,0 +1,38 @@
+"""Add login_history table
+
+Revision ID: 5a9d0c7e4f21
+Revises: e81f3a6c2b94
+Create Date: 2026-10-19 16:21:37.904215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d0c7e4f21'
+down_revision: Union[str, None] = 'e81f3a6c2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('login_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('logged_in_at', sa.DateTime(), nullable=False),
+    sa.Column('ip_address', sqlmodel.sql.sqltypes.AutoString(length=45), nullable=True),
+    sa.Column('user_agent', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('method', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_login_history_user_id_logged_in_at', 'login_history', ['user_id', 'logged_in_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_login_history_user_id_logged_in_at', table_name='login_history')
+    op.drop_table('login_history')
@@ -0,0 +1,26 @@
+"""Index company.last_updated for the catalog version
+
+Revision ID: 6d16c7a53dbc
+Revises: 30ce0e1da8bd
+Create Date: 2026-10-19 12:04:36.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d16c7a53dbc'
+down_revision: Union[str, None] = '30ce0e1da8bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_company_last_updated', 'company', ['last_updated'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_company_last_updated', table_name='company')
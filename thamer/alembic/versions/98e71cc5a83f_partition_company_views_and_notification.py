@@ -0,0 +1,126 @@
+"""Partition company_views and notification by month
+
+Revision ID: 98e71cc5a83f
+Revises: 95c02bd2690c
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '98e71cc5a83f'
+down_revision: Union[str, None] = '95c02bd2690c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PREMAKE_MONTHS = 3
+
+# table -> (partition key, foreign keys, indexes)
+TABLES = {
+    "company_views": (
+        "viewed_at",
+        [("company_id", "company"), ("viewer_id", "user")],
+        [
+            ("idx_company_views_company_id", "company_id"),
+            ("idx_company_views_viewer_id", "viewer_id"),
+            ("idx_company_views_viewed_at", "viewed_at"),
+            ("ix_company_views_company_id", "company_id"),
+            ("ix_company_views_viewer_id", "viewer_id"),
+        ],
+    ),
+    "notification": (
+        "created_at",
+        [("recipient_id", "user")],
+        [],
+    ),
+}
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_monthly_partitions(table: str, first_month: date, last_month: date) -> None:
+    month = first_month
+    while month <= last_month:
+        op.execute(
+            f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    # Catches rows outside the pre-created range until the maintenance job catches up
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    now = datetime.utcnow()
+    current_month = date(now.year, now.month, 1)
+
+    for table, (key, foreign_keys, indexes) in TABLES.items():
+        # Step 1: Move the existing table out of the way
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_legacy"')
+        op.execute(f'ALTER TABLE "{table}_legacy" RENAME CONSTRAINT "{table}_pkey" TO "{table}_legacy_pkey"')
+        for index_name, _ in indexes:
+            op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+        # Step 2: Create the partitioned parent (the partition key must be part of the primary key)
+        op.execute(f'CREATE TABLE "{table}" (LIKE "{table}_legacy" INCLUDING DEFAULTS) PARTITION BY RANGE ({key})')
+        op.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, {key})')
+        for column, referenced in foreign_keys:
+            op.execute(f'ALTER TABLE "{table}" ADD FOREIGN KEY ({column}) REFERENCES "{referenced}" (id)')
+
+        # Step 3: Monthly partitions covering existing rows plus a few months ahead
+        oldest = conn.execute(sa.text(f'SELECT min({key}) FROM "{table}_legacy"')).scalar()
+        first_month = date(oldest.year, oldest.month, 1) if oldest else current_month
+        _create_monthly_partitions(table, min(first_month, current_month), _add_months(current_month, PREMAKE_MONTHS))
+
+        # Step 4: Copy rows and hand the id sequence over to the new table
+        op.execute(f'INSERT INTO "{table}" SELECT * FROM "{table}_legacy"')
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        op.execute(f'DROP TABLE "{table}_legacy"')
+
+        # Step 5: Indexes on the parent cascade to every partition
+        for index_name, column in indexes:
+            op.create_index(index_name, table, [column], unique=False)
+
+    # Rolled-up monthly totals for company_views partitions dropped by retention
+    op.create_table('company_view_monthly',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('total_views', sa.Integer(), nullable=False),
+    sa.Column('anonymous_views', sa.Integer(), nullable=False),
+    sa.Column('authenticated_views', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'month')
+    )
+
+
+def downgrade() -> None:
+    # Note: monthly rollups cannot be expanded back into individual views
+    op.drop_table('company_view_monthly')
+
+    for table, (key, foreign_keys, indexes) in TABLES.items():
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_partitioned"')
+        op.execute(f'ALTER TABLE "{table}_partitioned" RENAME CONSTRAINT "{table}_pkey" TO "{table}_partitioned_pkey"')
+        for index_name, _ in indexes:
+            op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+        op.execute(f'CREATE TABLE "{table}" (LIKE "{table}_partitioned" INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id)')
+        for column, referenced in foreign_keys:
+            op.execute(f'ALTER TABLE "{table}" ADD FOREIGN KEY ({column}) REFERENCES "{referenced}" (id)')
+
+        op.execute(f'INSERT INTO "{table}" SELECT * FROM "{table}_partitioned"')
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        op.execute(f'DROP TABLE "{table}_partitioned" CASCADE')
+
+        for index_name, column in indexes:
+            op.create_index(index_name, table, [column], unique=False)
@@ -0,0 +1,47 @@
+"""Add subscription lifecycle state (entitlement, renewal reminders)
+
+Revision ID: 9b3e6f1d2a47
+Revises: 5a9d0c7e4f21
+Create Date: 2026-10-19 17:42:10.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e6f1d2a47'
+down_revision: Union[str, None] = '5a9d0c7e4f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('subscription_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('subscription', sa.Column('renewal_reminder_sent_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'idx_subscription_active_end_date', 'subscription', ['end_date'],
+        unique=False, postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+
+    # Expire what has already ended, then derive the entitlement from the remaining active subscriptions
+    op.execute("""
+        UPDATE subscription SET status = 'EXPIRED', updated_at = (now() AT TIME ZONE 'utc')
+        WHERE status = 'ACTIVE' AND end_date <= (now() AT TIME ZONE 'utc')
+    """)
+    op.execute("""
+        UPDATE "user" SET subscription_expires_at = active.end_date
+        FROM (
+            SELECT user_id, max(end_date) AS end_date FROM subscription
+            WHERE status = 'ACTIVE' GROUP BY user_id
+        ) AS active
+        WHERE active.user_id = "user".id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_subscription_active_end_date', table_name='subscription', postgresql_where=sa.text("status = 'ACTIVE'"))
+    op.drop_column('subscription', 'renewal_reminder_sent_at')
+    op.drop_column('user', 'subscription_expires_at')
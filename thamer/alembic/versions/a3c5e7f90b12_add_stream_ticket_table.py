@@ -0,0 +1,33 @@
+"""Add stream_ticket table (single-use stream tickets)
+
+Revision ID: a3c5e7f90b12
+Revises: d47a2c9e8b15
+Create Date: 2026-10-19 19:02:11.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f90b12'
+down_revision: Union[str, None] = 'd47a2c9e8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stream_ticket',
+    sa.Column('jti', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('idx_stream_ticket_expires_at', 'stream_ticket', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_stream_ticket_expires_at', table_name='stream_ticket')
+    op.drop_table('stream_ticket')
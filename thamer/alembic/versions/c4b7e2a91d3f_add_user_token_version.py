@@ -0,0 +1,26 @@
+"""Add user.token_version for access token revocation
+
+Revision ID: c4b7e2a91d3f
+Revises: 6d16c7a53dbc
+Create Date: 2026-10-19 15:12:08.413527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b7e2a91d3f'
+down_revision: Union[str, None] = '6d16c7a53dbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'token_version')
@@ -0,0 +1,46 @@
+"""Add task table (Postgres task queue)
+
+Revision ID: d47a2c9e8b15
+Revises: 9b3e6f1d2a47
+Create Date: 2026-10-19 18:05:52.140337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47a2c9e8b15'
+down_revision: Union[str, None] = '9b3e6f1d2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('locked_by', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_task_queue_ready', 'task', ['queue', 'run_at'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('idx_task_running_locked_at', 'task', ['locked_at'], unique=False, postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_task_running_locked_at', table_name='task', postgresql_where=sa.text("status = 'running'"))
+    op.drop_index('idx_task_queue_ready', table_name='task', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('task')
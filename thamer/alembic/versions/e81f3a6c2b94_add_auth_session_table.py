@@ -0,0 +1,44 @@
+"""Add auth_session table for refresh tokens
+
+Revision ID: e81f3a6c2b94
+Revises: c4b7e2a91d3f
+Create Date: 2026-10-19 15:48:51.207730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81f3a6c2b94'
+down_revision: Union[str, None] = 'c4b7e2a91d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('auth_session',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('family_id', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('token_version', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_auth_session_token_hash', 'auth_session', ['token_hash'], unique=True)
+    op.create_index('idx_auth_session_family_id', 'auth_session', ['family_id'], unique=False)
+    op.create_index('idx_auth_session_user_id_expires_at', 'auth_session', ['user_id', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_auth_session_user_id_expires_at', table_name='auth_session')
+    op.drop_index('idx_auth_session_family_id', table_name='auth_session')
+    op.drop_index('idx_auth_session_token_hash', table_name='auth_session')
+    op.drop_table('auth_session')
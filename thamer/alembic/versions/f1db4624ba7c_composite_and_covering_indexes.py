@@ -0,0 +1,62 @@
+"""Composite and covering indexes matching query shapes
+
+Revision ID: f1db4624ba7c
+Revises: 98e71cc5a83f
+Create Date: 2026-10-19 10:02:11.734518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1db4624ba7c'
+down_revision: Union[str, None] = '98e71cc5a83f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # company_views: composite indexes for (company_id, viewed_at) and (company_id, viewer_id, viewed_at)
+    op.create_index('idx_company_views_company_viewed_at', 'company_views', ['company_id', 'viewed_at'], unique=False)
+    op.create_index('idx_company_views_company_viewer_viewed_at', 'company_views', ['company_id', 'viewer_id', 'viewed_at'], unique=False)
+
+    # Redundant: covered by the composite prefixes, duplicated, or replaced by partition pruning
+    op.drop_index('idx_company_views_company_id', table_name='company_views')
+    op.drop_index('ix_company_views_company_id', table_name='company_views')
+    op.drop_index('ix_company_views_viewer_id', table_name='company_views')
+    op.drop_index('idx_company_views_viewed_at', table_name='company_views')
+
+    # notification: inbox listing and unread count
+    op.create_index('idx_notification_recipient_created_at', 'notification', ['recipient_id', 'created_at'], unique=False, postgresql_include=['is_read'])
+    op.create_index('idx_notification_recipient_unread', 'notification', ['recipient_id'], unique=False, postgresql_where=sa.text('NOT is_read'))
+
+    # subscription: active-subscription lookups
+    op.create_index('idx_subscription_user_status_end_date', 'subscription', ['user_id', 'status', 'end_date'], unique=False)
+
+    # company: listings, CR uniqueness check, owner lookups
+    op.create_index('idx_company_status_created_at', 'company', ['status', 'created_at'], unique=False)
+    op.create_index('idx_company_cr', 'company', ['cr'], unique=False)
+    op.create_index('idx_company_user_id', 'company', ['user_id'], unique=False)
+
+    # score: joinedload / per-company score loads
+    op.create_index('idx_score_company_id', 'score', ['company_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_score_company_id', table_name='score')
+    op.drop_index('idx_company_user_id', table_name='company')
+    op.drop_index('idx_company_cr', table_name='company')
+    op.drop_index('idx_company_status_created_at', table_name='company')
+    op.drop_index('idx_subscription_user_status_end_date', table_name='subscription')
+    op.drop_index('idx_notification_recipient_unread', table_name='notification')
+    op.drop_index('idx_notification_recipient_created_at', table_name='notification')
+
+    op.create_index('idx_company_views_viewed_at', 'company_views', ['viewed_at'], unique=False)
+    op.create_index('ix_company_views_viewer_id', 'company_views', ['viewer_id'], unique=False)
+    op.create_index('ix_company_views_company_id', 'company_views', ['company_id'], unique=False)
+    op.create_index('idx_company_views_company_id', 'company_views', ['company_id'], unique=False)
+    op.drop_index('idx_company_views_company_viewer_viewed_at', table_name='company_views')
+    op.drop_index('idx_company_views_company_viewed_at', table_name='company_views')
@@ -1,35 +1,89 @@
 # File: app/api/dependencies/auth.py
-from fastapi import Depends, HTTPException
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from app.models.user import User
-from app.core.db import get_session
-from app.core.security import SECRET_KEY, ALGORITHM
+from app.models.user import User, UserRole
+from app.core.db import async_session, get_session
+from app.core.security import TokenClaims, decode_access_token, decode_stream_ticket
+from app.services.auth_session_service import redeem_stream_ticket
+from app.services.read_models import UserPrincipal, get_user_principal
+from app.services.token_state import is_token_current
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session),
-):
+
+async def verify_token(request: Request, token: str) -> TokenClaims:
     """
-    Dependency to extract and verify the current user from the Bearer token.
+    Decode and revocation-check a token once per request.
+
+    The claims are memoized on request.state, so every dependency of the request
+    (and the same token seen twice) shares one decode and one token-state lookup.
     """
+    cached = getattr(request.state, "token_claims", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
     try:
-        # Decode the token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        claims = decode_access_token(token)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    if not await is_token_current(claims):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    request.state.token_claims = (token, claims)
+    return claims
+
+
+async def get_token_claims(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+) -> TokenClaims:
+    """
+    Verified claims of the Bearer token, without loading the user.
+    """
+    return await verify_token(request, token)
 
-    # Fetch the user from the database
-    stmt = select(User).where(User.email == email)
-    result = await session.execute(stmt)
+
+async def _load_user(session: AsyncSession, claims: TokenClaims) -> Optional[User]:
+    if claims.user_id is not None:
+        return await session.get(User, claims.user_id)
+    # Tokens issued before id claims: look up by email and enforce the account state here
+    result = await session.execute(select(User).where(User.email == claims.email))
     user = result.scalars().first()
+    if user is not None and (not user.is_active or user.token_version):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return user
+
+
+async def _principal(claims: TokenClaims) -> UserPrincipal:
+    """
+    The caller's identity from signed claims; only pre-claims tokens need a user query.
+    """
+    if claims.user_id is not None:
+        return UserPrincipal(id=claims.user_id, email=claims.email, role=UserRole(claims.role), is_active=claims.is_active)
+
+    async with async_session() as session:
+        principal = await get_user_principal(session, claims.email)
+    if principal is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not principal.is_active or principal.role != claims.role:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return principal
+
+
+async def get_current_user(
+    claims: TokenClaims = Depends(get_token_claims),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Dependency to extract and verify the current user from the Bearer token.
+    """
+    # Fetch the user from the database (primary-key lookup)
+    user = await _load_user(session, claims)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -37,6 +91,7 @@ async def get_current_user(
 
 
 async def get_current_user_optional(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session),
 ):
@@ -48,29 +103,82 @@ async def get_current_user_optional(
         return None
 
     try:
-        # Decode the token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None  # Treat as unauthenticated instead of raising an error
+        claims = await verify_token(request, token)
+        return await _load_user(session, claims)  # May return None if the user is not found
+    except HTTPException:
+        return None  # Invalid or revoked token → treat as anonymous user
+
+
+async def get_stream_token_claims(
+    request: Request,
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    ticket: Optional[str] = Query(None, description="Single-use ticket from POST /auth/stream-ticket"),
+) -> TokenClaims:
+    """
+    Claims for long-lived streaming requests and downloads.
+
+    Browsers' EventSource (and plain download links) cannot set headers, so
+    instead of the Bearer token they may pass ?ticket= from /auth/stream-ticket.
+    Access tokens are never accepted in the URL, where access logs and proxies
+    would record them; a ticket expires within STREAM_TICKET_EXPIRE_SECONDS and
+    works once.
+    """
+    if token:
+        return await verify_token(request, token)
+    if not ticket:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        claims, jti, expires_at = decode_stream_ticket(ticket)
     except JWTError:
-        return None  # Invalid token → treat as anonymous user
+        raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+    async with async_session() as session:
+        if not await redeem_stream_ticket(session, jti, expires_at):
+            raise HTTPException(status_code=401, detail="Stream ticket already used")
+    if not await is_token_current(claims):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return claims
 
-    # Fetch the user from the database
-    stmt = select(User).where(User.email == email)
-    result = await session.execute(stmt)
-    user = result.scalars().first()
-    
-    return user  # May return None if the user is not found
+
+async def get_stream_user(
+    claims: TokenClaims = Depends(get_stream_token_claims),
+):
+    """
+    Authenticate long-lived streaming requests.
+
+    The user is loaded with a short-lived session so no pooled connection is held
+    for the lifetime of the stream.
+    """
+    async with async_session() as session:
+        user = await _load_user(session, claims)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return user
 
 
 async def get_admin_user(
-    current_user: User = Depends(get_current_user),
-):
+    claims: TokenClaims = Depends(get_token_claims),
+) -> UserPrincipal:
     """
     Ensure the current user is an admin.
+
+    Authorizes from the token's role claim (revocation is checked against the cached
+    token version), so admin endpoints run no user query.
     """
-    if current_user.role.lower() != "admin":  # Adjust this based on your user role system
+    if claims.role != UserRole.ADMIN.value:
         raise HTTPException(status_code=403, detail="Admin access required.")
-    
-    return current_user
\ No newline at end of file
+
+    return await _principal(claims)
+
+
+async def get_stream_admin_user(
+    claims: TokenClaims = Depends(get_stream_token_claims),
+) -> UserPrincipal:
+    """
+    Admin check for streaming endpoints (see get_stream_token_claims).
+    """
+    if claims.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=403, detail="Admin access required.")
+
+    return await _principal(claims)
@@ -1,23 +1,36 @@
 # File: app/api/v1/endpoints/admin.py
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Path, Query, Request, Response, UploadFile
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.api.v1.endpoints.user import generate_presigned_url, generate_presigned_url_with_lstrip
+from app.api.v1.endpoints.user import generate_presigned_url, generate_presigned_url_with_lstrip, validate_s3_object_exists
 from app.models import Score
 from app.models.Company import Company
+from app.models.login_history import LoginHistory
+from app.models.payment import Payment
+from app.models.Notification import NotificationType
 from app.models.subscription_plan import SubscriptionPlan
 from app.models.user import User, UserRole
 from app.core.db import get_session
-from app.api.dependencies.auth import get_admin_user, get_current_user
-from app.schemas.company import CompanyResponse, FileResponse, PendingCompanyResponse, GetAllCompaniesResponse, ScoreResponse
+from app.core.services import services
+from app.api.dependencies.auth import get_admin_user, get_stream_admin_user
+from app.schemas.company import CompanyImportReport, CompanyModerationRequest, CompanyModerationResponse, CompanyResponse, FileResponse, PendingCompanyResponse, GetAllCompaniesResponse
 from app.models.Subscription import Subscription, SubscriptionStatus
+from app.services.company_import_service import import_companies
+from app.services.company_profile import get_company_profile, get_company_profile_version
+from app.services.company_moderation_service import moderate_companies, resolve_company_status, status_change_message
+from app.services.export_service import export_companies_with_scores, export_response, map_rows
+from app.services.http_cache import etag_matches, invalidate_company, make_etag, not_modified, set_cache_headers
+from app.services.notification_service import notification_writer
+from app.services.plan_catalog import plan_catalog
+from app.services.read_models import UserPrincipal
+from app.services.subscription_lifecycle import refresh_entitlements
+from app.services.token_state import revoke_user_tokens, token_states
 from typing import List, Optional
 from sqlalchemy.sql import func
-from sqlalchemy.orm import joinedload
 import logging
-from app.schemas.user import UserPaginationResponse
+from app.schemas.user import LoginHistoryEntry, LoginHistoryPaginationResponse, UserPaginationResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -29,7 +42,7 @@ async def validate_company(
     status: str = Query(..., description="The new status of the company (approved, rejected)"),
     rejection_reason: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Validate or reject a company's details.
@@ -51,11 +64,6 @@ async def validate_company(
     try:
         logger.info(f"Admin {current_user.email} attempting to validate company ID {company_id}.")
 
-        # Ensure the current user is an admin
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can validate companies.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can validate companies.")
-
         # Fetch the company by ID
         stmt = select(Company).where(Company.id == company_id)
         result = await session.execute(stmt)
@@ -78,14 +86,7 @@ async def validate_company(
             raise HTTPException(status_code=400, detail="Rejection reason is required for rejection.")
 
         # Backend determines actual status update
-        new_status = old_status  # Default to no change
-        if status == "approved":
-            new_status = "approved"  # ✅ Fix: Now correctly sets `"approved"` when a rejected company is approved
-        elif status == "rejected":
-            if old_status == "approved":
-                new_status = "re-evaluation"  # Approved → Rejected = Re-evaluation
-            elif old_status in ["pending", "re-evaluation", "revision-requested"]:
-                new_status = "rejected"
+        new_status = resolve_company_status(old_status, status)
 
         # Avoid redundant updates
         if company.status == new_status:
@@ -107,6 +108,15 @@ async def validate_company(
         company.last_updated = datetime.utcnow()
 
         await session.commit()
+        invalidate_company(company_id)
+
+        # Let the owner know right away (pushed to their notification stream)
+        notification_writer.enqueue(
+            company.user_id,
+            "Company status updated",
+            status_change_message(company.name, new_status, company.rejection_reason),
+            NotificationType.SYSTEM,
+        )
 
         response = {
             "message": f"Company '{company.name}' status changed from '{old_status}' to '{new_status}'.",
@@ -125,11 +135,34 @@ async def validate_company(
         logger.error(f"Error validating company {company_id}: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
-    
+
+@router.post("/admin/companies/moderate", response_model=CompanyModerationResponse)
+async def moderate_companies_endpoint(
+    payload: CompanyModerationRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(get_admin_user),
+):
+    """
+    Approve or reject many companies in one request.
+
+    Each item follows the same rules as `PUT /admin/validate-company/{company_id}`.
+    Items that are invalid, unknown or already in the target status are reported
+    individually and do not block the rest of the batch.
+    """
+    try:
+        return await moderate_companies(session, payload.items, current_user.email)
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error moderating companies: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+
 @router.get("/admin/pending-companies", response_model=List[PendingCompanyResponse])
 async def get_pending_companies(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
     page: int = Query(1, ge=1, description="Page number for pagination"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
 ):
@@ -142,9 +175,6 @@ async def get_pending_companies(
     try:
         logger.info(f"Admin {current_user.email} fetching pending companies (Page: {page}, Page Size: {page_size}).")
 
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view pending companies.")
-
         offset = (page - 1) * page_size
         stmt = select(Company).where(Company.status == "pending").offset(offset).limit(page_size)
         result = await session.execute(stmt)
@@ -208,7 +238,7 @@ async def get_pending_companies(
 @router.get("/admin/users",  response_model=UserPaginationResponse)
 async def get_users(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
 ):
@@ -221,11 +251,6 @@ async def get_users(
     try:
         logger.info(f"Admin {current_user.email} fetching users (Page: {page}, Page Size: {page_size}).")
 
-        # Check if the current user has admin access
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can view users.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view users.")
-
         # Calculate offset for pagination
         offset = (page - 1) * page_size
         
@@ -280,7 +305,7 @@ async def get_subscriptions(
     page: int = Query(1, ge=1, description="Page number for pagination"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Retrieve all subscriptions with pagination.
@@ -288,11 +313,6 @@ async def get_subscriptions(
     try:
         logger.info(f"Admin {current_user.email} fetching subscriptions (Page: {page}, Page Size: {page_size}).")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can view subscriptions.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view subscriptions.")
-
         offset = (page - 1) * page_size
         stmt = select(Subscription).offset(offset).limit(page_size)
         result = await session.execute(stmt)
@@ -340,7 +360,7 @@ class UpdateSubscriptionRequest(BaseModel):
 async def update_subscription(
     request: UpdateSubscriptionRequest,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     **Add or update a subscription for a user.**
@@ -353,11 +373,6 @@ async def update_subscription(
     try:
         logger.info(f"Admin {current_user.email} attempting to update subscription for user ID {request.user_id}.")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can update subscriptions.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can update subscriptions.")
-
         stmt = select(Subscription).where(Subscription.user_id == request.user_id)
         result = await session.execute(stmt)
         subscription = result.scalars().first()
@@ -369,6 +384,7 @@ async def update_subscription(
             subscription.end_date = request.end_date
             subscription.amount_paid = request.amount_paid
             subscription.status = SubscriptionStatus.ACTIVE
+            subscription.renewal_reminder_sent_at = None
         else:
             logger.info(f"Creating new subscription for user ID {request.user_id}.")
             # Create new subscription
@@ -381,6 +397,8 @@ async def update_subscription(
             )
             session.add(subscription)
 
+        await session.flush()
+        await refresh_entitlements(session, [request.user_id])
         await session.commit()
 
         logger.info(f"Subscription for user ID {request.user_id} updated successfully.")
@@ -405,7 +423,7 @@ async def update_subscription(
 router.get("/admin/dashboard", response_model=dict)
 async def get_dashboard_stats(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Retrieve statistics for the admin dashboard.
@@ -415,10 +433,6 @@ async def get_dashboard_stats(
     try:
         logger.info(f"Admin {current_user.email} fetching dashboard statistics.")
 
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can view dashboard statistics.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view dashboard statistics.")
-
         total_users = await session.scalar(select(func.count(User.id)))
         total_companies = await session.scalar(select(func.count(Company.id)))
         total_subscriptions = await session.scalar(select(func.count(Subscription.id)))
@@ -439,7 +453,7 @@ async def get_dashboard_stats(
 async def deactivate_user(
     user_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Deactivate a user by setting is_active to False.
@@ -447,10 +461,6 @@ async def deactivate_user(
     try:
         logger.info(f"Admin {current_user.email} attempting to deactivate user ID {user_id}.")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can deactivate users.")
-
         # Fetch the user
         stmt = select(User).where(User.id == user_id)
         result = await session.execute(stmt)
@@ -462,9 +472,11 @@ async def deactivate_user(
         if not user.is_active:
             raise HTTPException(status_code=400, detail="User is already deactivated.")
 
-        # Deactivate user
+        # Deactivate user and revoke their access tokens
         user.is_active = False
+        revoke_user_tokens(user)
         await session.commit()
+        token_states.invalidate(user.id)
 
         logger.info(f"User ID {user_id} deactivated successfully by {current_user.email}.")
         return {"message": "User deactivated successfully.", "user": {"id": user.id, "email": user.email}}
@@ -478,7 +490,7 @@ async def deactivate_user(
 async def restore_user(
     user_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Reactivate a user by setting is_active to True.
@@ -486,10 +498,6 @@ async def restore_user(
     try:
         logger.info(f"Admin {current_user.email} attempting to restore user ID {user_id}.")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can restore users.")
-
         # Fetch the user
         stmt = select(User).where(User.id == user_id)
         result = await session.execute(stmt)
@@ -504,6 +512,7 @@ async def restore_user(
         # Reactivate user
         user.is_active = True
         await session.commit()
+        token_states.invalidate(user.id)
 
         logger.info(f"User ID {user_id} restored successfully by {current_user.email}.")
         return {"message": "User restored successfully.", "user": {"id": user.id, "email": user.email}}
@@ -512,10 +521,181 @@ async def restore_user(
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
+@router.get("/admin/users/{user_id}/logins", response_model=LoginHistoryPaginationResponse)
+async def get_user_login_history(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(get_admin_user),
+):
+    """
+    Paginated login history of a user, newest first (admin only).
+
+    Logins are recorded in batches, so the latest one can take a few seconds to appear.
+    """
+    try:
+        total = await session.scalar(select(func.count()).where(LoginHistory.user_id == user_id))
+        result = await session.execute(
+            select(LoginHistory.logged_in_at, LoginHistory.ip_address, LoginHistory.user_agent, LoginHistory.method)
+            .where(LoginHistory.user_id == user_id)
+            .order_by(LoginHistory.logged_in_at.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return LoginHistoryPaginationResponse(
+            total=total or 0,
+            page=page,
+            page_size=page_size,
+            total_pages=((total or 0) + page_size - 1) // page_size,
+            data=[LoginHistoryEntry(**row._mapping) for row in result.all()],
+        )
+    except Exception as e:
+        logger.error(f"Error fetching login history for user ID {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+
+@router.get("/admin/tasks/stats", response_model=dict)
+async def get_task_stats(current_user: UserPrincipal = Depends(get_admin_user)):
+    """
+    Task counts per queue and status (queued / running / dead) (admin only).
+    """
+    return {"queues": await services.task_queue.stats()}
+
+
+@router.get("/admin/tasks/dead", response_model=dict)
+async def get_dead_tasks(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: UserPrincipal = Depends(get_admin_user),
+):
+    """
+    Dead-lettered tasks, newest first, with their last error; OTPs and other secrets in the payload are masked (admin only).
+    """
+    return {"data": await services.task_queue.dead(limit)}
+
+
+@router.post("/admin/tasks/{task_id}/retry", response_model=dict)
+async def retry_dead_task(task_id: int, current_user: UserPrincipal = Depends(get_admin_user)):
+    """
+    Requeue a dead-lettered task with a fresh attempt budget (admin only).
+    """
+    if not await services.task_queue.retry_dead(task_id):
+        raise HTTPException(status_code=404, detail="Dead task not found.")
+    logger.info(f"Admin {current_user.email} requeued task {task_id}.")
+    return {"message": "Task requeued.", "task_id": task_id}
+
+
+@router.post("/admin/companies/import", response_model=CompanyImportReport)
+async def import_companies_endpoint(
+    file: UploadFile = File(..., description="CSV (.csv) or JSON Lines (.jsonl / .ndjson) file of companies and scores"),
+    status: str = Query("pending", description="Status for imported companies (pending or approved)"),
+    dry_run: bool = Query(False, description="Validate only; nothing is written"),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(get_admin_user),
+):
+    """
+    Bulk-import companies with their scores (admin only).
+
+    **Formats:**
+    - CSV in the same layout as `/admin/companies/export?format=csv`: one line per score,
+      lines sharing a `cr` form one company; `awards` / `sectors` are `;`-separated.
+    - JSONL: one `register-company` payload per line.
+
+    Either format may set `owner_email`; otherwise the importing admin owns the company.
+    Returns a per-row error report; valid rows are imported even when others fail.
+    """
+    extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+    import_format = "jsonl" if extension == "ndjson" else extension
+
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The import file must be UTF-8 encoded.")
+
+    logger.info(f"Admin {current_user.email} importing companies from {file.filename} (dry_run={dry_run}).")
+    return await import_companies(session, content, import_format, current_user, validate_s3_object_exists, status, dry_run)
+
+
+@router.get("/admin/companies/export")
+async def export_companies(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    current_user: User = Depends(get_stream_admin_user),
+):
+    """
+    Stream every company with its scores as CSV or NDJSON (admin only).
+    """
+    logger.info(f"Admin {current_user.email} exporting companies as {export_format}.")
+    return export_companies_with_scores(export_format, [], filename="admin-companies")
+
+
+@router.get("/admin/users/export")
+async def export_users(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    current_user: User = Depends(get_stream_admin_user),
+):
+    """
+    Stream all non-admin users as CSV or NDJSON (admin only).
+    """
+    logger.info(f"Admin {current_user.email} exporting users as {export_format}.")
+    stmt = (
+        select(
+            User.id, User.first_name, User.last_name, User.email, User.phone_number, User.company_name,
+            User.role, User.is_active, User.is_verified, User.created_at, User.last_login,
+        )
+        .where(User.role != UserRole.ADMIN)
+        .order_by(User.created_at.desc())
+    )
+    columns = ["id", "first_name", "last_name", "email", "phone_number", "company_name", "role", "is_active", "is_verified", "created_at", "last_login"]
+    return export_response(export_format, "users", columns, map_rows(stmt, lambda row: row._asdict()))
+
+
+@router.get("/admin/subscriptions/export")
+async def export_subscriptions(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    status: Optional[SubscriptionStatus] = Query(None),
+    current_user: User = Depends(get_stream_admin_user),
+):
+    """
+    Stream subscriptions as CSV or NDJSON (admin only).
+    """
+    logger.info(f"Admin {current_user.email} exporting subscriptions as {export_format}.")
+    stmt = select(
+        Subscription.id, Subscription.user_id, Subscription.plan_id, Subscription.start_date,
+        Subscription.end_date, Subscription.amount_paid, Subscription.status, Subscription.created_at,
+    ).order_by(Subscription.id)
+    if status:
+        stmt = stmt.where(Subscription.status == status)
+    columns = ["id", "user_id", "plan_id", "start_date", "end_date", "amount_paid", "status", "created_at"]
+    return export_response(export_format, "subscriptions", columns, map_rows(stmt, lambda row: row._asdict()))
+
+
+@router.get("/admin/payments/export")
+async def export_payments(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    status: Optional[str] = Query(None, description="Payment status, e.g. SUCCESS"),
+    user_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_stream_admin_user),
+):
+    """
+    Stream payments as CSV or NDJSON (admin only).
+    """
+    logger.info(f"Admin {current_user.email} exporting payments as {export_format}.")
+    stmt = select(
+        Payment.id, Payment.order_id, Payment.user_id, Payment.plan_id, Payment.subscription_id, Payment.amount,
+        Payment.currency, Payment.status, Payment.trans_id, Payment.trans_date, Payment.failure_reason, Payment.created_at,
+    ).order_by(Payment.id)
+    if status:
+        stmt = stmt.where(Payment.status == status)
+    if user_id:
+        stmt = stmt.where(Payment.user_id == user_id)
+    columns = ["id", "order_id", "user_id", "plan_id", "subscription_id", "amount", "currency", "status", "trans_id", "trans_date", "failure_reason", "created_at"]
+    return export_response(export_format, "payments", columns, map_rows(stmt, lambda row: row._asdict()))
+
+
 @router.get("/admin/companies", response_model=GetAllCompaniesResponse)
 async def get_pending_companies(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
     page: int = Query(1, ge=1, description="Page number for pagination"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
 ):
@@ -528,9 +708,6 @@ async def get_pending_companies(
     try:
         logger.info(f"Admin {current_user.email} fetching pending companies (Page: {page}, Page Size: {page_size}).")
 
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view pending companies.")
-
         offset = (page - 1) * page_size
         stmt = select(Company).order_by(Company.created_at.desc()).offset(offset).limit(page_size)
         result = await session.execute(stmt)
@@ -611,7 +788,7 @@ async def get_pending_companies(
 async def soft_delete_company(
     company_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Soft delete a company by updating its status to 'deleted'.
@@ -619,10 +796,6 @@ async def soft_delete_company(
     try:
         logger.info(f"Admin {current_user.email} attempting to soft delete company ID {company_id}.")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can delete companies.")
-
         # Fetch the company
         stmt = select(Company).where(Company.id == company_id)
         result = await session.execute(stmt)
@@ -642,6 +815,7 @@ async def soft_delete_company(
         company.last_updated = datetime.utcnow()
         session.add(company)
         await session.commit()
+        invalidate_company(company_id)
 
         logger.info(f"Company ID {company_id} soft deleted successfully by {current_user.email}.")
         return {
@@ -668,7 +842,7 @@ async def soft_delete_company(
 async def suspend_subscription(
     subscription_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     **Suspend a subscription by ending it immediately.**
@@ -676,10 +850,6 @@ async def suspend_subscription(
     try:
         logger.info(f"Admin {current_user.email} attempting to suspend subscription ID {subscription_id}.")
 
-        # Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can suspend subscriptions.")
-
         # Fetch the subscription
         stmt = select(Subscription).where(Subscription.id == subscription_id)
         result = await session.execute(stmt)
@@ -694,6 +864,8 @@ async def suspend_subscription(
         # Suspend the subscription
         subscription.end_date = datetime.utcnow()
         subscription.status = SubscriptionStatus.SUSPENDED
+        await session.flush()
+        await refresh_entitlements(session, [subscription.user_id])
         await session.commit()
 
         logger.info(f"Subscription ID {subscription_id} suspended successfully by {current_user.email}.")
@@ -717,7 +889,7 @@ async def create_subscription_plan(
     price: float,
     duration_days: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     **Create a new subscription plan (Admin only).**
@@ -740,6 +912,7 @@ async def create_subscription_plan(
         )
         session.add(new_plan)
         await session.commit()
+        plan_catalog.invalidate()
 
         return {"message": "Subscription plan created successfully", "plan_id": new_plan.id}
 
@@ -751,8 +924,7 @@ async def create_subscription_plan(
 
 @router.get("/admin/subscription/list", response_model=dict)
 async def list_subscription_plans(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
     page: int = Query(1, ge=1, description="Page number for pagination"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
 ):
@@ -765,21 +937,14 @@ async def list_subscription_plans(
     try:
         logger.info(f"Admin {current_user.email} fetching subscription plans (Page: {page}, Page Size: {page_size}).")
 
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view subscription plans.")
-
         offset = (page - 1) * page_size
-        stmt = select(SubscriptionPlan).where(SubscriptionPlan.is_active == True).offset(offset).limit(page_size)
-        result = await session.execute(stmt)
-        plans = result.scalars().all()
-
-        total_stmt = select(func.count()).select_from(SubscriptionPlan).where(SubscriptionPlan.is_active == True)
-        total_result = await session.execute(total_stmt)
-        total_plans = total_result.scalar()
+        active_plans = await plan_catalog.active_plans()
+        plans = active_plans[offset:offset + page_size]
+        total_plans = len(active_plans)
 
         logger.info(f"Admin {current_user.email} retrieved {len(plans)} subscription plans.")
         return {
-            "plans": plans,
+            "plans": [plan._asdict() for plan in plans],
             "total": total_plans,
             "page": page,
             "page_size": page_size,
@@ -795,7 +960,7 @@ async def list_subscription_plans(
 async def get_subscription_status(
     user_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     **Get the current subscription status of a user.**
@@ -806,9 +971,6 @@ async def get_subscription_status(
     try:
         logger.info(f"Admin {current_user.email} fetching subscription status for user ID {user_id}.")
 
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view user subscriptions.")
-
         result = await session.execute(
             select(Subscription).where(Subscription.user_id == user_id)
         )
@@ -832,8 +994,10 @@ async def get_subscription_status(
 @router.get("/admin/companies/{company_id}", response_model=CompanyResponse)
 async def get_company_by_id_admin(
     company_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_admin_user),
 ):
     """
     Retrieve a company's details for admin review.
@@ -844,68 +1008,29 @@ async def get_company_by_id_admin(
 
     **Security:**
     - Requires admin privileges.
+
+    **Caching:**
+    - Answers a matching `If-None-Match` with 304 without loading the company.
+    - Otherwise served from the per-worker company profile cache.
     """
     try:
         logger.info(f"Admin {current_user.email} fetching company ID {company_id}.")
 
-        # ✅ Ensure admin access
-        if current_user.role != UserRole.ADMIN:
-            logger.warning(f"Access denied for user {current_user.email}. Only admins can view company details.")
-            raise HTTPException(status_code=403, detail="Access denied. Only admins can view company details.")
-
-        # ✅ Fetch company with scores
-        stmt = select(Company).where(Company.id == company_id).options(joinedload(Company.scores))
-        result = await session.execute(stmt)
-        company = result.scalars().first()
-
-        if not company:
+        version = await get_company_profile_version(session, company_id)
+        if not version:
             logger.warning(f"Company ID {company_id} not found.")
             raise HTTPException(status_code=404, detail="Company not found.")
 
-        # ✅ Generate pre-signed URL for logo
-        logo_response = FileResponse(
-            url=generate_presigned_url_with_lstrip(company.logo) if company.logo else None,
-            key=company.logo if company.logo else None,
-        )
+        etag = make_etag("company", company_id, version.last_updated, version.view_count)
+        if etag_matches(request, etag):
+            return not_modified(etag, version.last_updated)
+        set_cache_headers(response, etag, version.last_updated)
 
-        # ✅ Generate pre-signed URLs for scores
-        score_details = [
-            ScoreResponse(
-                id=score.id,
-                year=score.year,
-                score=score.score,
-                score_type=score.score_type,
-                file=FileResponse(
-                    url=generate_presigned_url_with_lstrip(score.file) if score.file else None,
-                    key=score.file if score.file else None,
-                ),
-            )
-            for score in company.scores
-        ]
-
-        # ✅ Create response object
-        response = CompanyResponse(
-            id=company.id,
-            name=company.name,
-            email=company.email,
-            phone_number=company.phone_number,
-            cr=company.cr,
-            website=company.website,
-            description=company.description,
-            tagline=company.tagline,
-            linkedin=company.linkedin,
-            facebook=company.facebook,
-            twitter=company.twitter,
-            instagram=company.instagram,
-            logo=logo_response,
-            awards=company.awards,
-            sectors=company.sectors,
-            created_at=company.created_at,
-            last_updated=company.last_updated,
-            status=company.status,
-            rejection_reason=company.rejection_reason,
-            scores=score_details,
-        )
+        # Same cached profile as the owner / subscriber view
+        response = await get_company_profile(session, company_id, version, generate_presigned_url_with_lstrip)
+        if not response:
+            logger.warning(f"Company ID {company_id} not found.")
+            raise HTTPException(status_code=404, detail="Company not found.")
 
         logger.info(f"Admin {current_user.email} successfully retrieved company ID {company_id}.")
         return response
@@ -1,18 +1,21 @@
 # File: app/api/v1/endpoints/admin_stats.py
 from datetime import datetime, timedelta
-import traceback
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Dict
+from app.services.background_jobs import background_jobs
 from app.core.db import get_session
 from app.api.dependencies.auth import get_admin_user
+from app.services.read_models import UserPrincipal
 from app.models import User, Company, Payment
 from app.models.user import UserRole
 from sqlalchemy.future import select
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # --------------------------
 # SCHEMAS
@@ -46,6 +49,10 @@ class SystemHealth(BaseModel):
     database_status: str
     active_connections: int
 
+class BackgroundJobStats(BaseModel):
+    buffered_writes: Dict[str, int]
+    dropped_writes: Dict[str, int]
+
 class AdminStatsResponse(BaseModel):
     users: UserStats
     companies: CompanyStats
@@ -56,10 +63,19 @@ class AdminStatsResponse(BaseModel):
 # ENDPOINTS
 # --------------------------
 
+@router.get("/admin/stats/background-jobs", response_model=BackgroundJobStats)
+async def get_background_job_stats(
+    current_user: UserPrincipal = Depends(get_admin_user)
+):
+    """
+    Items waiting in / dropped by this worker's batched writers (task queue depth: /admin/tasks/stats)
+    """
+    return BackgroundJobStats(**background_jobs.stats())
+
 @router.get("/admin/stats", response_model=AdminStatsResponse)
 async def get_admin_stats(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_admin_user)
+    current_user: UserPrincipal = Depends(get_admin_user)
 ):
     """
     Get comprehensive admin statistics
@@ -72,7 +88,7 @@ async def get_admin_stats(
             system=await get_system_health(session)
         )
     except Exception as e:
-        print("🚨 ERROR in /admin/stats:", traceback.format_exc())  # ✅ Print full error stack
+        logger.exception("Error in /admin/stats")
         raise HTTPException(status_code=500, detail=str(e))
 
 # --------------------------
@@ -3,7 +3,7 @@ import logging
 from datetime import datetime, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 import hmac
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_user, get_token_claims
 from app.schemas.auth import (
     SignUpRequest,
     LoginRequest,
@@ -13,14 +13,24 @@ from app.schemas.auth import (
     ResetPasswordRequest,
 )
 from app.services.otp_service import can_request_otp, send_otp_to_user
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.auth import *
+from app.core.config import settings
 from app.core.db import get_session
 from app.services.user_service import UserService
 from app.models.user import User, UserRole
 from app.services.email_service import EmailService
-from app.core.security import generate_otp, verify_password, create_access_token, hash_password
+from app.services.login_activity_service import login_activity_writer
+from app.core.security import TokenClaims, create_stream_ticket, generate_otp, verify_password, create_access_token, hash_password, user_token_claims
+from app.services.auth_session_service import (
+    create_auth_session,
+    delete_expired_sessions,
+    revoke_refresh_token,
+    revoke_user_sessions,
+    rotate_refresh_token,
+)
+from app.services.token_state import revoke_user_tokens, token_states
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import text
@@ -56,7 +66,6 @@ async def db_test(session: AsyncSession = Depends(get_session)):
 @router.post("/signup", response_model=dict)
 async def signup(
     request: SignUpRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
     try:
@@ -88,20 +97,38 @@ async def signup(
         await session.refresh(new_user)
 
         # Send OTP
-        await send_otp_to_user(new_user.email, background_tasks, session)
-        logger.info(f"New user registered: {new_user.email}")
+        await send_otp_to_user(new_user.email, session)
+        logger.info("New user registered: %s", new_user.email)
         return {"message": "Signup successful. Please verify your email using the OTP sent."}
 
     except IntegrityError:
         await session.rollback()
         raise HTTPException(status_code=400, detail="A database error occurred.")
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Signup failed")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 
 
 
+def issue_tokens(user, refresh_token: str, refresh_expiry: datetime) -> dict:
+    """
+    Access token for `user` (expires after ACCESS_TOKEN_EXPIRE_MINUTES) plus the given refresh token.
+    """
+    token_expiry = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        user_token_claims(user),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_at": token_expiry.isoformat(),  # Include token expiry
+        "refresh_token": refresh_token,
+        "refresh_expires_at": refresh_expiry.isoformat(),
+    }
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(
     client_request: Request,  # Non-default argument comes first
@@ -125,44 +152,97 @@ async def login(
         if not user.is_active:
             raise HTTPException(status_code=403, detail="User account is deactivated")
         
-        # Update login details
-        user.last_login = datetime.utcnow()
-        user.last_login_ip = client_request.client.host
+        # Login details are written in batches outside the request; open a refresh-token session
+        login_activity_writer.enqueue(user.id, client_request.client.host, client_request.headers.get("user-agent"))
+        await delete_expired_sessions(session, user.id)
+        refresh_token, refresh_expiry = create_auth_session(session, user.id, user.token_version or 0)
         await session.commit()
 
-        # Define token expiration
-        token_expiry_minutes = 30  # Example: 30 minutes
-        token_expiry = datetime.utcnow() + timedelta(minutes=token_expiry_minutes)
-
-        # Create the token
-        access_token = create_access_token(
-            {"sub": user.email, "role": user.role},
-            expires_delta=timedelta(minutes=token_expiry_minutes),
-        )
-
-        logger.info(f"User logged in: {user.email}")
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "expires_at": token_expiry.isoformat()  # Include token expiry
-        }
+        logger.info("User logged in: %s", user.email)
+        return issue_tokens(user, refresh_token, refresh_expiry)
 
     except HTTPException as e:
-        logger.warning(f"Login failed: {e.detail}")
+        logger.warning("Login failed: %s", e.detail)
         raise e
     except SQLAlchemyError as e:
-        logger.error(f"Database error during login: {str(e)}")
+        logger.error("Database error during login: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
-        logger.error(f"Unexpected error during login: {str(e)}")
+        logger.error("Unexpected error during login: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    request: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+
+    No password check: the token is looked up by its SHA-256 hash. The presented
+    token is revoked; reusing it later revokes every token of that login.
+    """
+    try:
+        user, refresh_token, refresh_expiry = await rotate_refresh_token(session, request.refresh_token)
+        return issue_tokens(user, refresh_token, refresh_expiry)
+
+    except HTTPException as e:
+        logger.warning("Token refresh failed: %s", e.detail)
+        raise e
+    except SQLAlchemyError as e:
+        logger.error("Database error during token refresh: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/logout")
+async def logout(
+    request: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Revoke the refresh token (and its rotated predecessors/successors) of this device.
+    Access tokens already issued stay valid until they expire.
+    """
+    await revoke_refresh_token(session, request.refresh_token)
+    await session.commit()
+    return {"message": "Logged out successfully"}
+
+
+@router.post("/logout-all")
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Sign out every device: revokes all refresh tokens and all access tokens of the user.
+    """
+    await revoke_user_sessions(session, current_user.id)
+    revoke_user_tokens(current_user)
+    await session.commit()
+    token_states.invalidate(current_user.id)
+
+    logger.info("User %s logged out of all sessions", current_user.email)
+    return {"message": "Logged out of all sessions"}
+
+
+@router.post("/stream-ticket", response_model=StreamTicketResponse)
+async def stream_ticket(claims: TokenClaims = Depends(get_token_claims)):
+    """
+    Issue a single-use, short-lived ticket for a URL that cannot send the Authorization header.
+
+    Pass it as `?ticket=` to the notification stream or an export download; it
+    expires after STREAM_TICKET_EXPIRE_SECONDS and is rejected on reuse.
+    """
+    ticket, expires_at = create_stream_ticket(claims)
+    return {"ticket": ticket, "expires_at": expires_at.isoformat()}
+
+
+
 @router.post("/send-otp")
 async def send_otp(
     email: str,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
     """
@@ -173,18 +253,18 @@ async def send_otp(
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        await send_otp_to_user(email, background_tasks, session)
-        logger.info(f"OTP sent to: {email}")
+        await send_otp_to_user(email, session)
+        logger.info("OTP sent to: %s", email)
         return {"message": "OTP sent successfully"}
 
     except HTTPException as e:
-        logger.warning(f"Failed to send OTP: {e.detail}")
+        logger.warning("Failed to send OTP: %s", e.detail)
         raise e
     except SQLAlchemyError as e:
-        logger.error(f"Database error during OTP sending: {str(e)}")
+        logger.error("Database error during OTP sending: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
-        logger.error(f"Unexpected error during OTP sending: {str(e)}")
+        logger.error("Unexpected error during OTP sending: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
 
@@ -192,7 +272,6 @@ async def send_otp(
 @router.post("/verify-otp")
 async def verify_otp(
     request: OTPVerificationRequest, 
-    background_tasks: BackgroundTasks, 
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -216,30 +295,29 @@ async def verify_otp(
         user.is_verified = True
         user.otp = None
         user.otp_expiry = None
-        await session.commit()
 
-        # Send Welcome Email
-        email_service = EmailService()
-        email_service.send_email(
+        # Queue the welcome email; it is sent once the verification commits
+        await EmailService.queue_email(
             to_email=user.email,
             subject="Welcome to Thamer!",
             template_name="welcome_email.html",
             context={
-                "user": user,
+                "user": {"first_name": user.first_name},
                 "app_name": "Thamer",
                 "docs_link": "https://thamer.com/docs",
                 "tutorials_link": "https://thamer.com/tutorials",
             },
-            background_tasks=background_tasks,
+            session=session,
         )
-        logger.info(f"User verified: {user.email}")
+        await session.commit()
+        logger.info("User verified: %s", user.email)
         return {"message": "OTP verified successfully. Welcome email sent."}
 
     except HTTPException as e:
-        logger.warning(f"OTP verification failed: {e.detail}")
+        logger.warning("OTP verification failed: %s", e.detail)
         raise e
     except Exception as e:
-        logger.error(f"Unexpected error during OTP verification: {str(e)}")
+        logger.error("Unexpected error during OTP verification: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
@@ -248,7 +326,6 @@ async def verify_otp(
 @router.post("/forgot-password")
 async def forgot_password(
     request: ForgotPasswordRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
     """
@@ -268,32 +345,30 @@ async def forgot_password(
         user.reset_otp = otp
         user.reset_otp_expiry = datetime.utcnow() + timedelta(minutes=10)
 
-        await session.commit()
-
-        email_service = EmailService()
-        email_service.send_email(
+        await EmailService.queue_email(
             to_email=request.email,
             subject="Password Reset Request",
             template_name="forgot_password_email.html",
             context={
-                "user": user,
+                "user": {"first_name": user.first_name},
                 "otp": otp,
                 "app_name": "Thamer",
             },
-            background_tasks=background_tasks,
+            session=session,
         )
+        await session.commit()
 
-        logger.info(f"Password reset OTP sent to {request.email}.")
+        logger.info("Password reset OTP sent to %s.", request.email)
         return {"message": "Password reset OTP sent successfully"}
 
     except HTTPException as e:
-        logger.warning(f"Forgot password failed: {e.detail}")
+        logger.warning("Forgot password failed: %s", e.detail)
         raise e
     except SQLAlchemyError as e:
-        logger.error(f"Database error during forgot password: {str(e)}")
+        logger.error("Database error during forgot password: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
-        logger.error(f"Unexpected error during forgot password: {str(e)}")
+        logger.error("Unexpected error during forgot password: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
 
@@ -322,20 +397,22 @@ async def reset_password(
         user.reset_otp = None
         user.reset_otp_expiry = None
         user.updated_at = datetime.utcnow()  # Update timestamp for audit
+        revoke_user_tokens(user)  # Sign out every existing session
 
         await session.commit()
+        token_states.invalidate(user.id)
 
-        logger.info(f"Password reset successfully for user {request.email}.")
+        logger.info("Password reset successfully for user %s.", request.email)
         return {"message": "Password reset successfully"}
 
     except HTTPException as e:
-        logger.warning(f"Reset password failed: {e.detail}")
+        logger.warning("Reset password failed: %s", e.detail)
         raise e
     except SQLAlchemyError as e:
-        logger.error(f"Database error during reset password: {str(e)}")
+        logger.error("Database error during reset password: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
-        logger.error(f"Unexpected error during reset password: {str(e)}")
+        logger.error("Unexpected error during reset password: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
     
 
@@ -359,14 +436,16 @@ async def change_password(
 
         # Hash the new password and update it in the database
         current_user.hashed_password = hash_password(request.new_password)
+        revoke_user_tokens(current_user)  # Other sessions must log in again
         await session.commit()
+        token_states.invalidate(current_user.id)
 
-        logger.info(f"Password changed successfully for user {current_user.email}")
+        logger.info("Password changed successfully for user %s", current_user.email)
         return {"message": "Password changed successfully"}
 
     except HTTPException as e:
-        logger.warning(f"Change password failed for user {current_user.email}: {e.detail}")
+        logger.warning("Change password failed for user %s: %s", current_user.email, e.detail)
         raise e
     except Exception as e:
-        logger.error(f"Unexpected error during password change for user {current_user.email}: {str(e)}")
+        logger.error("Unexpected error during password change for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
\ No newline at end of file
@@ -0,0 +1,23 @@
+# File: app/api/v1/endpoints/health.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.lifecycle import readiness
+
+router = APIRouter()
+
+
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the worker's event loop is serving requests. Never touches the database.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness_probe():
+    """
+    Readiness probe: 200 once the schema check passed and the connection pool is warm,
+    503 while starting up or draining for shutdown.
+    """
+    return JSONResponse(readiness.as_dict(), status_code=200 if readiness.ready else 503)
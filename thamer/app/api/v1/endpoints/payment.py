@@ -2,7 +2,6 @@ from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
-import requests
 import hashlib
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
@@ -10,11 +9,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.api.dependencies.auth import get_current_user
 from app.core.config import settings
+from app.core.services import services
 from app.core.db import get_session
 from app.models.payment import Payment
 from app.models.Subscription import Subscription, SubscriptionStatus  # Fixed lowercase import
-from app.models.subscription_plan import SubscriptionPlan
 from app.models.user import User
+from app.services.http_cache import etag_matches, http_date
+from app.services.plan_catalog import plan_catalog
+from app.services.subscription_lifecycle import refresh_entitlements
+from app.core.responses import json_bytes_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -56,9 +59,6 @@ def generate_payment_signature(order_id: str, formatted_amount: str, currency: s
     # Step 2: Convert full concatenated string to uppercase
     to_md5_upper = to_md5.upper()
 
-    # Debugging: Print raw string before hashing
-    print("Raw string before hashing:", to_md5_upper)
-
     # Step 3: Apply MD5 hashing
     md5_hash = hashlib.md5(to_md5_upper.encode()).hexdigest()
 
@@ -86,20 +86,34 @@ def verify_payment_hash(callback_data: dict, expected_hash: str) -> bool:
         # Step 2: SHA1 Hash
         calculated_hash = hashlib.sha1(md5_hash.encode()).hexdigest()
 
-        # Debugging logs
-        logger.info(f"Hash Verification for order_id: {order_id}")
-        logger.info(f"String to MD5: {string_to_md5}")
-        logger.info(f"MD5 Hash: {md5_hash}")
-        logger.info(f"Calculated SHA1 Hash: {calculated_hash}")
-        logger.info(f"Expected Hash: {expected_hash}")
-
-        return calculated_hash == expected_hash
+        # The hash input contains the merchant password; only the outcome is logged
+        if calculated_hash != expected_hash:
+            logger.warning("Callback hash mismatch for order %s", order_id)
+            return False
+        return True
 
     except Exception as e:
-        logger.error(f"Hash verification error: {e}")
+        logger.error("Hash verification error: %s", e)
         return False
 
 
+@router.get("/plans")
+async def list_public_plans(request: Request):
+    """
+    Active subscription plans (public).
+
+    Served from the precomputed plan catalog body; clients revalidate with
+    If-None-Match and get 304 until a plan changes.
+    """
+    await plan_catalog.refresh()
+    headers = {"ETag": plan_catalog.etag, "Cache-Control": "public, no-cache"}
+    if plan_catalog.last_modified:
+        headers["Last-Modified"] = http_date(plan_catalog.last_modified)
+    if etag_matches(request, plan_catalog.etag):
+        return Response(status_code=304, headers=headers)
+    return json_bytes_response(plan_catalog.public_body, headers)
+
+
 @router.post("/initiate")
 async def initiate_payment(
     request: Request,
@@ -114,11 +128,8 @@ async def initiate_payment(
         # Generate unique order ID
         order_id = f"ORD{uuid.uuid4().hex[:10].upper()}"
 
-        # Fetch subscription plan
-        result = await session.execute(
-            select(SubscriptionPlan).where(SubscriptionPlan.id == plan_id)
-        )
-        plan = result.scalars().first()
+        # Fetch subscription plan (in-memory catalog)
+        plan = await plan_catalog.get(plan_id)
 
         if not plan:
             raise HTTPException(status_code=404, detail="Subscription plan not found")
@@ -178,20 +189,20 @@ async def initiate_payment(
         files = {k: (None, str(v)) for k, v in payload.items()}
 
         # Send request to EDFAPay
-        response = requests.post(
+        response = services.http.post(
             settings.EDFAPAY_PAYMENT_URL,
             files=files,
             timeout=30
         )
 
         if response.status_code != 200:
-            logger.error(f"EDFAPay error: {response.text}")
+            logger.error("EDFAPay error: %s", response.text)
             raise HTTPException(status_code=400, detail="Payment initiation failed")
 
         response_data = response.json()
 
         if "redirect_url" not in response_data:
-            logger.error(f"Invalid EDFAPay response: {response_data}")
+            logger.error("Invalid EDFAPay response: %s", response_data)
             raise HTTPException(status_code=400, detail="Invalid payment gateway response")
 
         return {
@@ -201,7 +212,7 @@ async def initiate_payment(
         }
 
     except Exception as e:
-        logger.error(f"Error initiating payment: {e}")
+        logger.error("Error initiating payment: %s", e)
         if isinstance(e, HTTPException):
             raise
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
@@ -222,7 +233,10 @@ async def payment_callback(
             form_data = await request.form()
             callback_data = dict(form_data)
 
-        logger.info(f"Received callback: {callback_data}")
+        logger.info(
+            "Received callback for order %s", callback_data.get("order_id"),
+            extra={"trans_id": callback_data.get("trans_id"), "result": callback_data.get("result"), "status": callback_data.get("status")},
+        )
 
         # Essential parameters
         order_id = callback_data.get("order_id", "").strip()
@@ -243,7 +257,7 @@ async def payment_callback(
         payment = payment_result.scalars().first()
 
         if not payment:
-            logger.error(f"Payment not found for order_id: {order_id}")
+            logger.error("Payment not found for order_id: %s", order_id)
             return JSONResponse({"error": "Payment not found"}, status_code=404)
 
         # Update transaction details
@@ -255,7 +269,7 @@ async def payment_callback(
             try:
                 payment.trans_date = datetime.strptime(trans_date_str, '%Y-%m-%d %H:%M:%S')
             except ValueError as e:
-                logger.error(f"Invalid trans_date format: {trans_date_str} - {e}")
+                logger.error("Invalid trans_date format: %s - %s", trans_date_str, e)
                 payment.trans_date = datetime.utcnow()
 
         # Map status based on result
@@ -278,21 +292,18 @@ async def payment_callback(
 
         # ✅ Fix: If `subscription_id` is None, create a new one
         if not payment.subscription_id and payment.status == "SETTLED":
-            logger.info(f"No active subscription found for user {payment.user_id}. Creating new subscription.")
+            logger.info("No active subscription found for user %s. Creating new subscription.", payment.user_id)
 
             # ✅ Fetch `plan_id` from Payment
             if not payment.plan_id:
-                logger.error(f"Plan ID is missing for payment with order_id: {payment.order_id}")
+                logger.error("Plan ID is missing for payment with order_id: %s", payment.order_id)
                 raise HTTPException(status_code=404, detail="Plan ID missing in payment record.")
 
-            # ✅ Fetch Subscription Plan using `plan_id`
-            plan_result = await session.execute(
-                select(SubscriptionPlan).where(SubscriptionPlan.id == payment.plan_id)
-            )
-            plan = plan_result.scalars().first()
+            # ✅ Fetch Subscription Plan using `plan_id` (in-memory catalog)
+            plan = await plan_catalog.get(payment.plan_id)
 
             if not plan:
-                logger.error(f"Subscription plan not found for plan_id: {payment.plan_id}")
+                logger.error("Subscription plan not found for plan_id: %s", payment.plan_id)
                 raise HTTPException(status_code=404, detail="Subscription plan not found.")
 
             # ✅ Create new subscription
@@ -312,11 +323,12 @@ async def payment_callback(
 
             # ✅ Link payment to the new subscription
             payment.subscription_id = new_subscription.id
-            logger.info(f"New subscription created with ID {new_subscription.id} for user {payment.user_id}")
+            await refresh_entitlements(session, [payment.user_id])
+            logger.info("New subscription created with ID %s for user %s", new_subscription.id, payment.user_id)
 
         # ✅ Final commit after all updates
         await session.commit()
-        logger.info(f"Payment {payment.order_id} processed successfully with status {payment.status}")
+        logger.info("Payment %s processed successfully with status %s", payment.order_id, payment.status)
 
         # Handle 3DS/REDIRECT cases
         if payment.status in ["3DS_VERIFICATION", "PENDING"] and redirect_url:
@@ -332,7 +344,7 @@ async def payment_callback(
         })
 
     except Exception as e:
-        logger.error(f"Callback processing error: {str(e)}", exc_info=True)
+        logger.error("Callback processing error: %s", e, exc_info=True)
         await session.rollback()
         return JSONResponse(
             {"error": "Internal server error"},
@@ -359,7 +371,7 @@ async def check_payment_status(order_id: str, session: AsyncSession = Depends(ge
             "hash": hash_value
         }
 
-        response = requests.post(settings.EDFAPAY_STATUS_URL, json=payload)
+        response = services.http.post(settings.EDFAPAY_STATUS_URL, json=payload)
         response_data = response.json()
 
         if response.status_code == 200:
@@ -368,5 +380,5 @@ async def check_payment_status(order_id: str, session: AsyncSession = Depends(ge
             raise HTTPException(status_code=400, detail=response_data)
 
     except Exception as e:
-        logger.error(f"Error fetching payment status: {e}")
+        logger.error("Error fetching payment status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,11 @@
 # app/api/v1/endpoints/token.py
-import datetime
 from fastapi import APIRouter, Depends, HTTPException, Form, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password, create_access_token, user_token_claims
 from app.models.user import User
 from app.core.db import get_session
+from app.services.login_activity_service import login_activity_writer
 from sqlalchemy.future import select
 
 router = APIRouter()
@@ -27,11 +27,9 @@ async def login_for_access_token(
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # Update last login and IP address
-    user.last_login = datetime.datetime.utcnow()
-    user.last_login_ip = request.client.host
-    await session.commit()
+    # Last login and IP address are written in batches outside the request
+    login_activity_writer.enqueue(user.id, request.client.host, request.headers.get("user-agent"), method="token")
 
     # Create JWT token
-    access_token = create_access_token({"sub": user.email, "role": user.role})
+    access_token = create_access_token(user_token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
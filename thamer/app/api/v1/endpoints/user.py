@@ -1,57 +1,63 @@
 # app/api/v1/endpoints/user.py
+import asyncio
 from datetime import datetime, timedelta
 import json
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import EmailStr, HttpUrl, ValidationError
-from sqlalchemy import case, func, text
+from sqlalchemy import case, exists, func, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models import Score
-from app.models.Notification import Notification
-from app.models.CompanyView import CompanyView
+from app.models.Notification import Notification, NotificationType
+from app.models.CompanyView import CompanyView, CompanyViewMonthly
 from app.models.Company import Company
 from app.models.Subscription import Subscription, SubscriptionStatus
 from app.models.payment import Payment
 from app.models.user import User
 from app.core.db import get_session
-from app.api.dependencies.auth import get_current_user, get_current_user_optional  # Import your dependency
-from app.schemas.common import EmailValidator, NotificationResponse, PaginatedNotificationsResponse, PaginatedViewersResponse, ViewStatisticsResponse, ViewerDetail
-from app.schemas.company import CompanyInput, CompanyResponse, CompanyScorePaginationResponse, CompanyUpdateValidator, FileResponse, ScoreResponse
+from app.core.responses import ORJSONResponse, dumps, json_bytes_response
+from app.api.dependencies.auth import get_current_user, get_current_user_optional, get_stream_user  # Import your dependency
+from app.schemas.common import EmailValidator, NotificationResponse, PaginatedNotificationsResponse, PaginatedViewersResponse, ViewStatisticsResponse
+from app.schemas.company import CompanyInput, CompanyResponse, CompanyScorePaginationResponse, CompanyUpdateValidator
 from app.schemas.stats import CompanyPerformance, CompanyStatsResponse, EngagementStats, UserStatsResponse
+from app.core.config import settings
+from app.core.services import services
+from app.core.tracing import traced
+from app.services.company_profile import get_company_profile, get_company_profile_version
+from app.services.company_update_service import changed_fields, resolve_edit_status
+from app.services.company_view_service import company_view_writer
+from app.services.export_service import export_companies_with_scores
+from app.services.partition_service import view_rollup_horizon
+from app.services.http_cache import (
+    cache_headers,
+    company_listing_cache,
+    etag_matches,
+    get_catalog_version,
+    invalidate_company,
+    make_etag,
+    not_modified,
+    presign_epoch,
+    set_cache_headers,
+)
+from app.services.notification_broker import notification_hub
+from app.services.notification_service import NotificationService, notification_writer
+from app.services.read_models import company_cr_exists, get_company_card, require_company_owner
 from app.services.subscription_service import get_subscription_stats, is_subscription_active
 from botocore.exceptions import ClientError
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 from sqlalchemy.orm import joinedload
 import botocore.exceptions
-import boto3
 import logging
-import os
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# AWS S3 Configuration
-S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
-S3_REGION = os.getenv("S3_REGION", "me-south-1")
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-
-
-if not all([S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY]):
-    raise ValueError("Missing required AWS S3 credentials in environment variables.")
-
-
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=S3_REGION,
-    endpoint_url=f"https://s3.{S3_REGION}.amazonaws.com",
-)
+# The S3 client is created on first use (see app.core.services)
 
+@traced("s3.presign")
 def generate_presigned_url(object_key: str, expiration: int = 3600) -> str:
     """
     Generate a pre-signed URL for an S3 object.
@@ -60,17 +66,18 @@ def generate_presigned_url(object_key: str, expiration: int = 3600) -> str:
     :return: Pre-signed URL as a string
     """
     try:
-        return s3_client.generate_presigned_url(
+        return services.s3.generate_presigned_url(
             "get_object",
-            Params={"Bucket": S3_BUCKET_NAME, "Key": object_key},
+            Params={"Bucket": services.s3_bucket, "Key": object_key},
             ExpiresIn=expiration,
         )
     except ClientError as e:
-        logger.error(f"Failed to generate pre-signed URL for {object_key}: {e}")
+        logger.error("Failed to generate pre-signed URL for %s: %s", object_key, e)
         raise HTTPException(status_code=500, detail="Error generating pre-signed URL.")
 
     
 
+@traced("s3.presign")
 def generate_presigned_url_with_lstrip(object_key: str, expiration: int = 3600) -> str:
     """
     Generate a pre-signed URL for an S3 object.
@@ -85,14 +92,14 @@ def generate_presigned_url_with_lstrip(object_key: str, expiration: int = 3600)
             object_key = parsed_url.path.lstrip("/")
 
         # Generate the pre-signed URL
-        url = s3_client.generate_presigned_url(
+        url = services.s3.generate_presigned_url(
             "get_object",
-            Params={"Bucket": S3_BUCKET_NAME, "Key": object_key},
+            Params={"Bucket": services.s3_bucket, "Key": object_key},
             ExpiresIn=expiration,
         )
         return url
     except botocore.exceptions.ClientError as e:
-        logger.error(f"Failed to generate pre-signed URL for {object_key}: {e}")
+        logger.error("Failed to generate pre-signed URL for %s: %s", object_key, e)
         raise HTTPException(status_code=500, detail="Error generating pre-signed URL.")
 
 
@@ -114,14 +121,66 @@ def validate_s3_object_exists(object_key: str):
     :raises HTTPException: If object does not exist
     """
     try:
-        s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=object_key)
+        services.s3.head_object(Bucket=services.s3_bucket, Key=object_key)
     except ClientError as e:
         if e.response["Error"]["Code"] == "404":
             raise HTTPException(status_code=404, detail=f"File {object_key} not found in S3.")
-        logger.error(f"Error checking S3 object existence for {object_key}: {e}")
+        logger.error("Error checking S3 object existence for %s: %s", object_key, e)
         raise HTTPException(status_code=500, detail="Error checking file existence.")
 
 
+# Columns serialized into CompanyResponse by the listing endpoints
+COMPANY_RESPONSE_COLUMNS = (
+    Company.id, Company.name, Company.email, Company.phone_number, Company.cr, Company.website,
+    Company.description, Company.tagline, Company.linkedin, Company.facebook, Company.twitter,
+    Company.instagram, Company.logo, Company.awards, Company.sectors, Company.created_at,
+    Company.last_updated, Company.status, Company.rejection_reason,
+)
+
+
+def file_payload(key: Optional[str], null_if_missing: bool = False) -> Optional[dict]:
+    """
+    FileResponse-shaped dict for an S3 key, with a pre-signed URL.
+    """
+    if not key:
+        return None if null_if_missing else {"url": None, "key": None}
+    return {"url": generate_presigned_url_with_lstrip(key), "key": key}
+
+
+async def load_score_payloads(session: AsyncSession, company_ids: List[int], null_if_missing: bool = False) -> Dict[int, List[dict]]:
+    """
+    Load the scores of several companies in one query as ScoreResponse-shaped dicts, grouped by company.
+    """
+    scores: Dict[int, List[dict]] = {company_id: [] for company_id in company_ids}
+    if not company_ids:
+        return scores
+
+    result = await session.execute(
+        select(Score.company_id, Score.id, Score.year, Score.score, Score.score_type, Score.file)
+        .where(Score.company_id.in_(company_ids))
+        .order_by(Score.company_id, Score.id)
+    )
+    for row in result.all():
+        scores[row.company_id].append({
+            "id": row.id,
+            "year": row.year,
+            "score": row.score,
+            "score_type": row.score_type,
+            "file": file_payload(row.file, null_if_missing),
+        })
+    return scores
+
+
+def company_payload(row, scores: List[dict], null_if_missing: bool = False) -> dict:
+    """
+    CompanyResponse-shaped dict built straight from a COMPANY_RESPONSE_COLUMNS row.
+    """
+    payload = row._asdict()
+    payload["logo"] = file_payload(row.logo, null_if_missing)
+    payload["scores"] = scores
+    return payload
+
+
 @router.post("/generate-presigned-url", response_model=dict)
 async def generate_presigned_upload_url(
     file_name: str = Form(..., description="Name of the file to be uploaded."),
@@ -133,16 +192,16 @@ async def generate_presigned_upload_url(
     """
     try:
         file_key = f"uploads/{current_user.id}/{file_name}"
-        logger.info(f"Generating pre-signed upload URL for user {current_user.email}, file: {file_name}")
+        logger.info("Generating pre-signed upload URL for user %s, file: %s", current_user.email, file_name)
 
-        presigned_url = s3_client.generate_presigned_url(
+        presigned_url = services.s3.generate_presigned_url(
             "put_object",
-            Params={"Bucket": S3_BUCKET_NAME, "Key": file_key, "ContentType": file_type},
+            Params={"Bucket": services.s3_bucket, "Key": file_key, "ContentType": file_type},
             ExpiresIn=3600,
         )
         return {"url": presigned_url, "key": file_key}
     except ClientError as e:
-        logger.error(f"Failed to generate pre-signed upload URL: {e}")
+        logger.error("Failed to generate pre-signed upload URL: %s", e)
         raise HTTPException(status_code=500, detail="Error generating pre-signed URL.")
 
 
@@ -156,22 +215,22 @@ async def generate_profile_picture_presigned_url(
     Generate a pre-signed URL for uploading a profile picture.
     """
     try:
-        logger.info(f"Generating pre-signed URL for profile picture upload for user {current_user.email}")
+        logger.info("Generating pre-signed URL for profile picture upload for user %s", current_user.email)
 
         # Generate a unique file path for the profile picture
         file_key = f"profile_pictures/{current_user.id}/{file_name}"
 
         # Generate pre-signed URL for PUT operation
-        presigned_url = s3_client.generate_presigned_url(
+        presigned_url = services.s3.generate_presigned_url(
             "put_object",
-            Params={"Bucket": S3_BUCKET_NAME, "Key": file_key, "ContentType": file_type},
+            Params={"Bucket": services.s3_bucket, "Key": file_key, "ContentType": file_type},
             ExpiresIn=3600,
         )
 
         return {"url": presigned_url, "key": file_key}
 
     except botocore.exceptions.ClientError as e:
-        logger.error(f"Failed to generate pre-signed URL for profile picture: {e}")
+        logger.error("Failed to generate pre-signed URL for profile picture: %s", e)
         raise HTTPException(status_code=500, detail="Error generating pre-signed URL for profile picture.")
 
 
@@ -186,15 +245,12 @@ async def register_company(
     Register a new company with optional scores and associated details.
     """
     try:
-        logger.info(f"User {current_user.email} is registering a company with CR: {company.cr}")
+        logger.info("User %s is registering a company with CR: %s", current_user.email, company.cr)
 
         # Check if the company already exists
         async with session.begin_nested():
-            existing_company = await session.execute(
-                select(Company).where(Company.cr == company.cr)
-            )
-            if existing_company.scalars().first():
-                logger.warning(f"Company with CR {company.cr} already exists for user {current_user.email}.")
+            if await company_cr_exists(session, company.cr):
+                logger.warning("Company with CR %s already exists for user %s.", company.cr, current_user.email)
                 raise HTTPException(
                     status_code=400,
                     detail=f"A company with CR {company.cr} already exists.",
@@ -204,7 +260,7 @@ async def register_company(
             try:
                 valid_email = EmailValidator(email=company.email).email  # ✅ Correct way
             except ValidationError as e:
-                logger.error(f"Invalid email provided: {company.email}")
+                logger.error("Invalid email provided: %s", company.email)
                 raise HTTPException(status_code=400, detail="Invalid email format.")
 
 
@@ -251,7 +307,7 @@ async def register_company(
                     try:
                         validate_s3_object_exists(score.file_key)
                     except HTTPException as e:
-                        logger.error(f"Score file validation failed for key {score.file_key}: {e.detail}")
+                        logger.error("Score file validation failed for key %s: %s", score.file_key, e.detail)
                         raise HTTPException(
                             status_code=400,
                             detail=f"Score file validation failed: {e.detail}",
@@ -282,7 +338,7 @@ async def register_company(
 
             await session.commit()
 
-        logger.info(f"Company {company.name} registered successfully by user {current_user.email}.")
+        logger.info("Company %s registered successfully by user %s.", company.name, current_user.email)
         return {
             "message": "Company registered successfully.",
             "company": {
@@ -308,10 +364,10 @@ async def register_company(
         }
 
     except HTTPException as http_err:
-        logger.error(f"HTTPException during company registration: {http_err.detail}")
+        logger.error("HTTPException during company registration: %s", http_err.detail)
         raise http_err
     except Exception as e:
-        logger.exception(f"Unexpected error during company registration for user {current_user.email}: {e}")
+        logger.exception("Unexpected error during company registration for user %s: %s", current_user.email, e)
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred during company registration.",
@@ -338,13 +394,13 @@ async def update_profile_picture(
         # Generate a pre-signed URL for retrieving the profile picture
         profile_picture_url = generate_presigned_url(file_key)
 
-        logger.info(f"Profile picture updated for user {current_user.email}.")
+        logger.info("Profile picture updated for user %s.", current_user.email)
         return {
             "message": "Profile picture updated successfully.",
             "profile_picture_url": profile_picture_url,
         }
     except Exception as e:
-        logger.error(f"Error updating profile picture for user {current_user.email}: {e}")
+        logger.error("Error updating profile picture for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
@@ -361,7 +417,7 @@ async def get_user_details(current_user: User = Depends(get_current_user)):
             # Generate pre-signed URL for the stored object key
             profile_picture_url = generate_presigned_url(current_user.profile_picture)
         except Exception as e:
-            logger.error(f"Failed to generate pre-signed URL for profile picture of user {current_user.email}: {e}")
+            logger.error("Failed to generate pre-signed URL for profile picture of user %s: %s", current_user.email, e)
 
     return {
         "id": current_user.id,
@@ -406,7 +462,7 @@ async def update_profile(
         # Commit changes to the database
         await session.commit()
 
-        logger.info(f"User profile updated for {current_user.email}.")
+        logger.info("User profile updated for %s.", current_user.email)
 
         # Return the updated profile data
         return {
@@ -425,13 +481,66 @@ async def update_profile(
         }
 
     except Exception as e:
-        logger.error(f"Error updating profile for user {current_user.email}: {e}")
+        logger.error("Error updating profile for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
 
+def company_listing_filters(
+    score_type: Optional[str],
+    min_year: Optional[int],
+    max_year: Optional[int],
+    sectors: Optional[List[str]],
+    company_name: Optional[str],
+) -> list:
+    """
+    WHERE clauses for the approved-company directory.
+    Score filters are a semi-join, so each company appears once.
+    """
+    filters = [Company.status == "approved"]
+    if sectors:
+        filters.append(Company.sectors.overlap(sectors))
+    if company_name:
+        filters.append(Company.name.ilike(f"%{company_name}%"))
+    if score_type or min_year or max_year:
+        score_query = select(Score.company_id)
+        if score_type:
+            score_query = score_query.where(Score.score_type == score_type)
+        if min_year:
+            score_query = score_query.where(Score.year >= min_year)
+        if max_year:
+            score_query = score_query.where(Score.year <= max_year)
+        filters.append(Company.id.in_(score_query))
+    return filters
+
+
+@router.get("/companies-with-scores/export")
+async def export_companies_with_scores_endpoint(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    score_type: Optional[str] = Query(None),
+    min_year: Optional[int] = Query(None),
+    max_year: Optional[int] = Query(None),
+    sectors: Optional[List[str]] = Query(None),
+    company_name: Optional[str] = Query(None),
+    current_user: User = Depends(get_stream_user),
+):
+    """
+    Stream the whole approved-company directory with scores as CSV or NDJSON.
+
+    Takes the same filters as /companies-with-scores. Rows come from a server-side
+    cursor, so memory use does not grow with the export size.
+    """
+    if not is_subscription_active(current_user):
+        raise HTTPException(status_code=403, detail="Subscription required to access company scores")
+
+    logger.info("User %s exporting companies with scores as %s", current_user.email, export_format)
+    filters = company_listing_filters(score_type, min_year, max_year, sectors, company_name)
+    return export_companies_with_scores(export_format, filters)
+
+
 @router.get("/companies-with-scores", response_model=CompanyScorePaginationResponse)
 async def get_companies_with_scores(
+    request: Request,
     score_type: Optional[str] = Query(None),
     min_year: Optional[int] = Query(None),
     max_year: Optional[int] = Query(None),
@@ -444,105 +553,66 @@ async def get_companies_with_scores(
 ):
     """
     Retrieve all companies along with their associated scores, with pagination and optional filtering.
+
+    Supports conditional requests: the ETag is derived from the catalog version and the
+    filters, and a matching If-None-Match is answered with 304 before any company is loaded.
+    Identical filter/page combinations are served from a shared response cache.
     """
 
     try:
         # Validate subscription
-        if not await is_subscription_active(current_user, session):
+        if not is_subscription_active(current_user):
             raise HTTPException(
                 status_code=403,
                 detail="Subscription required to access company scores"
             )
 
-        # Base query: Select companies and join with scores
-        # base_query = select(Company).options(joinedload(Company.scores))
-        base_query = select(Company).where(Company.status == "approved").options(joinedload(Company.scores))
-
-        # Apply filters
-        if sectors:
-            base_query = base_query.where(Company.sectors.overlap(sectors))
-        if company_name:
-            base_query = base_query.where(Company.name.ilike(f"%{company_name}%"))
-        if score_type or min_year or max_year:
-            base_query = base_query.join(Score)
-            if score_type:
-                base_query = base_query.where(Score.score_type == score_type)
-            if min_year:
-                base_query = base_query.where(Score.year >= min_year)
-            if max_year:
-                base_query = base_query.where(Score.year <= max_year)
+        catalog_version = await get_catalog_version(session)
+        cache_key = (score_type, min_year, max_year, tuple(sorted(sectors or [])), company_name, page, page_size)
+        etag = make_etag("companies-with-scores", catalog_version, cache_key)
+        if etag_matches(request, etag):
+            return not_modified(etag, catalog_version)
+
+        cache_version = (catalog_version, presign_epoch())
+        cached = company_listing_cache.get(cache_key, cache_version)
+        if cached is not None:
+            return json_bytes_response(cached, cache_headers(etag, catalog_version))
+
+        filters = company_listing_filters(score_type, min_year, max_year, sectors, company_name)
 
         # Get total count
-        count_query = select(func.count()).select_from(base_query.subquery())
-        total_result = await session.execute(count_query)
-        total = total_result.scalar_one_or_none() or 0
+        total = await session.scalar(select(func.count(Company.id)).where(*filters)) or 0
 
         # Calculate pagination
         total_pages = max(1, (total + page_size - 1) // page_size)
         offset = (page - 1) * page_size
 
-        # Get paginated results
-        paginated_query = base_query.offset(offset).limit(page_size)
-        result = await session.execute(paginated_query)
-        companies = result.unique().scalars().all()
-
-        # Prepare response data
-        data = []
-        for company in companies:
-            company_scores = [
-                ScoreResponse(
-                    id=score.id,
-                    year=score.year,
-                    score=score.score,
-                    score_type=score.score_type,
-                    file=FileResponse(  # Convert file into a valid FileResponse object
-                        url=generate_presigned_url_with_lstrip(score.file) if score.file else None,
-                        key=score.file if score.file else None,
-                    )
-                )
-                for score in company.scores
-            ]
-
-            company_data = CompanyResponse(
-                id=company.id,
-                name=company.name,
-                email=company.email,
-                phone_number=company.phone_number,
-                cr=company.cr,
-                website=company.website,
-                description=company.description,
-                tagline=company.tagline,
-                linkedin=company.linkedin,
-                facebook=company.facebook,
-                twitter=company.twitter,
-                instagram=company.instagram,
-                logo=FileResponse(  # Convert logo into a FileResponse object
-                    url=generate_presigned_url(company.logo) if company.logo else None,
-                    key=company.logo if company.logo else None,
-                ),
-                awards=company.awards,
-                sectors=company.sectors,
-                created_at=company.created_at,
-                last_updated=company.last_updated,
-                status=company.status,  
-                rejection_reason=company.rejection_reason,  
-                scores=company_scores  # Include scores inside company details
-            )
-
-            data.append(company_data)
-
-        return CompanyScorePaginationResponse(
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            data=data
+        # Get paginated rows (plain column tuples, no ORM objects)
+        result = await session.execute(
+            select(*COMPANY_RESPONSE_COLUMNS)
+            .where(*filters)
+            .order_by(Company.created_at.desc(), Company.id.desc())
+            .offset(offset)
+            .limit(page_size)
         )
+        rows = result.all()
+        scores = await load_score_payloads(session, [row.id for row in rows])
+
+        # Rows go straight to JSON bytes; the shape matches CompanyScorePaginationResponse
+        body = dumps({
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "data": [company_payload(row, scores[row.id]) for row in rows],
+        })
+        company_listing_cache.set(cache_key, cache_version, body)
+        return json_bytes_response(body, cache_headers(etag, catalog_version))
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error retrieving companies with scores: {str(e)}")
+        logger.error("Error retrieving companies with scores: %s", e)
         raise HTTPException(status_code=500, detail="Failed to retrieve companies with scores")
 
 
@@ -555,72 +625,32 @@ async def get_user_companies(
     Retrieve all companies registered by the current user, including scores with pre-signed links for files.
     """
     try:
-        logger.info(f"Fetching companies for user {current_user.email}")
-
-        # Fetch user-owned companies with associated scores
-        stmt = select(Company).where(Company.user_id == current_user.id).options(joinedload(Company.scores))
-        result = await session.execute(stmt)
-        companies = result.unique().scalars().all()
-
-        # Extract company names for logging
-        company_names = [company.name for company in companies]
-        logger.info(f"Found {len(companies)} companies for user {current_user.email}: {', '.join(company_names) or 'No Companies Found'}")
+        logger.info("Fetching companies for user %s", current_user.email)
 
+        # Fetch user-owned companies and their scores as plain rows
+        result = await session.execute(
+            select(*COMPANY_RESPONSE_COLUMNS).where(Company.user_id == current_user.id)
+        )
+        rows = result.all()
+        scores = await load_score_payloads(session, [row.id for row in rows], null_if_missing=True)
 
-        # Explicitly map ORM models to Pydantic models
-        response_data = [
-            CompanyResponse(
-                id=company.id,
-                name=company.name,
-                email=company.email,
-                phone_number=company.phone_number,
-                cr=company.cr,
-                website=company.website,
-                description=company.description,
-                tagline=company.tagline,
-                linkedin=company.linkedin,
-                facebook=company.facebook,
-                twitter=company.twitter,
-                instagram=company.instagram,
-                logo=FileResponse(
-                    url=generate_presigned_url_with_lstrip(company.logo) if company.logo else None,
-                    key=company.logo
-                ) if company.logo else None,
-                awards=company.awards,
-                sectors=company.sectors,
-                created_at=company.created_at,
-                last_updated=company.last_updated,
-                scores=[
-                    ScoreResponse(
-                        id=score.id,
-                        year=score.year,
-                        score=score.score,
-                        score_type=score.score_type,
-                        file=FileResponse(
-                            url=generate_presigned_url_with_lstrip(score.file) if score.file else None,
-                            key=score.file
-                        ) if score.file else None
-                    ) for score in company.scores
-                ],
-                status=company.status,  # Ensure company status is included
-                rejection_reason=company.rejection_reason  # Include rejection reason if applicable
-            ) for company in companies
-        ]
+        logger.info("Found %s companies for user %s", len(rows), current_user.email)
 
-        logger.info(f"Returning {len(response_data)} companies successfully for user {current_user.email}")
-        return response_data
+        return ORJSONResponse([company_payload(row, scores[row.id], null_if_missing=True) for row in rows])
 
     except HTTPException as e:
-        logger.error(f"HTTPException while fetching companies for user {current_user.email}: {e.detail}")
+        logger.error("HTTPException while fetching companies for user %s: %s", current_user.email, e.detail)
         raise e
     except Exception as e:
-        logger.exception(f"Unexpected error fetching companies for user {current_user.email}: {e}")
+        logger.exception("Unexpected error fetching companies for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred while retrieving companies.")
 
 
 @router.get("/user/companies/{company_id}", response_model=CompanyResponse)
 async def get_user_company_by_id(
     company_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
@@ -629,75 +659,43 @@ async def get_user_company_by_id(
     Access is restricted to:
       - The owner of the company
       - Active subscribers
+
+    Answers a matching If-None-Match with 304 after the access check, without loading the company.
+    Otherwise the profile comes from the per-worker profile cache (see app.services.company_profile).
     """
     try:
-        logger.info(f"Fetching company {company_id} for user {current_user.email}")
-
-        # Fetch the company and its scores
-        stmt = (
-            select(Company)
-            .where(Company.id == company_id)
-            .options(joinedload(Company.scores))
-        )
-        result = await session.execute(stmt)
-        company = result.scalars().first()
+        logger.info("Fetching company %s for user %s", company_id, current_user.email)
 
-        if not company:
-            logger.warning(f"Company {company_id} not found for user {current_user.email}")
+        version = await get_company_profile_version(session, company_id)
+        if not version:
+            logger.warning("Company %s not found for user %s", company_id, current_user.email)
             raise HTTPException(status_code=404, detail="Company not found.")
 
         # Check if the user is the owner or has an active subscription
-        if company.user_id != current_user.id:
-            if not await is_subscription_active(current_user, session):
-                logger.warning(f"Unauthorized access attempt to company {company_id} by user {current_user.email}")
+        if version.user_id != current_user.id:
+            if not is_subscription_active(current_user):
+                logger.warning("Unauthorized access attempt to company %s by user %s", company_id, current_user.email)
                 raise HTTPException(status_code=403, detail="Subscription required to view this company.")
 
-        # Explicitly map ORM model to Pydantic schema (to ensure correct serialization)
-        response_data = CompanyResponse(
-            id=company.id,
-            name=company.name,
-            email=company.email,
-            phone_number=company.phone_number,
-            cr=company.cr,
-            website=company.website,
-            description=company.description,
-            tagline=company.tagline,
-            linkedin=company.linkedin,
-            facebook=company.facebook,
-            twitter=company.twitter,
-            instagram=company.instagram,
-            logo=FileResponse(
-                url=generate_presigned_url_with_lstrip(company.logo) if company.logo else None,
-                key=company.logo
-            ) if company.logo else None,
-            awards=company.awards,
-            sectors=company.sectors,
-            created_at=company.created_at,
-            last_updated=company.last_updated,
-            scores=[
-                ScoreResponse(
-                    id=score.id,
-                    year=score.year,
-                    score=score.score,
-                    score_type=score.score_type,
-                    file=FileResponse(
-                        url=generate_presigned_url_with_lstrip(score.file) if score.file else None,
-                        key=score.file
-                    ) if score.file else None
-                ) for score in company.scores
-            ],
-            status=company.status,  # Ensure company status is included
-            rejection_reason=company.rejection_reason  # Include rejection reason if applicable
-        )
+        etag = make_etag("company", company_id, version.last_updated, version.view_count)
+        if etag_matches(request, etag):
+            return not_modified(etag, version.last_updated)
+        set_cache_headers(response, etag, version.last_updated)
 
-        logger.info(f"Successfully fetched company '{company.name}' (ID {company.id}) for user {current_user.email}")
+        # Cached per company version; view_count is overlaid from the company row
+        response_data = await get_company_profile(session, company_id, version, generate_presigned_url_with_lstrip)
+        if not response_data:
+            logger.warning("Company %s not found for user %s", company_id, current_user.email)
+            raise HTTPException(status_code=404, detail="Company not found.")
+
+        logger.info("Successfully fetched company '%s' (ID %s) for user %s", response_data.name, company_id, current_user.email)
         return response_data
 
     except HTTPException as e:
-        logger.error(f"HTTPException while fetching company {company_id} for user {current_user.email}: {e.detail}")
+        logger.error("HTTPException while fetching company %s for user %s: %s", company_id, current_user.email, e.detail)
         raise e
     except Exception as e:
-        logger.exception(f"Unexpected error fetching company {company_id} for user {current_user.email}: {e}")
+        logger.exception("Unexpected error fetching company %s for user %s: %s", company_id, current_user.email, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred while retrieving the company.")
 
 
@@ -729,19 +727,23 @@ async def update_company(
     - `"approved"` → **Changes to** `"re-evaluation"`
     - `"pending"` → **Remains** `"pending"`
     - `"rejected"` → **Changes to** `"revision-requested"`
+
+    Only fields that differ from the stored company are written. A submission
+    that changes nothing writes nothing: the status and `last_updated` stay as they are.
     """
     try:
-        logger.info(f"User {current_user.email} attempting to update company ID {company_id}.")
+        logger.info("User %s attempting to update company ID %s.", current_user.email, company_id)
 
-        # Fetch the company associated with the current user
-        stmt = select(Company).where(Company.id == company_id, Company.user_id == current_user.id)
-        result = await session.execute(stmt)
-        company = result.scalars().first()
+        # Fetch the company associated with the current user (plain row; only changed columns are written)
+        result = await session.execute(
+            select(*COMPANY_RESPONSE_COLUMNS).where(Company.id == company_id, Company.user_id == current_user.id)
+        )
+        row = result.first()
 
-        if not company:
-            logger.warning(f"Company ID {company_id} not found or unauthorized access by user {current_user.email}.")
+        if not row:
+            logger.warning("Company ID %s not found or unauthorized access by user %s.", company_id, current_user.email)
             raise HTTPException(status_code=404, detail="Company not found or unauthorized access.")
-        
+
         # Validate Email and URLs using Pydantic Model
         try:
             validated_data = CompanyUpdateValidator(
@@ -753,78 +755,77 @@ async def update_company(
                 instagram=instagram
             )
         except ValidationError as e:
-            logger.error(f"Validation failed: {e.errors()}")
+            logger.error("Validation failed: %s", e.errors())
             raise HTTPException(status_code=400, detail="Invalid email or URL format. Ensure URLs include http:// or https://.")
 
-
-        # Capture the old status before making changes
-        old_status = company.status
-
-        # Determine the new status
-        if old_status == "approved":
-            new_status = "re-evaluation"
-        elif old_status == "rejected":
-            new_status = "revision-requested"
-        else:  # Keep "pending" unchanged
-            new_status = old_status
-
-        # Apply the status update **only if it has changed**
-        if company.status != new_status:
-            logger.info(f"Changing company ID {company_id} status from '{old_status}' to '{new_status}'")
-            company.status = new_status
-
-        # Update fields if provided
-        company.name = name or company.name
-        company.email = email or company.email
-        company.phone_number = phone_number or company.phone_number
-        company.cr = cr or company.cr
-        company.website = website or company.website
-        company.description = description or company.description
-        company.tagline = tagline or company.tagline
-        company.linkedin = linkedin or company.linkedin
-        company.facebook = facebook or company.facebook
-        company.twitter = twitter or company.twitter
-        company.instagram = instagram or company.instagram
-        company.awards = awards or company.awards
-        company.sectors = sectors or company.sectors
-        company.last_updated = datetime.utcnow()
-
-        # Validate and update logo if provided
-        if logo_key:
-            validate_s3_object_exists(logo_key)  # Ensure file exists in S3
-            company.logo = logo_key
-
-        # **Ensure SQLAlchemy detects changes by explicitly adding the object**
-        session.add(company)
-
-        # Commit changes
-        await session.commit()
+        company = row._asdict()
+        changes = changed_fields(company, {
+            "name": name,
+            "email": email,
+            "phone_number": phone_number,
+            "cr": cr,
+            "website": website,
+            "description": description,
+            "tagline": tagline,
+            "linkedin": linkedin,
+            "facebook": facebook,
+            "twitter": twitter,
+            "instagram": instagram,
+            "logo": logo_key,
+            "awards": awards,
+            "sectors": sectors,
+        })
+
+        if changes:
+            # Only a new logo needs the S3 check; boto3 blocks, so it runs in a thread
+            if "logo" in changes:
+                await asyncio.to_thread(validate_s3_object_exists, changes["logo"])
+
+            new_status = resolve_edit_status(company["status"])
+            if new_status != company["status"]:
+                logger.info("Changing company ID %s status from '%s' to '%s'", company_id, company['status'], new_status)
+                changes["status"] = new_status
+            changes["last_updated"] = datetime.utcnow()
+
+            # UPDATE of the changed columns only
+            await session.execute(
+                update(Company)
+                .where(Company.id == company_id)
+                .values(**changes)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            invalidate_company(company_id)
+            company.update(changes)
+            logger.info("Company ID %s updated successfully by user %s (%s). New status: %s", company_id, current_user.email, ', '.join(sorted(changes)), company['status'])
+        else:
+            # Nothing differs from the stored row: no write, no status change, caches stay valid
+            logger.info("Company ID %s update by user %s changed nothing.", company_id, current_user.email)
 
         # Generate pre-signed URL for the updated logo
         logo_url = generate_presigned_url(logo_key) if logo_key else None
 
-        logger.info(f"Company ID {company_id} updated successfully by user {current_user.email}. New status: {company.status}")
         return {
-            "message": "Company updated successfully.",
+            "message": "Company updated successfully." if changes else "No changes to apply.",
             "company": {
-                "id": company.id,
-                "name": company.name,
-                "email": company.email,
-                "phone_number": company.phone_number,
-                "cr": company.cr,
-                "website": company.website,
-                "description": company.description,
-                "tagline": company.tagline,
-                "linkedin": company.linkedin,
-                "facebook": company.facebook,
-                "twitter": company.twitter,
-                "instagram": company.instagram,
+                "id": company["id"],
+                "name": company["name"],
+                "email": company["email"],
+                "phone_number": company["phone_number"],
+                "cr": company["cr"],
+                "website": company["website"],
+                "description": company["description"],
+                "tagline": company["tagline"],
+                "linkedin": company["linkedin"],
+                "facebook": company["facebook"],
+                "twitter": company["twitter"],
+                "instagram": company["instagram"],
                 "logo": logo_url,  # Return pre-signed URL
-                "awards": company.awards,
-                "sectors": company.sectors,
-                "status": company.status,  # Now properly updated
-                "created_at": company.created_at,
-                "last_updated": company.last_updated,
+                "awards": company["awards"],
+                "sectors": company["sectors"],
+                "status": company["status"],
+                "created_at": company["created_at"],
+                "last_updated": company["last_updated"],
             },
         }
 
@@ -832,7 +833,7 @@ async def update_company(
         # Re-raise HTTPException (e.g., 404, 400) to return appropriate response
         raise he
     except Exception as e:
-        logger.error(f"Error updating company ID {company_id}: {str(e)}", exc_info=True)
+        logger.error("Error updating company ID %s: %s", company_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
@@ -856,7 +857,7 @@ async def update_score(
     - `"rejected"` → **Changes to** `"revision-requested"`
     """
     try:
-        logger.info(f"User {current_user.email} attempting to update score ID {score_id} for company ID {company_id}.")
+        logger.info("User %s attempting to update score ID %s for company ID %s.", current_user.email, score_id, company_id)
 
         # Fetch the company to ensure it belongs to the current user
         stmt = select(Company).where(Company.id == company_id, Company.user_id == current_user.id)
@@ -864,7 +865,7 @@ async def update_score(
         company = result.scalars().first()
 
         if not company:
-            logger.warning(f"Company ID {company_id} not found or unauthorized access by user {current_user.email}.")
+            logger.warning("Company ID %s not found or unauthorized access by user %s.", company_id, current_user.email)
             raise HTTPException(status_code=404, detail="Company not found or unauthorized access.")
 
         # Fetch the score to update
@@ -873,7 +874,7 @@ async def update_score(
         score_entry = result.scalars().first()
 
         if not score_entry:
-            logger.warning(f"Score ID {score_id} not found for company ID {company_id}.")
+            logger.warning("Score ID %s not found for company ID %s.", score_id, company_id)
             raise HTTPException(status_code=404, detail="Score not found.")
 
         # Capture the old company status before making changes
@@ -899,20 +900,24 @@ async def update_score(
 
         # **Ensure company status is updated**
         if company.status != new_status:
-            logger.info(f"Changing company ID {company_id} status from '{old_status}' to '{new_status}'")
+            logger.info("Changing company ID %s status from '%s' to '%s'", company_id, old_status, new_status)
             company.status = new_status
 
+        # Scores are part of the company's version (ETags, cached listings)
+        company.last_updated = datetime.utcnow()
+
         # Ensure SQLAlchemy detects changes by explicitly adding both objects
         session.add(score_entry)
         session.add(company)
 
         # Commit changes
         await session.commit()
+        invalidate_company(company_id)
 
         # Generate pre-signed URL for the updated file
         file_url = generate_presigned_url(file_key) if file_key else None
 
-        logger.info(f"Score ID {score_id} updated successfully by user {current_user.email}. Company status updated to {company.status}.")
+        logger.info("Score ID %s updated successfully by user %s. Company status updated to %s.", score_id, current_user.email, company.status)
         return {
             "message": "Score updated successfully.",
             "score": {
@@ -929,44 +934,25 @@ async def update_score(
         }
 
     except Exception as e:
-        logger.error(f"Error updating score ID {score_id} for company ID {company_id}: {e}")
+        logger.error("Error updating score ID %s for company ID %s: %s", score_id, company_id, e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
-async def send_notification_background(
+def send_notification_background(
     user_id: int, 
     title: str, 
     message: str, 
     notification_type: str,  # Pass notification type explicitly
-    session: AsyncSession
 ):
     """
-    Send a notification asynchronously with a specific type.
+    Queue a notification with a specific type for the batched notification writer.
     """
-    try:
-        # Ensure the session is active and commit manually
-        new_notification = Notification(
-            recipient_id=user_id,
-            title=title,
-            message=message,
-            type=notification_type,  # Use an explicit field instead of `type`
-            created_at=datetime.utcnow(),
-        )
-        session.add(new_notification)
-
-        # Explicitly commit outside of session.begin()
-        await session.commit()
-
-        logger.info(f"Notification created for user {user_id}")
-    
-    except Exception as e:
-        logger.error(f"Failed to send notification: {str(e)}")
+    notification_writer.enqueue(user_id, title, message, NotificationType(notification_type))
 
 
 @router.post("/company/{company_id}/view", response_model=dict)
 async def track_company_view(
     company_id: int,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user),
 ):
@@ -974,44 +960,31 @@ async def track_company_view(
     Track when a user views a company.
     """
     try:
-        stmt = select(Company).where(Company.id == company_id)
-        result = await session.execute(stmt)
-        company = result.scalars().first()
+        company = await get_company_card(session, company_id)
 
         if not company:
             raise HTTPException(status_code=404, detail="Company not found.")
 
         # Avoid duplicate views in 1 hour
-        recent_view_stmt = (
-            select(CompanyView)
+        recent_view_stmt = select(
+            exists()
             .where(CompanyView.company_id == company_id)
             .where(CompanyView.viewer_id == current_user.id if current_user else None)
             .where(CompanyView.viewed_at > datetime.utcnow() - timedelta(hours=1))
         )
-        recent_view = await session.execute(recent_view_stmt)
-        if recent_view.scalars().first():
+        if await session.scalar(recent_view_stmt):
             return {"message": "View already recorded recently."}
 
-        # Create new view entry
-        new_view = CompanyView(
-            company_id=company_id,
-            viewer_id=current_user.id if current_user else None,
-        )
-        session.add(new_view)
-
-        # Update view count in Company table
-        company.view_count = (company.view_count or 0) + 1  
+        # The view row and the view_count increment are written in batches outside the request
+        company_view_writer.enqueue(company_id, current_user.id if current_user else None)
 
-        await session.commit()
-
-        # Use background task for notifications
         if current_user:
-            background_tasks.add_task(send_notification_background, company.user_id, "New Company View", f"Your company '{company.name}' was viewed by {current_user.first_name}.", "VIEW", session)
+            send_notification_background(company.user_id, "New Company View", f"Your company '{company.name}' was viewed by {current_user.first_name}.", "VIEW")
 
         return {"message": "Company view recorded."}
 
     except Exception as e:
-        logger.error(f"Error tracking company view: {e}")
+        logger.error("Error tracking company view: %s", e)
         raise HTTPException(status_code=500, detail="Failed to track company view.")
 
 
@@ -1026,60 +999,47 @@ async def get_view_statistics(
     """
     try:
         # Validate company ownership
-        company = await session.get(Company, company_id)
-        if not company or company.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Company not found or unauthorized")
-
-        # Base query
-        base_query = select(CompanyView).where(CompanyView.company_id == company_id)
+        await require_company_owner(session, company_id, current_user.id)
 
-        # Total views
-        total_views = await session.scalar(
-            select(func.count()).select_from(base_query.subquery())
-        )
+        now = datetime.utcnow()
+        # Views before the horizon come from the monthly rollups; live rows only from the horizon
+        # (or 30 days back, if earlier), so the scan is pruned to the last two or three partitions
+        horizon = datetime.combine(view_rollup_horizon(now), datetime.min.time())
+        since_horizon = CompanyView.viewed_at >= horizon
 
-        # Time-based views
-        views_last_7_days = await session.scalar(
-            select(func.count()).where(
-                CompanyView.company_id == company_id,
-                CompanyView.viewed_at >= datetime.utcnow() - timedelta(days=7)
-            )
-        )
-
-        views_last_30_days = await session.scalar(
-            select(func.count()).where(
-                CompanyView.company_id == company_id,
-                CompanyView.viewed_at >= datetime.utcnow() - timedelta(days=30)
-            )
-        )
-
-        # Viewer type breakdown
-        anonymous_views = await session.scalar(
-            select(func.count()).where(
+        live = (await session.execute(
+            select(
+                func.count().filter(since_horizon).label("total"),
+                func.count().filter(CompanyView.viewed_at >= now - timedelta(days=7)).label("last_7_days"),
+                func.count().filter(CompanyView.viewed_at >= now - timedelta(days=30)).label("last_30_days"),
+                func.count().filter(since_horizon, CompanyView.viewer_id.is_(None)).label("anonymous"),
+                func.count(CompanyView.viewer_id).filter(since_horizon).label("authenticated"),
+            ).where(
                 CompanyView.company_id == company_id,
-                CompanyView.viewer_id.is_(None)
+                CompanyView.viewed_at >= min(horizon, now - timedelta(days=30)),
             )
-        )
+        )).one()
 
-        authenticated_views = await session.scalar(
-            select(func.count()).where(
-                CompanyView.company_id == company_id,
-                CompanyView.viewer_id.is_not(None)
-            )
-        )
+        archived = (await session.execute(
+            select(
+                func.coalesce(func.sum(CompanyViewMonthly.total_views), 0).label("total"),
+                func.coalesce(func.sum(CompanyViewMonthly.anonymous_views), 0).label("anonymous"),
+                func.coalesce(func.sum(CompanyViewMonthly.authenticated_views), 0).label("authenticated"),
+            ).where(CompanyViewMonthly.company_id == company_id, CompanyViewMonthly.month < horizon.date())
+        )).one()
 
         return ViewStatisticsResponse(
-            total_views=total_views or 0,
-            views_last_7_days=views_last_7_days or 0,
-            views_last_30_days=views_last_30_days or 0,
-            anonymous_views=anonymous_views or 0,
-            authenticated_views=authenticated_views or 0
+            total_views=live.total + archived.total,
+            views_last_7_days=live.last_7_days,
+            views_last_30_days=live.last_30_days,
+            anonymous_views=live.anonymous + archived.anonymous,
+            authenticated_views=live.authenticated + archived.authenticated
         )
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error fetching view stats for company {company_id}: {str(e)}")
+        logger.error("Error fetching view stats for company %s: %s", company_id, e)
         raise HTTPException(status_code=500, detail="Failed to fetch view statistics")
 
 
@@ -1096,9 +1056,7 @@ async def get_company_viewers(
     """
     try:
         # Validate company ownership
-        company = await session.get(Company, company_id)
-        if not company or company.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Company not found or unauthorized")
+        await require_company_owner(session, company_id, current_user.id)
 
         # Total count
         total = await session.scalar(
@@ -1107,7 +1065,10 @@ async def get_company_viewers(
 
         # Paginated query
         query = (
-            select(CompanyView, User)
+            select(
+                CompanyView.viewer_id, CompanyView.viewed_at, User.id.label("user_id"), User.first_name,
+                User.last_name, User.email, User.profile_picture, User.company_name,
+            )
             .join(User, CompanyView.viewer_id == User.id, isouter=True)
             .where(CompanyView.company_id == company_id)
             .order_by(CompanyView.viewed_at.desc())
@@ -1116,33 +1077,24 @@ async def get_company_viewers(
         )
 
         result = await session.execute(query)
-        items = []
-
-        for view, user in result.all():
-            profile_picture = None
-            if user and user.profile_picture:
-                profile_picture = generate_presigned_url(user.profile_picture)
-
-            items.append(ViewerDetail(
-                viewer_id=view.viewer_id,
-                viewer_name=f"{user.first_name} {user.last_name}" if user else "Anonymous",
-                viewer_email=user.email if user else None,
-                viewed_at=view.viewed_at,
-                profile_picture=profile_picture,
-                company_name=user.company_name
-            ))
-
-        return PaginatedViewersResponse(
-            total=total or 0,
-            page=page,
-            page_size=page_size,
-            items=items
-        )
+        items = [
+            {
+                "viewer_id": row.viewer_id,
+                "viewer_name": f"{row.first_name} {row.last_name}" if row.user_id else "Anonymous",
+                "viewer_email": row.email,
+                "viewed_at": row.viewed_at,
+                "profile_picture": generate_presigned_url(row.profile_picture) if row.profile_picture else None,
+                "company_name": row.company_name,
+            }
+            for row in result.all()
+        ]
+
+        return ORJSONResponse({"total": total or 0, "page": page, "page_size": page_size, "items": items})
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error fetching viewers for company {company_id}: {str(e)}")
+        logger.error("Error fetching viewers for company %s: %s", company_id, e)
         raise HTTPException(status_code=500, detail="Failed to fetch viewers")
 
 
@@ -1158,30 +1110,20 @@ async def get_notifications(
     Get paginated notifications for current user
     """
     try:
-        # Base query
-        logger.info(f"Fetching notifications for user_id: {current_user.id}")
-
         query = select(Notification).where(Notification.recipient_id == current_user.id)
-        result = await session.execute(query)
-        notifications = result.scalars().all()
-
-        logger.info(f"Found {len(notifications)} notifications")
 
         # Filter by read status if provided
         if read_status is not None:
             query = query.where(Notification.is_read == read_status)
 
-        # Total counts
-        total = await session.scalar(
-            select(func.count()).select_from(query.subquery())
-        )
-
-        unread_count = await session.scalar(
-            select(func.count()).where(
-                Notification.recipient_id == current_user.id,
-                Notification.is_read == False
-            )
-        )
+        # Totals come from the per-user counter row instead of count() scans
+        total_count, unread_count = await NotificationService.get_counts(session, current_user.id)
+        if read_status is None:
+            total = total_count
+        elif read_status:
+            total = total_count - unread_count
+        else:
+            total = unread_count
 
         # Paginated results
         notifications = await session.scalars(
@@ -1208,10 +1150,80 @@ async def get_notifications(
         )
 
     except Exception as e:
-        logger.error(f"Error fetching notifications for user {current_user.id}: {str(e)}")
+        logger.error("Error fetching notifications for user %s: %s", current_user.id, e)
         raise HTTPException(status_code=500, detail="Failed to fetch notifications")
     
 
+@router.get("/notifications/unread-count", response_model=dict)
+async def get_unread_notification_count(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Unread notification count for the inbox badge (single key lookup)
+    """
+    try:
+        _, unread_count = await NotificationService.get_counts(session, current_user.id)
+        return {"unread_count": unread_count}
+
+    except Exception as e:
+        logger.error("Error fetching unread count for user %s: %s", current_user.id, e)
+        raise HTTPException(status_code=500, detail="Failed to fetch unread count")
+
+
+@router.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    current_user: User = Depends(get_stream_user),
+):
+    """
+    Server-Sent Events stream of the current user's new notifications.
+
+    Sends a `notification` event per new notification and a comment line every
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS to keep proxies from closing the connection.
+
+    EventSource clients authenticate with `?ticket=` from POST /auth/stream-ticket.
+    Tickets are single-use, so after a dropped connection the client requests a
+    new ticket and opens a new EventSource instead of relying on auto-reconnect.
+    """
+    user_id = current_user.id
+
+    async def event_stream():
+        async with notification_hub.subscribe(user_id) as queue:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/notifications/mark-all-read", response_model=dict)
+async def mark_all_notifications_read(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Mark every notification of the current user as read
+    """
+    try:
+        updated = await NotificationService.mark_all_read(session, current_user.id)
+        await session.commit()
+        return {"message": f"Marked {updated} notifications as read"}
+
+    except Exception as e:
+        logger.error("Error marking all notifications as read: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to mark notifications as read")
+
+
 @router.get("/notifications/{notification_id}", response_model=dict)
 async def get_single_notification(
     notification_id: int,
@@ -1222,7 +1234,7 @@ async def get_single_notification(
     Retrieve details of a single notification along with sender's user details.
     """
     try:
-        logger.info(f"Fetching notification {notification_id} for user_id: {current_user.id}")
+        logger.info("Fetching notification %s for user_id: %s", notification_id, current_user.id)
 
         # Fetch notification along with sender (recipient) details
         stmt = (
@@ -1261,7 +1273,7 @@ async def get_single_notification(
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error fetching notification {notification_id}: {str(e)}")
+        logger.error("Error fetching notification %s: %s", notification_id, e)
         raise HTTPException(status_code=500, detail="Failed to fetch notification details")
 
 
@@ -1275,28 +1287,18 @@ async def mark_notifications_read(
     Mark multiple notifications as read
     """
     try:
-        result = await session.execute(
-            select(Notification)
-            .where(
-                Notification.id.in_(notification_ids),
-                Notification.recipient_id == current_user.id
-            )
-        )
-        notifications = result.scalars().all()
+        updated = await NotificationService.mark_read(session, current_user.id, notification_ids)
 
-        if not notifications:
+        if updated is None:
             raise HTTPException(status_code=404, detail="No notifications found")
 
-        for notification in notifications:
-            notification.is_read = True
-
         await session.commit()
-        return {"message": f"Marked {len(notifications)} notifications as read"}
+        return {"message": f"Marked {updated} notifications as read"}
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error marking notifications as read: {str(e)}")
+        logger.error("Error marking notifications as read: %s", e)
         raise HTTPException(status_code=500, detail="Failed to mark notifications as read")
 
 @router.delete("/notifications/{notification_id}", response_model=dict)
@@ -1309,51 +1311,18 @@ async def delete_notification(
     Delete a specific notification
     """
     try:
-        notification = await session.get(Notification, notification_id)
-        if not notification or notification.recipient_id != current_user.id:
+        if not await NotificationService.delete(session, current_user.id, notification_id):
             raise HTTPException(status_code=404, detail="Notification not found")
 
-        await session.delete(notification)
         await session.commit()
         return {"message": "Notification deleted successfully"}
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error deleting notification {notification_id}: {str(e)}")
+        logger.error("Error deleting notification %s: %s", notification_id, e)
         raise HTTPException(status_code=500, detail="Failed to delete notification")
 
-# region Background Task Handlers
-async def send_view_notification(
-    session: AsyncSession,
-    company_id: int,
-    viewer: Optional[User]
-):
-    """
-    Background task to send view notification to company owner
-    """
-    try:
-        company = await session.get(Company, company_id)
-        if not company:
-            return
-
-        viewer_name = "Anonymous"
-        if viewer:
-            viewer_name = f"{viewer.first_name} {viewer.last_name}"
-
-        notification = Notification(
-            recipient_id=company.user_id,
-            title="New Company View",
-            message=f"Your company '{company.name}' was viewed by {viewer_name}",
-            created_at=datetime.utcnow()
-        )
-
-        session.add(notification)
-        await session.commit()
-    except Exception as e:
-        logger.error(f"Failed to send view notification: {str(e)}")
-
-
 @router.get("/user/subscription", response_model=dict)
 async def get_user_subscription(
     session: AsyncSession = Depends(get_session),
@@ -1418,7 +1387,7 @@ async def get_user_subscription(
         }
 
     except Exception as e:
-        logger.error(f"Error fetching subscription details: {e}")
+        logger.error("Error fetching subscription details: %s", e)
         raise HTTPException(status_code=500, detail="Failed to retrieve subscription details.")
 
 
@@ -1444,13 +1413,21 @@ async def get_profile_summary(user: User, session: AsyncSession):
 # 📊 Get Engagement Stats (Total Views + Monthly Trends)
 # ---------------------------------------
 async def get_engagement_stats(user: User, session: AsyncSession) -> EngagementStats:
+    now = datetime.utcnow()
+    # Months before the horizon are counted from the rollups only (their partitions may still exist)
+    horizon = datetime.combine(view_rollup_horizon(now), datetime.min.time())
     total_views = await session.scalar(
         select(func.count(CompanyView.id))
         .join(Company)
-        .where(Company.user_id == user.id)
+        .where(Company.user_id == user.id, CompanyView.viewed_at >= horizon)
+    )
+    archived_views = await session.scalar(
+        select(func.coalesce(func.sum(CompanyViewMonthly.total_views), 0))
+        .join(Company)
+        .where(Company.user_id == user.id, CompanyViewMonthly.month < horizon.date())
     )
 
-    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    six_months_ago = now - timedelta(days=180)
     monthly_views = await session.execute(
         select(
             func.to_char(CompanyView.viewed_at, 'YYYY-MM').label("month"),
@@ -1463,7 +1440,7 @@ async def get_engagement_stats(user: User, session: AsyncSession) -> EngagementS
     )
 
     return EngagementStats(
-        total_views=total_views or 0,
+        total_views=(total_views or 0) + (archived_views or 0),
         view_trend={row.month: row.views for row in monthly_views}
     )
 
@@ -1514,15 +1491,22 @@ async def get_top_viewers(user: User, session: AsyncSession):
 # 🔹 Get Stats for Each Company
 # ---------------------------------------
 async def get_company_stats(user: User, session: AsyncSession):
-    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    now = datetime.utcnow()
+    six_months_ago = now - timedelta(days=180)
+    horizon = datetime.combine(view_rollup_horizon(now), datetime.min.time())
 
     company_stats = []
     companies = await session.execute(select(Company).where(Company.user_id == user.id))
     
     for company in companies.scalars():
-        # Total views per company
+        # Total views per company: live rows from the horizon on, rollups before it
         company_views = await session.scalar(
-            select(func.count(CompanyView.id)).where(CompanyView.company_id == company.id)
+            select(func.count(CompanyView.id))
+            .where(CompanyView.company_id == company.id, CompanyView.viewed_at >= horizon)
+        )
+        company_views += await session.scalar(
+            select(func.coalesce(func.sum(CompanyViewMonthly.total_views), 0))
+            .where(CompanyViewMonthly.company_id == company.id, CompanyViewMonthly.month < horizon.date())
         )
 
         # Monthly views per company
@@ -1585,5 +1569,5 @@ async def get_user_stats(
         )
 
     except Exception as e:
-        logger.error(f"Error fetching stats: {str(e)}")
+        logger.error("Error fetching stats: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
@@ -1,4 +1,5 @@
 # app/core/config.py
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,20 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # JWT signing keys as "kid:secret,kid:secret"; tokens are signed with JWT_ACTIVE_KID
+    # (default: the first key) and verified by the kid in their header. Empty: SECRET_KEY only.
+    JWT_SIGNING_KEYS: str = ""
+    JWT_ACTIVE_KID: str = ""
+    # Refresh-token sessions (rotated on every /auth/refresh)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Single-use tickets that authenticate EventSource / download URLs in place of the access token
+    STREAM_TICKET_EXPIRE_SECONDS: int = 30
+    # Logins are buffered and written to user.last_login / login_history at most this often
+    LOGIN_ACTIVITY_FLUSH_SECONDS: float = 5.0
+    # How long a worker serves the cached plan catalog before revalidating its version
+    PLAN_CATALOG_TTL_SECONDS: int = 60
+    # How long a worker trusts its cached token version / is_active per user
+    TOKEN_STATE_CACHE_SECONDS: int = 30
     OTP_EXPIRY_MINUTES: int
     OTP_SECRET_KEY: str
     OTP_LENGTH: int = 6
@@ -18,8 +33,91 @@ class Settings(BaseSettings):
 
     API_BASE_URL:str
 
+    # Monthly partitions for company_views / notification
+    PARTITION_PREMAKE_MONTHS: int = 3
+    COMPANY_VIEWS_RETENTION_MONTHS: int = 24
+    NOTIFICATION_RETENTION_MONTHS: int = 6
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400
+
+    # Subscription lifecycle worker: expiry and renewal reminders
+    SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS: int = 300
+    RENEWAL_REMINDER_DAYS: int = 7
+    RENEWAL_REMINDER_BATCH_SIZE: int = 200
+
+    # Task queue: "postgres" (task table, shared by all processes) or "memory" (single process / tests).
+    # Web workers only enqueue; `python -m app.worker` runs the tasks unless TASK_WORKER_IN_PROCESS is set.
+    TASK_QUEUE_BACKEND: str = "postgres"
+    TASK_WORKER_IN_PROCESS: bool = False
+    # Concurrent tasks per queue in each worker process, as "queue=limit,queue=limit"
+    TASK_QUEUE_CONCURRENCY: str = "default=4,email=8"
+    TASK_POLL_INTERVAL_SECONDS: float = 1.0
+    # A running task not finished after this long is assumed lost with its worker and requeued
+    TASK_VISIBILITY_TIMEOUT_SECONDS: int = 300
+
+    # Notification stream: "postgres" (LISTEN/NOTIFY, shared by all workers) or "memory" (single process / tests)
+    NOTIFICATION_BROKER: str = "postgres"
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Connection pools: DB_MAX_CONNECTIONS is the budget for all processes of one instance.
+    # DB_TASK_WORKER_CONNECTIONS of it go to the `python -m app.worker` process; each web worker
+    # splits the rest, less its LISTEN connection (NOTIFICATION_BROKER=postgres), into pool and
+    # overflow unless DB_POOL_SIZE is set. Set DB_TASK_WORKER_CONNECTIONS=0 without a task worker.
+    DB_MAX_CONNECTIONS: int = 80
+    DB_TASK_WORKER_CONNECTIONS: int = 10
+    DB_POOL_SIZE: int = 0
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_ECHO: bool = False
+
+    # Startup: "strict" keeps a worker unready until the database is at the Alembic head,
+    # "warn" only logs a mismatch, "off" skips the check
+    SCHEMA_CHECK: str = "strict"
+    # Pooled connections each worker opens before reporting ready
+    DB_POOL_WARM_CONNECTIONS: int = 5
+    STARTUP_RETRY_SECONDS: float = 2.0
+
+    # Logging: "json" (one object per line) or "text", written to stderr from a listener thread.
+    # LOG_ROUTE_SAMPLING keeps only a share of the info logs of busy routes, by endpoint name or
+    # route path, e.g. "track_company_view=0.1,/plans=0.01"; warnings and errors are always kept
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_ROUTE_SAMPLING: str = ""
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Tracing: share of requests traced (0 = off; a caller's sampled traceparent is always followed),
+    # exported in batches to an OTLP/HTTP collector ("otlp") or as JSON lines to TRACING_FILE ("file")
+    TRACING_SAMPLE_RATE: float = 0.0
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "thamer-api"
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
 
     class Config:
         env_file = "../.env"
 
-settings = Settings()
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Load settings from the environment / .env on first use.
+    """
+    return Settings()
+
+
+class LazySettings:
+    """
+    Stand-in for the Settings instance that loads it on first attribute access,
+    so importing a module that references `settings` does not require the environment.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = LazySettings()
@@ -1,24 +1,94 @@
 # app/core/db.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from functools import lru_cache
+from typing import Tuple
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from app.models.otp_rate_limit import OTPRateLimit
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel
 from app.core.config import settings
+from app.core.server import pool_limits, worker_count
+from app.core.tracing import instrument_engine
 
-# Create an async engine
-engine = create_async_engine("postgresql+asyncpg://admin:QwErTyUiOp@db:5432/thamer", echo=True)
 
-# Create a sessionmaker for async sessions
-async_session = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+# Set by app.worker before the engine exists: the task worker process sizes its pool
+# from DB_TASK_WORKER_CONNECTIONS instead of a web worker's share
+_task_worker_process = False
+
+
+def use_task_worker_pool() -> None:
+    global _task_worker_process
+    _task_worker_process = True
+
+
+def engine_pool_limits() -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) for this process's engine within DB_MAX_CONNECTIONS;
+    raises ValueError when the budget cannot be met.
+    """
+    if settings.DB_POOL_SIZE:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    if _task_worker_process:
+        try:
+            return pool_limits(settings.DB_TASK_WORKER_CONNECTIONS, settings.DB_MAX_OVERFLOW, 1)
+        except ValueError as e:
+            raise ValueError(f"DB_TASK_WORKER_CONNECTIONS is too small: {e}") from None
+    try:
+        return pool_limits(
+            settings.DB_MAX_CONNECTIONS - settings.DB_TASK_WORKER_CONNECTIONS,
+            settings.DB_MAX_OVERFLOW,
+            worker_count(),
+            # The notification broker's LISTEN connection sits outside the pool
+            reserved_per_worker=1 if settings.NOTIFICATION_BROKER == "postgres" else 0,
+        )
+    except ValueError as e:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS less DB_TASK_WORKER_CONNECTIONS is too small: {e}; "
+            "raise DB_MAX_CONNECTIONS or lower WEB_CONCURRENCY"
+        ) from None
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """
+    The process's async engine, created on first use (one per worker process,
+    pool sized for the worker count), so importing the app needs no settings.
+    """
+    pool_size, max_overflow = engine_pool_limits()
+    engine = create_async_engine(
+        "postgresql+asyncpg://admin:QwErTyUiOp@db:5432/thamer",
+        echo=settings.DB_ECHO,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    # A span per statement in sampled traces
+    instrument_engine(engine)
+    return engine
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(
+        bind=get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
+def async_session() -> AsyncSession:
+    """
+    A new async session bound to the process's engine.
+    """
+    return get_sessionmaker()()
+
+
+async def dispose_engine() -> None:
+    """
+    Close the pooled connections on shutdown, if the engine was ever created.
+    """
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
 
-# Initialize database
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
 
 # Dependency for async session
 async def get_session():
@@ -0,0 +1,147 @@
+# app/core/lifecycle.py
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class Readiness:
+    """
+    Per-worker startup state behind the liveness / readiness endpoints.
+
+    A worker is live as soon as it serves requests, and ready once the schema
+    check passed and its connection pool is warm. It turns unready again when
+    shutdown begins so load balancers stop routing to it while it drains.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.started_at = time.monotonic()
+        self.ready_after: Optional[float] = None
+        self.schema_revision: Optional[str] = None
+        self.warm_connections = 0
+        self.error: Optional[str] = None
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.error = None
+        self.ready_after = round(time.monotonic() - self.started_at, 3)
+
+    def mark_draining(self) -> None:
+        self.ready = False
+        self.draining = True
+
+    def as_dict(self) -> Dict:
+        return {
+            "status": "ready" if self.ready else "draining" if self.draining else "starting",
+            "schema_revision": self.schema_revision,
+            "warm_connections": self.warm_connections,
+            "ready_after_seconds": self.ready_after,
+            "error": self.error,
+        }
+
+
+readiness = Readiness()
+
+
+@lru_cache
+def alembic_heads() -> frozenset:
+    """
+    Head revision(s) of the migration scripts shipped with this build (read once per process).
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return frozenset(ScriptDirectory.from_config(config).get_heads())
+
+
+async def current_revision(connection: AsyncConnection) -> Optional[str]:
+    try:
+        result = await connection.execute(text("SELECT version_num FROM alembic_version"))
+    except ProgrammingError:
+        # No alembic_version table: the database was never migrated
+        await connection.rollback()
+        return None
+    revision = result.scalar()
+    await connection.rollback()
+    return revision
+
+
+async def check_schema(connection: AsyncConnection) -> None:
+    """
+    One query against alembic_version, compared with the shipped head revision.
+
+    Raises:
+        RuntimeError: In "strict" mode when the database is not at the head.
+    """
+    if settings.SCHEMA_CHECK == "off":
+        return
+    revision = await current_revision(connection)
+    readiness.schema_revision = revision
+    heads = alembic_heads()
+    if revision in heads:
+        return
+
+    message = f"Database schema is at revision {revision}, expected {', '.join(sorted(heads))} (run `alembic upgrade head`)"
+    if settings.SCHEMA_CHECK == "strict":
+        raise RuntimeError(message)
+    logger.warning(message)
+
+
+async def open_connections(count: int) -> List[AsyncConnection]:
+    """
+    Check out `count` pooled connections at once, so the pool creates that many.
+    """
+    connections = [get_engine().connect() for _ in range(count)]
+    results = await asyncio.gather(*(connection.start() for connection in connections), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await asyncio.gather(
+            *(connection.close() for connection, result in zip(connections, results) if result is connection)
+        )
+        raise errors[0]
+    return connections
+
+
+async def prepare_database() -> None:
+    """
+    Check the schema revision and warm the connection pool, retrying until both succeed.
+
+    Runs as a background task, so the worker accepts requests (and answers liveness
+    probes) right away and reports ready once the pool holds DB_POOL_WARM_CONNECTIONS
+    open connections.
+    """
+    # Connections beyond the pool size would be discarded again on check-in
+    count = max(1, min(settings.DB_POOL_WARM_CONNECTIONS, get_engine().pool.size()))
+    while True:
+        try:
+            connections = await open_connections(count)
+            try:
+                await check_schema(connections[0])
+            finally:
+                # Closing returns the connections to the pool, where they stay open
+                await asyncio.gather(*(connection.close() for connection in connections))
+            readiness.warm_connections = count
+            readiness.mark_ready()
+            logger.info(f"Ready: {count} pooled connections, schema at {readiness.schema_revision}")
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            readiness.error = str(e)
+            logger.error(f"Startup check failed, retrying in {settings.STARTUP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
@@ -0,0 +1,194 @@
+# app/core/logging_config.py
+import atexit
+import logging
+import queue
+import random
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.tracing import current_span
+
+# Attributes every LogRecord has; anything else was passed with `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# Scope of the request being handled, for route sampling (set by LogContextMiddleware)
+_request_scope: ContextVar[Optional[Scope]] = ContextVar("log_request_scope", default=None)
+
+_SAMPLED_KEY = "app.log_sampled"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, trace ids, `extra=` fields and the traceback.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the caller's thread before a record is queued (the request and span
+    context variables are only visible there): drops sampled-out info logs of
+    the current route and stamps the current trace ids.
+    """
+
+    def __init__(self, route_rates: Dict[str, float]):
+        super().__init__()
+        self.route_rates = route_rates
+
+    def _sampled(self, scope: Scope) -> bool:
+        # Decided once per request so a request's info logs are kept or dropped together
+        sampled = scope.get(_SAMPLED_KEY)
+        if sampled is None:
+            route = scope.get("route")
+            rate = self.route_rates.get(getattr(route, "name", None), self.route_rates.get(getattr(route, "path", None), 1.0))
+            sampled = scope[_SAMPLED_KEY] = rate >= 1 or random.random() < rate
+        return sampled
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.INFO and self.route_rates:
+            scope = _request_scope.get()
+            if scope is not None and not self._sampled(scope):
+                return False
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread, which formats and writes them.
+
+    `msg % args` is rendered here, in the caller's thread, as QueueHandler
+    does: arguments may change after the call, and ORM objects must not be
+    rendered from another thread or outside their session. Only the JSON
+    encoding and the I/O are left to the listener. When the queue is full
+    the record is dropped (and counted) instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AccessLogQueryFilter(logging.Filter):
+    """
+    Drops the query string from uvicorn access log lines: URLs may carry stream tickets or other credentials.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn logs (client, method, path with query, http version, status)
+        if isinstance(record.args, tuple) and len(record.args) == 5 and isinstance(record.args[2], str):
+            args = list(record.args)
+            args[2] = args[2].split("?", 1)[0]
+            record.args = tuple(args)
+        return True
+
+
+def parse_route_rates(value: str) -> Dict[str, float]:
+    """
+    "track_company_view=0.1,/plans=0.01" -> {"track_company_view": 0.1, "/plans": 0.01}
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        route, _, rate = item.rpartition("=")
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """
+    Route all logging through one queue to a stderr handler in a listener thread.
+
+    Idempotent; call once per process (app factory, task worker) before other setup.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stderr)
+        if settings.LOG_FORMAT == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        queue_handler.addFilter(ContextFilter(parse_route_rates(settings.LOG_ROUTE_SAMPLING)))
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(settings.LOG_LEVEL.upper())
+        # A logger filter, so it applies whichever handlers gunicorn gives the access logger
+        logging.getLogger("uvicorn.access").addFilter(AccessLogQueryFilter())
+
+        _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Write out queued records and stop the listener thread.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class LogContextMiddleware:
+    """
+    Makes the current request's scope (and so its matched route) visible to ContextFilter.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
@@ -0,0 +1,38 @@
+# app/core/responses.py
+from typing import Any, Dict, Optional
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    # HttpUrl, Decimal, ...
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode plain Python data (dicts, lists, datetimes, enums, models) to JSON bytes with orjson.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Returning it from an endpoint skips FastAPI's response_model validation, so
+    only use it for content that is already shaped like the declared model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_bytes_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Wrap an already-encoded JSON body (e.g. from a response cache).
+    """
+    return Response(content=body, media_type="application/json", headers=headers)
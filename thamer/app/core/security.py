@@ -1,38 +1,164 @@
 # app/core/security.py
 from passlib.context import CryptContext
-from jose import jwt
+from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
 import random
+import secrets
 import string
 import time
 import hashlib
 import hmac
 from app.core.config import settings
+from app.core.tracing import traced
 
-# Load sensitive information from the environment via Pydantic settings
-SECRET_KEY = settings.SECRET_KEY
+# Secrets are read from settings when first needed, not at import
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-OTP_LENGTH = settings.OTP_LENGTH
-OTP_EXPIRY_MINUTES = settings.OTP_EXPIRY_MINUTES
-OTP_SECRET_KEY = settings.OTP_SECRET_KEY
+
+
+def _parse_signing_keys(value: str) -> Dict[str, str]:
+    keys = {}
+    for item in value.split(","):
+        kid, _, secret = item.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret
+    return keys
+
+
+@lru_cache
+def signing_keys() -> Tuple[Dict[str, str], str]:
+    """
+    Key rotation: add the new key, switch JWT_ACTIVE_KID, drop the old key once its tokens have expired.
+
+    Returns:
+        Tuple[Dict[str, str], str]: Verification keys by kid, and the kid new tokens are signed with.
+    """
+    keys = _parse_signing_keys(settings.JWT_SIGNING_KEYS) or {"default": settings.SECRET_KEY}
+    active_kid = settings.JWT_ACTIVE_KID or next(iter(keys))
+    if active_kid not in keys:
+        raise ValueError(f"JWT_ACTIVE_KID '{active_kid}' is not one of JWT_SIGNING_KEYS")
+    return keys, active_kid
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Password hashing functions
+@traced("bcrypt.hash")
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+@traced("bcrypt.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+class TokenClaims(NamedTuple):
+    """
+    What a verified access token asserts about its user.
+    """
+    user_id: Optional[int]  # None for tokens issued before id claims existed
+    email: str
+    role: Optional[str]
+    token_version: int
+    is_active: bool
+
+
 # JWT token generation
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    keys, active_kid = signing_keys()
+    return jwt.encode(to_encode, keys[active_kid], algorithm=ALGORITHM, headers={"kid": active_kid})
+
+
+def user_token_claims(user) -> dict:
+    """
+    Claims that let requests authorize without loading the user: id, role, token version and is_active.
+    """
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,
+        "tv": user.token_version or 0,
+        "active": user.is_active,
+    }
+
+
+# `typ` claim of stream tickets; access tokens have none
+STREAM_TICKET_TYPE = "stream"
+
+
+def _decode(token: str) -> dict:
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = settings.SECRET_KEY if kid is None else signing_keys()[0].get(kid)
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+def _claims(payload: dict) -> TokenClaims:
+    email = payload.get("sub")
+    if email is None:
+        raise JWTError("Missing subject")
+    return TokenClaims(
+        user_id=payload.get("uid"),
+        email=email,
+        role=payload.get("role"),
+        token_version=payload.get("tv", 0),
+        is_active=payload.get("active", True),
+    )
+
+
+def decode_access_token(token: str) -> TokenClaims:
+    """
+    Verify a token against the key named by its `kid` header (no kid: SECRET_KEY).
+
+    Raises:
+        JWTError: Malformed, expired or badly signed token, an unknown kid, or a stream ticket.
+    """
+    payload = _decode(token)
+    if payload.get("typ") == STREAM_TICKET_TYPE:
+        raise JWTError("Stream tickets are not access tokens")
+    return _claims(payload)
+
+
+def create_stream_ticket(claims: TokenClaims) -> Tuple[str, datetime]:
+    """
+    A short-lived ticket carrying the caller's claims, for URLs that cannot send an Authorization header.
+
+    Returns:
+        Tuple[str, datetime]: The ticket and its expiry.
+    """
+    expire = datetime.utcnow() + timedelta(seconds=settings.STREAM_TICKET_EXPIRE_SECONDS)
+    payload = {
+        "sub": claims.email,
+        "uid": claims.user_id,
+        "role": claims.role,
+        "tv": claims.token_version,
+        "active": claims.is_active,
+        "typ": STREAM_TICKET_TYPE,
+        "jti": secrets.token_hex(16),
+        "exp": expire,
+    }
+    keys, active_kid = signing_keys()
+    return jwt.encode(payload, keys[active_kid], algorithm=ALGORITHM, headers={"kid": active_kid}), expire
+
+
+def decode_stream_ticket(ticket: str) -> Tuple[TokenClaims, str, datetime]:
+    """
+    Verify a stream ticket; single use is enforced by the caller through its jti.
+
+    Returns:
+        Tuple[TokenClaims, str, datetime]: The claims, the jti and the expiry.
+
+    Raises:
+        JWTError: Malformed, expired or badly signed ticket, or not a ticket.
+    """
+    payload = _decode(ticket)
+    if payload.get("typ") != STREAM_TICKET_TYPE or not payload.get("jti"):
+        raise JWTError("Not a stream ticket")
+    return _claims(payload), payload["jti"], datetime.utcfromtimestamp(payload["exp"])
 
 # OTP generation
 def generate_otp(identifier: str) -> str:
@@ -43,16 +169,17 @@ def generate_otp(identifier: str) -> str:
     Returns:
         str: A securely generated OTP.
     """
-    timestamp = int(time.time() / (OTP_EXPIRY_MINUTES * 60))  # Generate time-based window
-    secret = f"{OTP_SECRET_KEY}{identifier}".encode()
+    timestamp = int(time.time() / (settings.OTP_EXPIRY_MINUTES * 60))  # Generate time-based window
+    secret = f"{settings.OTP_SECRET_KEY}{identifier}".encode()
     msg = f"{timestamp}".encode()
     
     # Generate HMAC hash
     digest = hmac.new(secret, msg, hashlib.sha256).digest()
     
     # Convert to a numeric OTP
-    otp = int.from_bytes(digest, "big") % (10 ** OTP_LENGTH)
-    return f"{otp:0{OTP_LENGTH}d}"
+    otp_length = settings.OTP_LENGTH
+    otp = int.from_bytes(digest, "big") % (10 ** otp_length)
+    return f"{otp:0{otp_length}d}"
 
 
 def verify_otp(identifier: str, otp: str) -> bool:
@@ -0,0 +1,53 @@
+# app/core/server.py
+# Process-model helpers shared by gunicorn.conf.py (master) and app.core.db (each worker).
+# Kept free of app imports so the gunicorn master stays small.
+import math
+import os
+from typing import Tuple
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use: the cgroup v2 CPU quota (containers) or the affinity mask.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """
+    WEB_CONCURRENCY when set, else one async worker per available CPU.
+    """
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return available_cpus()
+
+
+def pool_limits(
+    max_connections: int, max_overflow: int, workers: int, reserved_per_worker: int = 0
+) -> Tuple[int, int]:
+    """
+    Split the Postgres connection budget across workers: (pool_size, max_overflow) such that
+    workers * (pool_size + max_overflow + reserved_per_worker) stays within `max_connections`.
+    `reserved_per_worker` counts connections a worker opens outside its pool (the LISTEN
+    connection of the notification broker). max_overflow shrinks when the share is too small;
+    a budget that cannot give every worker one pooled connection is a configuration error.
+    """
+    workers = max(1, workers)
+    share = max_connections // workers - reserved_per_worker
+    if share < 1:
+        raise ValueError(
+            f"{max_connections} database connections cannot serve {workers} worker(s) needing "
+            f"at least {reserved_per_worker + 1} connection(s) each"
+        )
+    max_overflow = max(0, min(max_overflow, share - 1))
+    return share - max_overflow, max_overflow
@@ -0,0 +1,140 @@
+# app/core/services.py
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict
+from app.core.tracing import instrument_boto3_client, instrument_requests_session
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Process-wide clients shared by every router, built on first use.
+
+    boto3 / requests are imported and their clients constructed only when a
+    request first needs them, so importing the app (worker boot, scripts, test
+    collection) needs neither the libraries' import time nor AWS credentials.
+    Construction is guarded by a lock: S3 helpers also run in worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+                    logger.info(f"Service '{name}' initialized")
+        return instance
+
+    @property
+    def s3_bucket(self) -> str:
+        return self._get("s3_bucket", _s3_bucket)
+
+    @property
+    def s3(self):
+        return self._get("s3", _create_s3_client)
+
+    @property
+    def ses(self):
+        return self._get("ses", _create_ses_client)
+
+    @property
+    def http(self):
+        """
+        Pooled HTTP session for the payment gateway (keeps connections alive between calls).
+        """
+        return self._get("http", _create_http_session)
+
+    @property
+    def notification_broker(self):
+        return self._get("notification_broker", _create_notification_broker)
+
+    @property
+    def task_queue(self):
+        return self._get("task_queue", _create_task_queue)
+
+    def close(self) -> None:
+        """
+        Release pooled connections; call on application shutdown.
+        """
+        http = self._instances.pop("http", None)
+        if http is not None:
+            http.close()
+
+
+def _s3_bucket() -> str:
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if not all([bucket, os.getenv("AWS_ACCESS_KEY_ID"), os.getenv("AWS_SECRET_ACCESS_KEY")]):
+        raise ValueError("Missing required AWS S3 credentials in environment variables.")
+    return bucket
+
+
+def _create_s3_client():
+    import boto3
+
+    _s3_bucket()
+    region = os.getenv("S3_REGION", "me-south-1")
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=region,
+        endpoint_url=f"https://s3.{region}.amazonaws.com",
+    )
+    instrument_boto3_client(client)
+    return client
+
+
+# SES calls run in worker threads that the task timeout cannot cancel, so botocore
+# itself gives up well inside the email.send timeout (30s): at most 2 x (3s + 8s)
+SES_CLIENT_TIMEOUTS = {"connect_timeout": 3, "read_timeout": 8, "retries": {"total_max_attempts": 2, "mode": "standard"}}
+
+
+def _create_ses_client():
+    import boto3
+    from botocore.config import Config
+
+    aws_access_key = os.getenv("AWS_ACCESS_KEY")
+    aws_secret_key = os.getenv("AWS_SECRET_KEY")
+    region = os.getenv("AWS_REGION", "us-east-1")
+    if not all([aws_access_key, aws_secret_key, region]):
+        raise ValueError("Missing required environment variables for email service.")
+    client = boto3.client(
+        "ses",
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key,
+        region_name=region,
+        config=Config(**SES_CLIENT_TIMEOUTS),
+    )
+    instrument_boto3_client(client)
+    return client
+
+
+def _create_notification_broker():
+    from app.services.notification_broker import create_broker, notification_hub
+
+    return create_broker(notification_hub)
+
+
+def _create_task_queue():
+    from app.services.task_queue import create_task_queue
+
+    return create_task_queue()
+
+
+def _create_http_session():
+    import requests
+
+    session = requests.Session()
+    instrument_requests_session(session)
+    return session
+
+
+services = ServiceContainer()
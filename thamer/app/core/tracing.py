@@ -0,0 +1,415 @@
+# app/core/tracing.py
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT, PRODUCER, CONSUMER = 1, 2, 3, 4, 5
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation of a sampled trace.
+
+    Use as a context manager to make it the parent of spans started inside
+    (including in `asyncio.to_thread` workers, which copy the context), or
+    call `end` directly for spans that begin and end in separate callbacks.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        exporter().add(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _NoopSpan:
+    """
+    Stand-in returned when the current request is not sampled; every operation is a no-op.
+    """
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def span(name: str, kind: int = INTERNAL, **attributes: Any):
+    """
+    Child span of the current span, or NOOP_SPAN outside a sampled trace.
+
+    Unsampled requests have no current span, so instrumentation costs one
+    context variable lookup.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+def _parse_traceparent(header: str):
+    """
+    (trace_id, parent span id, sampled) from a W3C traceparent header, or None if malformed.
+    """
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3][:2], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, kind: int = SERVER, **attributes: Any):
+    """
+    Root span of a new trace, or NOOP_SPAN when the trace is not sampled.
+
+    A valid W3C `traceparent` from the caller decides sampling and links the
+    trace; otherwise TRACING_SAMPLE_RATE does.
+    """
+    parent = _parse_traceparent(traceparent) if traceparent else None
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+        return Span(name, trace_id, parent_id, kind, attributes) if sampled else NOOP_SPAN
+    rate = settings.TRACING_SAMPLE_RATE
+    if rate <= 0 or random.random() >= rate:
+        return NOOP_SPAN
+    return Span(name, os.urandom(16).hex(), None, kind, attributes)
+
+
+def traced(name: str, kind: int = INTERNAL):
+    """
+    Decorator: run the function (sync or async) inside `span(name)`.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, kind):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def export_otlp(spans: List[Span]) -> None:
+    """
+    POST one batch to an OTLP/HTTP collector using the protocol's JSON encoding.
+    """
+    body = orjson.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": settings.TRACING_SERVICE_NAME, "process.pid": os.getpid()})},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": [_otlp_span(span) for span in spans]}],
+        }]
+    })
+    request = urllib.request.Request(
+        settings.TRACING_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        response.read()
+
+
+def export_file(spans: List[Span]) -> None:
+    """
+    Append one JSON object per span to TRACING_FILE.
+    """
+    with open(settings.TRACING_FILE, "ab") as file:
+        for span in spans:
+            file.write(orjson.dumps({
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "kind": span.kind,
+                "start_ns": span.start_ns,
+                "duration_ms": (span.end_ns - span.start_ns) / 1e6,
+                "attributes": span.attributes,
+                "error": span.error,
+            }, default=str) + b"\n")
+
+
+EXPORTERS = {"otlp": export_otlp, "file": export_file}
+
+
+class SpanExporter:
+    """
+    Buffers finished spans and exports them in batches from a daemon thread,
+    so neither the event loop nor the traced code waits for the collector.
+
+    When the buffer is full (collector down, very high sample rate) new spans are dropped.
+    """
+
+    def __init__(self, export: Callable[[List[Span]], None], interval: float = 2.0, max_buffer: int = 10000):
+        self.export = export
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(span)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._wake.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        try:
+            self.export(batch)
+        except Exception as e:
+            logger.warning(f"Exporting {len(batch)} spans failed: {e}")
+
+    def shutdown(self) -> None:
+        """
+        Stop the export thread and export what is left; call on process shutdown.
+        """
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def exporter() -> SpanExporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = SpanExporter(EXPORTERS[settings.TRACING_EXPORTER])
+    return _exporter
+
+
+def shutdown_tracing() -> None:
+    if _exporter is not None:
+        _exporter.shutdown()
+
+
+class TracingMiddleware:
+    """
+    Starts a server span per sampled HTTP request, named after the matched route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = start_trace("HTTP " + scope["method"], traceparent)
+        if root is NOOP_SPAN:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        with root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Route template as declared on its router (recent FastAPI versions leave out include_router prefixes)
+                route = scope.get("route")
+                path = getattr(route, "path", None)
+                root.name = f"{scope['method']} {path or scope['path']}"
+                root.set_attribute("http.method", scope["method"])
+                root.set_attribute("http.route", path)
+                root.set_attribute("http.target", scope["path"])
+                root.set_attribute("code.function", getattr(route, "name", None))
+
+
+def instrument_engine(engine) -> None:
+    """
+    A client span per statement sent to the database.
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        db_span = span("db.query", CLIENT, **{"db.system": "postgresql", "db.statement": statement[:2000]})
+        if db_span is not NOOP_SPAN and context is not None:
+            context._trace_span = db_span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        db_span = getattr(context, "_trace_span", None)
+        if db_span is not None:
+            db_span.set_attribute("db.rows", cursor.rowcount)
+            db_span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        db_span = getattr(exception_context.execution_context, "_trace_span", None)
+        if db_span is not None:
+            db_span.end(exception_context.original_exception)
+
+
+def instrument_boto3_client(client) -> None:
+    """
+    A client span per AWS API call (S3 HeadObject, SES SendEmail, ...).
+
+    Pre-signing is local and makes no call; wrap it with `traced` where it matters.
+    """
+    service = client.meta.service_model.service_name
+
+    def before_call(model, context, **kwargs):
+        # Parameter validation and serialization are part of the call's time
+        aws_span = span(f"{service}.{model.name}", CLIENT, **{"rpc.system": "aws-api", "rpc.service": service, "rpc.method": model.name})
+        if aws_span is not NOOP_SPAN:
+            context["trace_span"] = aws_span
+
+    def after_call(context, http_response=None, **kwargs):
+        aws_span = context.pop("trace_span", None)
+        if aws_span is not None:
+            aws_span.set_attribute("http.status_code", getattr(http_response, "status_code", None))
+            aws_span.end()
+
+    def after_call_error(context, exception=None, **kwargs):
+        aws_span = context.pop("trace_span", None)
+        if aws_span is not None:
+            aws_span.end(exception)
+
+    # Emitted for every call, also when a before-call handler short-circuits it (stubs)
+    client.meta.events.register("before-parameter-build", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+
+
+def instrument_requests_session(session) -> None:
+    """
+    A client span per outgoing request of a requests.Session (payment gateway).
+    """
+    request = session.request
+
+    @functools.wraps(request)
+    def traced_request(method, url, *args, **kwargs):
+        with span(f"HTTP {method}", CLIENT, **{"http.method": method, "http.url": url}) as http_span:
+            response = request(method, url, *args, **kwargs)
+            http_span.set_attribute("http.status_code", response.status_code)
+            return response
+
+    session.request = traced_request
@@ -0,0 +1,22 @@
+# app/core/workers.py
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+# Seconds of gunicorn's graceful_timeout kept for the lifespan shutdown (writer flushes)
+SHUTDOWN_RESERVE_SECONDS = 10
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Gunicorn worker running the app on uvloop with the httptools parser.
+
+    On SIGTERM uvicorn waits for open connections before running the lifespan
+    shutdown. Notification streams never finish on their own, so they are cut
+    off early enough that the buffered writers still flush before gunicorn
+    kills the worker.
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - SHUTDOWN_RESERVE_SECONDS)
@@ -1,44 +1,116 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.core.db import init_db
-from app.api.v1.endpoints import admin_stats, auth, user, token, admin, payment
+from app.core.compression import CompressionMiddleware, PrecompressedStaticFiles
+from app.core.config import settings
+from app.core.db import dispose_engine, get_engine
+from app.core.lifecycle import prepare_database, readiness
+from app.core.logging_config import LogContextMiddleware, configure_logging
+from app.core.services import services
+from app.core.tracing import TracingMiddleware, shutdown_tracing
+from app.services.background_jobs import background_jobs
+from app.services.partition_service import partition_maintenance_loop
+from app.services.subscription_lifecycle import subscription_lifecycle_loop
+from app.services.task_queue import TaskWorker, parse_concurrency
+from app.api.v1.endpoints import admin_stats, auth, health, user, token, admin, payment
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Create the main FastAPI application
-app = FastAPI(
-    openapi_url="/api/v1/openapi.json",  # Serve OpenAPI schema under /api
-    docs_url="/api/v1/docs",  # Serve Swagger UI under /api/docs
-    redoc_url="/api/v1/redoc",  # Serve ReDoc UI under /api/redoc
-)
-
-# CORS Configuration
-origins = [
-    "http://localhost:3000",  # Add your frontend URL or domains allowed to access the API
-    "https://thamerweb.com",
-]
-app.add_middleware(
-    CORSMiddleware,
-    #allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    allow_origins=["*"],  # Change this for production
-)
-
-# Mount the static directory
-app.mount("/api/v1/static", StaticFiles(directory="app/static"), name="static")
-
-@app.on_event("startup")
-def on_startup():
-    init_db()
-
-# Include Routers
-app.include_router(token.router, prefix="/api/v1", tags=["Token"])
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
-app.include_router(user.router, prefix="/api/v1", tags=["User"])
-app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
-app.include_router(payment.router, prefix="/api/v1/payment", tags=["Payment"])
-app.include_router(admin_stats.router, prefix="/api/v1", tags=["AdminStats"])
+
+async def startup_tasks():
+    await prepare_database()
+    # Partition DDL and the lifecycle worker need the migrated schema, so they wait for the readiness checks
+    await asyncio.gather(partition_maintenance_loop(), subscription_lifecycle_loop())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fails the worker boot when DB_MAX_CONNECTIONS cannot cover this many workers
+    get_engine()
+    await services.notification_broker.start()
+    # Tasks normally run in `python -m app.worker`; the memory queue only exists in this process
+    app.state.task_worker = None
+    if settings.TASK_QUEUE_BACKEND == "memory" or settings.TASK_WORKER_IN_PROCESS:
+        app.state.task_worker = TaskWorker(services.task_queue, parse_concurrency(settings.TASK_QUEUE_CONCURRENCY))
+        app.state.task_worker.start()
+    # Keep a reference so the task is not garbage collected
+    app.state.startup_task = asyncio.create_task(startup_tasks())
+    yield
+    readiness.mark_draining()
+    app.state.startup_task.cancel()
+    await asyncio.gather(app.state.startup_task, return_exceptions=True)
+    if app.state.task_worker is not None:
+        await app.state.task_worker.stop(timeout=5)
+    # Flushes the notification / company view / login activity writers
+    await background_jobs.close()
+    await services.notification_broker.stop()
+    services.close()
+    await dispose_engine()
+    shutdown_tracing()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the application. Logging is configured here, once per worker process, before anything logs.
+    """
+    configure_logging()
+
+    app = FastAPI(
+        lifespan=lifespan,
+        openapi_url="/api/v1/openapi.json",  # Serve OpenAPI schema under /api
+        docs_url="/api/v1/docs",  # Serve Swagger UI under /api/docs
+        redoc_url="/api/v1/redoc",  # Serve ReDoc UI under /api/redoc
+    )
+
+    # CORS Configuration
+    origins = [
+        "http://localhost:3000",  # Add your frontend URL or domains allowed to access the API
+        "https://thamerweb.com",
+    ]
+    app.add_middleware(
+        CORSMiddleware,
+        #allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        allow_origins=["*"],  # Change this for production
+    )
+
+    # Response compression (gzip / brotli)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+    # Exposes the matched route to per-route log sampling
+    app.add_middleware(LogContextMiddleware)
+
+    # Root span per sampled request (TRACING_SAMPLE_RATE); added last so it also times the middlewares above
+    app.add_middleware(TracingMiddleware)
+
+    # Mount the static directory (serves .br / .gz siblings written by scripts/precompress_static.py)
+    app.mount("/api/v1/static", PrecompressedStaticFiles(directory="app/static"), name="static")
+
+    # Include Routers
+    app.include_router(token.router, prefix="/api/v1", tags=["Token"])
+    app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
+    app.include_router(user.router, prefix="/api/v1", tags=["User"])
+    app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
+    app.include_router(payment.router, prefix="/api/v1/payment", tags=["Payment"])
+    app.include_router(admin_stats.router, prefix="/api/v1", tags=["AdminStats"])
+    app.include_router(health.router, prefix="/api/v1", tags=["Health"])
+
+    return app
+
+
+def __getattr__(name: str):
+    # `app.main:app` (gunicorn, uvicorn) builds the app on first access, so importing
+    # this module (task worker, scripts, test collection) needs no environment
+    if name == "app":
+        globals()["app"] = application = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
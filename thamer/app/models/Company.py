@@ -1,7 +1,7 @@
 # app/models/Company.py
 from sqlmodel import SQLModel, Field, Relationship
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy import Integer, String, Column
+from sqlalchemy import Index, Integer, String, Column
 from datetime import datetime
 from typing import Optional, List
 
@@ -13,6 +13,15 @@ from sqlalchemy.orm import column_property
 from sqlalchemy import select, func
 
 class Company(SQLModel, table=True):
+    __table_args__ = (
+        # Listings filter on status and sort by created_at
+        Index("idx_company_status_created_at", "status", "created_at"),
+        Index("idx_company_cr", "cr"),
+        Index("idx_company_user_id", "user_id"),
+        # max(last_updated) is the catalog version used for ETags
+        Index("idx_company_last_updated", "last_updated"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     name: str
     email: str
@@ -1,5 +1,5 @@
 # Ensure correct imports and relationships
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
@@ -7,17 +7,34 @@ from sqlmodel import Field, Relationship, SQLModel
 class CompanyView(SQLModel, table=True):
     __tablename__ = "company_views"
 
-    id: int = Field(default=None, primary_key=True)
-    company_id: int = Field(foreign_key="company.id", index=True)
-    viewer_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
-    viewed_at: datetime = Field(default_factory=datetime.utcnow)
+    # Partitioned by month on viewed_at, so the partition key is part of the primary key
+    id: int = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    company_id: int = Field(foreign_key="company.id")
+    viewer_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    viewed_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
 
     # Use string references to prevent circular imports
     company: Optional["Company"] = Relationship(back_populates="views")
     viewer: Optional["User"] = Relationship(back_populates="company_views")
 
     __table_args__ = (
-        Index("idx_company_views_company_id", "company_id"),
+        # Stats / viewer listings filter on company and range-scan viewed_at
+        Index("idx_company_views_company_viewed_at", "company_id", "viewed_at"),
+        # Duplicate-view check in track_company_view
+        Index("idx_company_views_company_viewer_viewed_at", "company_id", "viewer_id", "viewed_at"),
         Index("idx_company_views_viewer_id", "viewer_id"),
-        Index("idx_company_views_viewed_at", "viewed_at"),
-    )
\ No newline at end of file
+        {"postgresql_partition_by": "RANGE (viewed_at)"},
+    )
+
+
+class CompanyViewMonthly(SQLModel, table=True):
+    """
+    Monthly view totals rolled up from company_views partitions before they are dropped.
+    """
+    __tablename__ = "company_view_monthly"
+
+    company_id: int = Field(foreign_key="company.id", primary_key=True)
+    month: date = Field(primary_key=True)
+    total_views: int = Field(default=0)
+    anonymous_views: int = Field(default=0)
+    authenticated_views: int = Field(default=0)
@@ -1,4 +1,5 @@
 # app/models/Notification.py
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 from typing import Optional
@@ -15,13 +16,31 @@ class NotificationType(str, Enum):
     OTHER = "OTHER"
 
 class Notification(SQLModel, table=True):
-    id: int = Field(default=None, primary_key=True)
+    # Partitioned by month on created_at, so the partition key is part of the primary key
+    __table_args__ = (
+        # Inbox listing: filter on recipient, newest first; is_read included for index-only counts
+        Index("idx_notification_recipient_created_at", "recipient_id", "created_at", postgresql_include=["is_read"]),
+        Index("idx_notification_recipient_unread", "recipient_id", postgresql_where=text("NOT is_read")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: int = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     recipient_id: int = Field(foreign_key="user.id")  # The user receiving the notification
     title: str = Field(..., description="Notification title")
     message: str = Field(..., description="Notification content")
     type: NotificationType = Field(default=NotificationType.GENERAL, description="Type of notification")
     is_read: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
 
     recipient: Optional["User"] = Relationship(back_populates="notifications")
 
+
+class NotificationCounter(SQLModel, table=True):
+    """
+    Per-user notification totals, kept in step with the notification table by NotificationService.
+    """
+    __tablename__ = "notification_counter"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    total_count: int = Field(default=0)
+    unread_count: int = Field(default=0)
@@ -1,9 +1,14 @@
 # app/models/Score.py
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 from typing import Optional
 
 class Score(SQLModel, table=True):
+    __table_args__ = (
+        Index("idx_score_company_id", "company_id"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     company_id: int = Field(foreign_key="company.id")
     year: int = Field(..., description="The year for the score.")
@@ -1,3 +1,4 @@
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional
 from enum import Enum
@@ -11,6 +12,12 @@ class SubscriptionStatus(str, Enum):
     EXPIRED = "expired"
 
 class Subscription(SQLModel, table=True):
+    __table_args__ = (
+        Index("idx_subscription_user_status_end_date", "user_id", "status", "end_date"),
+        # Lifecycle worker: active subscriptions by end date (expiry and renewal reminders)
+        Index("idx_subscription_active_end_date", "end_date", postgresql_where=text("status = 'ACTIVE'")),
+    )
+
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     plan_id: int = Field(foreign_key="subscriptionplan.id")
@@ -20,6 +27,8 @@ class Subscription(SQLModel, table=True):
     status: SubscriptionStatus = Field(default=SubscriptionStatus.ACTIVE)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)  # NEW FIELD
+    # Set when the renewal reminder for this subscription was sent (at most one per subscription)
+    renewal_reminder_sent_at: Optional[datetime.datetime] = Field(default=None)
 
     # ✅ Fix: Explicitly Define Relationships
     user: Optional["User"] = Relationship(back_populates="subscriptions")
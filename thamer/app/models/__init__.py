@@ -6,5 +6,9 @@ from .Score import Score
 from .Notification import Notification
 from .payment import Payment
 from .subscription_plan import SubscriptionPlan
+from .auth_session import AuthSession
+from .login_history import LoginHistory
+from .task import Task
+from .stream_ticket import StreamTicket
 
-__all__ = ["User", "Company", "Subscription", "Score", "Notification", "Payment", "SubscriptionPlan"]
+__all__ = ["User", "Company", "Subscription", "Score", "Notification", "Payment", "SubscriptionPlan", "AuthSession", "LoginHistory", "Task", "StreamTicket"]
@@ -0,0 +1,29 @@
+# app/models/auth_session.py
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class AuthSession(SQLModel, table=True):
+    """
+    One refresh token. Only its SHA-256 hash is stored.
+
+    Rotation revokes the used row and inserts its successor with the same family_id;
+    a revoked token presented again revokes the whole family. Rows are deleted once expired.
+    """
+    __tablename__ = "auth_session"
+    __table_args__ = (
+        Index("idx_auth_session_token_hash", "token_hash", unique=True),
+        Index("idx_auth_session_family_id", "family_id"),
+        Index("idx_auth_session_user_id_expires_at", "user_id", "expires_at"),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    family_id: str = Field(max_length=32)
+    token_hash: str = Field(max_length=64)
+    token_version: int = Field(default=0)  # User.token_version at issue time; a bump invalidates the session
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = Field(default=None)
@@ -0,0 +1,22 @@
+# app/models/login_history.py
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class LoginHistory(SQLModel, table=True):
+    """
+    Append-only audit trail of successful logins, written in batches by LoginActivityWriter.
+    """
+    __tablename__ = "login_history"
+    __table_args__ = (
+        Index("idx_login_history_user_id_logged_in_at", "user_id", "logged_in_at"),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    logged_in_at: datetime = Field(default_factory=datetime.utcnow)
+    ip_address: Optional[str] = Field(default=None, max_length=45)
+    user_agent: Optional[str] = Field(default=None, max_length=255)
+    method: str = Field(default="password", max_length=20)  # "password" (/auth/login) or "token" (/token)
@@ -0,0 +1,20 @@
+# app/models/stream_ticket.py
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class StreamTicket(SQLModel, table=True):
+    """
+    A redeemed stream ticket, by its jti.
+
+    The primary key makes every ticket single-use across workers; rows are
+    deleted once the ticket would have expired anyway.
+    """
+    __tablename__ = "stream_ticket"
+    __table_args__ = (
+        Index("idx_stream_ticket_expires_at", "expires_at"),
+    )
+
+    jti: str = Field(primary_key=True, max_length=32)
+    expires_at: datetime
@@ -0,0 +1,40 @@
+# app/models/task.py
+from sqlalchemy import Column, Index, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class TaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DEAD = "dead"  # Out of attempts; kept for inspection and manual retry
+
+
+class Task(SQLModel, table=True):
+    """
+    A queued unit of work for the task workers (see app.services.task_queue).
+
+    Finished tasks are deleted; queued, running and dead-lettered tasks remain.
+    """
+    __tablename__ = "task"
+    __table_args__ = (
+        # Claim query: next ready task of a queue
+        Index("idx_task_queue_ready", "queue", "run_at", postgresql_where=text("status = 'queued'")),
+        # Reaper: running tasks held past the visibility timeout
+        Index("idx_task_running_locked_at", "locked_at", postgresql_where=text("status = 'running'")),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    queue: str = Field(max_length=50)
+    name: str = Field(max_length=100)
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    status: str = Field(default=TaskStatus.QUEUED, max_length=20)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=5)
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_at: Optional[datetime] = Field(default=None)
+    locked_by: Optional[str] = Field(default=None, max_length=64)
+    last_error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
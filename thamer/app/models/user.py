@@ -28,6 +28,8 @@ class User(SQLModel, table=True):
     reset_otp_expiry: datetime.datetime = Field(default=None, nullable=True)  # Expiry field for reset OTP
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
+    # Bumped to revoke every access token issued so far (deactivation, password reset, ...)
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     deleted_at: Optional[datetime.datetime] = Field(default=None)
@@ -39,6 +41,10 @@ class User(SQLModel, table=True):
     last_login: Optional[datetime.datetime] = Field(default=None)
     last_login_ip: Optional[str] = Field(default=None)
 
+    # Denormalized entitlement: latest end_date of the user's active subscriptions (None: not subscribed).
+    # Maintained by app.services.subscription_lifecycle on every subscription change and expiry.
+    subscription_expires_at: Optional[datetime.datetime] = Field(default=None)
+
     # Relationship to Subscription
     subscriptions: List["Subscription"] = Relationship(back_populates="user")
 
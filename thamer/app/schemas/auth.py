@@ -34,6 +34,15 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_at: str
+    refresh_token: Optional[str] = None
+    refresh_expires_at: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_at: str
 
 
 class CompanyRegistrationRequest(BaseModel):
@@ -1,6 +1,6 @@
 # app/schemas/company.py
 from pydantic import BaseModel, Field, HttpUrl, EmailStr, validator
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.schemas.common import PaginationBase
 
@@ -74,6 +74,73 @@ class CompanyInput(BaseModel):
         }
 
 
+class CompanyImportInput(CompanyInput):
+    """
+    Schema for one company in a bulk import (CSV rows sharing a CR are grouped into this shape).
+    """
+    owner_email: Optional[EmailStr] = Field(None, description="Email of the owning user (defaults to the importer)")
+
+
+class ImportRowError(BaseModel):
+    """
+    Validation or insert errors for one company of a bulk import.
+    """
+    row: int  # Line number in the uploaded file (first line of the company for CSV)
+    cr: Optional[str]
+    errors: List[str]
+
+
+class CompanyImportReport(BaseModel):
+    """
+    Result of a bulk company import.
+    """
+    total: int
+    imported: int
+    failed: int
+    dry_run: bool
+    company_ids: List[int]
+    errors: List[ImportRowError]
+
+
+class CompanyModerationItem(BaseModel):
+    """
+    One admin decision in a batch moderation request.
+    """
+    company_id: int
+    decision: Literal["approved", "rejected"] = Field(..., description="Admin can only select 'approved' or 'rejected'")
+    reason: Optional[str] = Field(None, description="Required when the decision is 'rejected'")
+
+
+class CompanyModerationRequest(BaseModel):
+    """
+    Schema for batch company moderation.
+    """
+    items: List[CompanyModerationItem] = Field(..., min_length=1, max_length=500)
+
+
+class CompanyModerationResult(BaseModel):
+    """
+    Outcome of one moderation decision.
+    """
+    company_id: int
+    result: Literal["updated", "unchanged", "not_found", "invalid"]
+    message: str
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    last_updated: Optional[datetime] = None
+
+
+class CompanyModerationResponse(BaseModel):
+    """
+    Result of a batch moderation request, one entry per submitted item in request order.
+    """
+    updated: int
+    unchanged: int
+    failed: int
+    results: List[CompanyModerationResult]
+
+
 class FileResponse(BaseModel):
     """
     Schema for file details including pre-signed URL and object key.
@@ -117,6 +184,7 @@ class CompanyResponse(BaseModel):
     created_at: datetime
     last_updated: datetime
     scores: List[ScoreResponse] = []
+    view_count: int = 0
 
     # **Fix: Add missing fields**
     status: str  # Ensure company status is included
@@ -2,7 +2,7 @@
 
 from app.schemas.common import PaginationBase
 from pydantic import BaseModel, EmailStr
-from typing import List
+from typing import List, Optional
 import datetime
 from enum import Enum
 
@@ -43,4 +43,18 @@ class UserResponse(BaseModel):
 
 
 class UserPaginationResponse(PaginationBase[UserResponse]):
-    data: List[UserResponse]
\ No newline at end of file
+    data: List[UserResponse]
+
+
+class LoginHistoryEntry(BaseModel):
+    """
+    One successful login of a user.
+    """
+    logged_in_at: datetime.datetime
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    method: str
+
+
+class LoginHistoryPaginationResponse(PaginationBase[LoginHistoryEntry]):
+    data: List[LoginHistoryEntry]
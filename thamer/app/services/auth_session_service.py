@@ -0,0 +1,158 @@
+# app/services/auth_session_service.py
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.models.auth_session import AuthSession
+from app.models.stream_ticket import StreamTicket
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # Refresh tokens are 256 random bits, so a fast hash is enough (no bcrypt)
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def create_auth_session(
+    session: AsyncSession,
+    user_id: int,
+    token_version: int,
+    family_id: Optional[str] = None,
+) -> Tuple[str, datetime]:
+    """
+    Add a refresh-token session for the user; committed by the caller.
+
+    Returns:
+        Tuple[str, datetime]: The refresh token (only ever returned here) and its expiry.
+    """
+    refresh_token = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    session.add(AuthSession(
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=hash_refresh_token(refresh_token),
+        token_version=token_version,
+        expires_at=expires_at,
+    ))
+    return refresh_token, expires_at
+
+
+async def delete_expired_sessions(session: AsyncSession, user_id: int) -> None:
+    """
+    Drop the user's expired sessions (revoked rows are kept until expiry for reuse detection).
+    """
+    await session.execute(
+        delete(AuthSession).where(AuthSession.user_id == user_id, AuthSession.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rotate_refresh_token(session: AsyncSession, refresh_token: str):
+    """
+    Exchange a refresh token for its successor. Commits.
+
+    The used row is revoked with one conditional UPDATE ... RETURNING, so two
+    concurrent refreshes with the same token cannot both succeed. Presenting an
+    already-rotated token revokes the whole family (the token was stolen or replayed).
+
+    Returns:
+        Tuple of the user row (id, email, role, token_version, is_active), the new
+        refresh token and its expiry.
+    """
+    now = datetime.utcnow()
+    token_hash = hash_refresh_token(refresh_token)
+
+    result = await session.execute(
+        update(AuthSession)
+        .where(AuthSession.token_hash == token_hash, AuthSession.revoked_at.is_(None), AuthSession.expires_at > now)
+        .values(revoked_at=now)
+        .returning(AuthSession.user_id, AuthSession.family_id, AuthSession.token_version)
+        .execution_options(synchronize_session=False)
+    )
+    used = result.first()
+
+    if used is None:
+        family_id = await session.scalar(
+            select(AuthSession.family_id).where(AuthSession.token_hash == token_hash, AuthSession.revoked_at.is_not(None))
+        )
+        if family_id:
+            await revoke_session_family(session, family_id)
+            await session.commit()
+            logger.warning(f"Refresh token reuse detected; revoked session family {family_id}")
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    user = (await session.execute(
+        select(User.id, User.email, User.role, User.token_version, User.is_active).where(User.id == used.user_id)
+    )).first()
+    if user is None or not user.is_active or (user.token_version or 0) != used.token_version:
+        await revoke_session_family(session, used.family_id)
+        await session.commit()
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    new_token, expires_at = create_auth_session(session, user.id, used.token_version, family_id=used.family_id)
+    await session.commit()
+    return user, new_token, expires_at
+
+
+async def revoke_session_family(session: AsyncSession, family_id: str) -> None:
+    await session.execute(
+        update(AuthSession)
+        .where(AuthSession.family_id == family_id, AuthSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def revoke_refresh_token(session: AsyncSession, refresh_token: str) -> bool:
+    """
+    Log out one device: revoke the session family of `refresh_token`. Committed by the caller.
+    """
+    family_id = await session.scalar(
+        select(AuthSession.family_id).where(AuthSession.token_hash == hash_refresh_token(refresh_token))
+    )
+    if family_id is None:
+        return False
+    await revoke_session_family(session, family_id)
+    return True
+
+
+async def revoke_user_sessions(session: AsyncSession, user_id: int) -> None:
+    """
+    Log out every device of the user. Committed by the caller.
+    """
+    await session.execute(
+        update(AuthSession)
+        .where(AuthSession.user_id == user_id, AuthSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def redeem_stream_ticket(session: AsyncSession, jti: str, expires_at: datetime) -> bool:
+    """
+    Mark a stream ticket used; False if it already was (in any worker). Commits.
+
+    Expired tickets are purged on the way: their signature check fails anyway.
+    """
+    await session.execute(
+        delete(StreamTicket).where(StreamTicket.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(
+        pg_insert(StreamTicket).values(jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[StreamTicket.jti])
+        .returning(StreamTicket.jti)
+    )
+    redeemed = result.first() is not None
+    await session.commit()
+    return redeemed
@@ -0,0 +1,211 @@
+# app/services/background_jobs.py
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter(ABC):
+    """
+    Buffers small writes in memory and applies them in batches with a short-lived session.
+
+    A flush happens `flush_interval` seconds after the first buffered item, or
+    immediately once `max_batch_size` items are waiting. Subclasses implement
+    `write_batch`; the session is committed after each batch.
+
+    A batch that fails is not lost: after an integrity or data error it is
+    written again item by item, so only the offending items are dropped; after
+    any other error (database down, connection lost) it goes back to the front
+    of the buffer and is retried with exponential backoff. The buffer holds at
+    most `max_buffer_size` items; beyond that the oldest are dropped and counted.
+    """
+
+    name = "batch_writer"
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        max_batch_size: int = 200,
+        flush_interval: Optional[float] = None,
+        max_buffer_size: int = 10000,
+        retry_base: float = 1.0,
+        retry_max: float = 60.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_buffer_size = max_buffer_size
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.dropped = 0
+        self._flush_interval = flush_interval
+        self._buffer: List[Any] = []
+        self._failures = 0
+        self._batch_full = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def flush_interval(self) -> float:
+        if self._flush_interval is None:
+            self._flush_interval = self.default_flush_interval()
+        return self._flush_interval
+
+    def default_flush_interval(self) -> float:
+        """
+        Used when no `flush_interval` is given; read on first flush, so subclasses can take it from settings.
+        """
+        return 0.5
+
+    @abstractmethod
+    async def write_batch(self, session: AsyncSession, batch: List[Any]) -> None:
+        """
+        Apply one batch with `session`; the caller commits.
+        """
+
+    def _add(self, item: Any) -> None:
+        """
+        Buffer one item for the next batch. Must be called from the event loop.
+        """
+        self._buffer.append(item)
+        self._trim()
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+        if len(self._buffer) >= self.max_batch_size:
+            self._batch_full.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffer_size
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error(f"{self.name}: buffer full, dropped the {overflow} oldest items ({self.dropped} in total)")
+
+    def _retry_delay(self) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** (self._failures - 1))
+
+    @staticmethod
+    async def _wait(event: asyncio.Event, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _flush_later(self) -> None:
+        if self._failures:
+            # Backing off after a failed write: only shutdown cuts the wait short
+            await self._wait(self._closing, self._retry_delay())
+        else:
+            await self._wait(self._batch_full, self.flush_interval)
+        self._batch_full.clear()
+        try:
+            await self.flush()
+        except Exception as e:
+            # Nobody awaits this task; an escaping error would leave the buffer without a flush scheduled
+            logger.error(f"{self.name}: flush failed: {e}")
+        if self._buffer and not self._closing.is_set():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _write(self, batch: List[Any]) -> None:
+        async with self.session_factory() as session:
+            try:
+                await self.write_batch(session, batch)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def _write_each(self, batch: List[Any]) -> None:
+        """
+        Write `batch` one item per transaction, dropping items that violate a constraint.
+
+        Written and dropped items are removed from `batch`, so on another error it holds what is left.
+        """
+        while batch:
+            try:
+                await self._write(batch[:1])
+            except (IntegrityError, DataError) as e:
+                self.dropped += 1
+                logger.error(f"{self.name}: dropped an item that cannot be written: {e}")
+            del batch[:1]
+
+    async def flush(self) -> None:
+        """
+        Write everything currently buffered; on a transient error, requeue the batch and stop.
+        """
+        while self._buffer:
+            batch = self._buffer[:self.max_batch_size]
+            del self._buffer[:self.max_batch_size]
+
+            try:
+                try:
+                    await self._write(batch)
+                except (IntegrityError, DataError) as e:
+                    logger.warning(f"{self.name}: batch of {len(batch)} items rejected ({e}), writing items one by one")
+                    await self._write_each(batch)
+            except Exception as e:
+                self._buffer[:0] = batch
+                self._trim()
+                self._failures += 1
+                logger.error(
+                    f"{self.name}: failed to write {len(batch)} items (attempt {self._failures}), "
+                    f"retrying in {self._retry_delay():.0f}s: {e}"
+                )
+                return
+            self._failures = 0
+
+    async def close(self) -> None:
+        """
+        Flush pending items; call on application shutdown.
+        """
+        self._closing.set()
+        if self._flush_task and not self._flush_task.done():
+            self._batch_full.set()
+            await self._flush_task
+        await self.flush()
+        if self._buffer:
+            self.dropped += len(self._buffer)
+            logger.error(f"{self.name}: {len(self._buffer)} items could not be written before shutdown")
+            self._buffer.clear()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+
+class BatchWriterRegistry:
+    """
+    The process's batch writers, so their backlog is reported in `stats` and flushed on `close`.
+
+    Post-response database work goes through a BatchWriter (its own short-lived
+    session per batch) or the task queue, never through the request's session,
+    which `get_session` closes when the request ends.
+    """
+
+    def __init__(self):
+        self._writers: List[BatchWriter] = []
+
+    def register_writer(self, writer: BatchWriter) -> BatchWriter:
+        self._writers.append(writer)
+        return writer
+
+    async def close(self) -> None:
+        """
+        Flush every registered writer; call on application shutdown.
+        """
+        for writer in self._writers:
+            await writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered_writes": {writer.name: writer.pending for writer in self._writers},
+            "dropped_writes": {writer.name: writer.dropped for writer in self._writers},
+        }
+
+
+background_jobs = BatchWriterRegistry()
@@ -0,0 +1,316 @@
+# app/services/company_import_service.py
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import String, any_, insert, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.Company import Company
+from app.models.Score import Score
+from app.models.user import User
+from app.schemas.company import CompanyImportInput, CompanyImportReport, ImportRowError
+from app.services.export_service import CSV_FORMULA_PREFIXES
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# CSV layout matches the company export: one line per score, company columns repeated
+CSV_COMPANY_COLUMNS = [
+    "name", "email", "phone_number", "cr", "website", "description", "tagline",
+    "linkedin", "facebook", "twitter", "instagram", "owner_email",
+]
+CSV_SCORE_COLUMNS = {"score_year": "year", "score": "score", "score_type": "score_type", "score_file": "file_key"}
+
+ALLOWED_IMPORT_STATUSES = ("pending", "approved")
+
+_companies_adapter = TypeAdapter(List[CompanyImportInput])
+
+
+def _unescape_csv_formula(value: str) -> str:
+    """
+    Undo the quote the CSV export puts before formula-like values, so exports import unchanged.
+    """
+    if value.startswith("'") and value[1:].startswith(CSV_FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def _split_list(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+
+def _csv_company(row: Dict[str, str]) -> dict:
+    record = {column: row.get(column) or None for column in CSV_COMPANY_COLUMNS}
+    record["logo_key"] = row.get("logo") or None
+    record["awards"] = _split_list(row.get("awards"))
+    record["sectors"] = _split_list(row.get("sectors"))
+    return record
+
+
+def parse_csv(text: str) -> Tuple[List[Tuple[int, dict]], List[ImportRowError]]:
+    """
+    Parse CSV into (line number, company dict) pairs; lines sharing a CR become one company with several scores.
+
+    A line whose company columns differ from the first line with its CR is
+    reported instead of merged: two companies cannot share a CR.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    companies: Dict[str, Tuple[int, dict]] = {}
+    errors: List[ImportRowError] = []
+
+    for row in reader:
+        row = {key.strip(): _unescape_csv_formula((value or "").strip()) for key, value in row.items() if key}
+        line = reader.line_num
+        key = row.get("cr") or f"line-{line}"
+        company = _csv_company(row)
+
+        if key not in companies:
+            companies[key] = (line, {**company, "scores": []})
+        else:
+            first_line, first = companies[key]
+            conflicts = [column for column, value in company.items() if value != first[column]]
+            if conflicts:
+                errors.append(ImportRowError(
+                    row=line,
+                    cr=row.get("cr"),
+                    errors=[f"Duplicate CR {key} in the import file: {', '.join(conflicts)} differ from line {first_line}."],
+                ))
+                continue
+
+        if any(row.get(column) for column in CSV_SCORE_COLUMNS):
+            companies[key][1]["scores"].append(
+                {field: row.get(column) or None for column, field in CSV_SCORE_COLUMNS.items()}
+            )
+
+    return list(companies.values()), errors
+
+
+def parse_jsonl(text: str) -> Tuple[List[Tuple[int, dict]], List[ImportRowError]]:
+    """
+    Parse JSON Lines (one CompanyImportInput object per line).
+    """
+    records, errors = [], []
+    for line, raw in enumerate(text.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        try:
+            records.append((line, json.loads(raw)))
+        except ValueError as e:
+            errors.append(ImportRowError(row=line, cr=None, errors=[f"Invalid JSON: {e}"]))
+    return records, errors
+
+
+def validate_records(records: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, CompanyImportInput]], List[ImportRowError]]:
+    """
+    Validate all records in one pass of a List[...] adapter; failing rows are reported and dropped.
+    """
+    try:
+        companies = _companies_adapter.validate_python([record for _, record in records])
+        return [(line, company) for (line, _), company in zip(records, companies)], []
+    except ValidationError as e:
+        failures: Dict[int, List[str]] = {}
+        for error in e.errors():
+            index, *field = error["loc"]
+            failures.setdefault(index, []).append(f"{'.'.join(str(part) for part in field) or 'row'}: {error['msg']}")
+
+    errors = [
+        ImportRowError(row=records[index][0], cr=str(records[index][1].get("cr") or "") or None, errors=messages)
+        for index, messages in sorted(failures.items())
+    ]
+    remaining = [record for index, record in enumerate(records) if index not in failures]
+    valid, _ = validate_records(remaining) if remaining else ([], [])
+    return valid, errors
+
+
+async def find_existing_crs(session: AsyncSession, crs: List[str]) -> set:
+    """
+    CRs that already exist, with one query for the whole import.
+    """
+    if not crs:
+        return set()
+    result = await session.execute(
+        select(Company.cr).where(Company.cr == any_(literal(crs, ARRAY(String))))
+    )
+    return set(result.scalars().all())
+
+
+async def find_owner_ids(session: AsyncSession, emails: List[str]) -> Dict[str, int]:
+    if not emails:
+        return {}
+    result = await session.execute(
+        select(User.email, User.id).where(User.email == any_(literal(emails, ARRAY(String))))
+    )
+    return {email: user_id for email, user_id in result.all()}
+
+
+async def check_s3_keys(keys: List[str], validate_key: Callable[[str], None], concurrency: int = 16) -> Dict[str, str]:
+    """
+    Run the blocking S3 existence check for every key concurrently in worker threads.
+
+    Returns:
+        Dict[str, str]: Error message per missing / unreadable key.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    failures: Dict[str, str] = {}
+
+    async def check(key: str) -> None:
+        async with semaphore:
+            try:
+                await asyncio.to_thread(validate_key, key)
+            except HTTPException as e:
+                failures[key] = e.detail
+            except Exception as e:
+                # S3 / network errors fail this key's row, not the whole import
+                logger.error(f"Checking S3 key {key} failed: {e}")
+                failures[key] = f"Could not check file {key}."
+
+    await asyncio.gather(*(check(key) for key in keys))
+    return failures
+
+
+async def import_companies(
+    session: AsyncSession,
+    content: str,
+    import_format: str,
+    importer: User,
+    validate_key: Callable[[str], None],
+    status: str = "pending",
+    dry_run: bool = False,
+    chunk_size: int = 500,
+) -> CompanyImportReport:
+    """
+    Validate and insert companies with their scores from CSV or JSONL content.
+
+    Rows are validated together, CR uniqueness and owners are resolved with one query
+    each, S3 keys are checked concurrently, and valid companies are inserted with
+    multi-row INSERT ... RETURNING in transactions of `chunk_size` companies. A
+    failed chunk is rolled back and reported without affecting the other chunks.
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format. Use one of: {', '.join(IMPORT_FORMATS)}.")
+    if status not in ALLOWED_IMPORT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Use one of: {', '.join(ALLOWED_IMPORT_STATUSES)}.")
+
+    if import_format == "csv":
+        records, errors = parse_csv(content)
+    else:
+        records, errors = parse_jsonl(content)
+    total = len(records) + len(errors)
+
+    valid, validation_errors = validate_records(records)
+    errors.extend(validation_errors)
+
+    existing_crs = await find_existing_crs(session, list({company.cr for _, company in valid}))
+    owner_ids = await find_owner_ids(session, list({company.owner_email for _, company in valid if company.owner_email}))
+
+    keys = {company.logo_key for _, company in valid if company.logo_key}
+    keys.update(score.file_key for _, company in valid for score in company.scores or [])
+    missing_keys = await check_s3_keys(sorted(keys), validate_key)
+
+    accepted: List[Tuple[int, CompanyImportInput, int]] = []
+    seen_crs = set()
+    for line, company in valid:
+        row_errors = []
+        if company.cr in existing_crs:
+            row_errors.append(f"A company with CR {company.cr} already exists.")
+        elif company.cr in seen_crs:
+            row_errors.append(f"Duplicate CR {company.cr} in the import file.")
+        seen_crs.add(company.cr)
+
+        owner_id = importer.id
+        if company.owner_email:
+            owner_id = owner_ids.get(company.owner_email)
+            if owner_id is None:
+                row_errors.append(f"Owner {company.owner_email} not found.")
+
+        for key in [company.logo_key, *(score.file_key for score in company.scores or [])]:
+            if key in missing_keys:
+                row_errors.append(missing_keys[key])
+
+        if row_errors:
+            errors.append(ImportRowError(row=line, cr=company.cr, errors=row_errors))
+        else:
+            accepted.append((line, company, owner_id))
+
+    company_ids: List[int] = []
+    if not dry_run:
+        for start in range(0, len(accepted), chunk_size):
+            chunk = accepted[start:start + chunk_size]
+            try:
+                company_ids.extend(await _insert_chunk(session, chunk, status))
+                await session.commit()
+            except SQLAlchemyError as e:
+                await session.rollback()
+                logger.error(f"Company import chunk starting at row {chunk[0][0]} failed: {e}")
+                errors.extend(ImportRowError(row=line, cr=company.cr, errors=["Insert failed; chunk rolled back."]) for line, company, _ in chunk)
+
+    imported = len(company_ids) if not dry_run else len(accepted)
+    logger.info(f"Company import by {importer.email}: {imported}/{total} {'valid (dry run)' if dry_run else 'imported'}, {len(errors)} failed")
+    return CompanyImportReport(
+        total=total,
+        imported=imported,
+        failed=len(errors),
+        dry_run=dry_run,
+        company_ids=company_ids,
+        errors=sorted(errors, key=lambda error: error.row),
+    )
+
+
+async def _insert_chunk(session: AsyncSession, chunk: List[Tuple[int, CompanyImportInput, int]], status: str) -> List[int]:
+    now = datetime.utcnow()
+    company_rows = [
+        {
+            "name": company.name,
+            "email": str(company.email),
+            "phone_number": company.phone_number,
+            "cr": company.cr,
+            "website": str(company.website) if company.website else None,
+            "description": company.description,
+            "tagline": company.tagline,
+            "linkedin": str(company.linkedin) if company.linkedin else None,
+            "facebook": str(company.facebook) if company.facebook else None,
+            "twitter": str(company.twitter) if company.twitter else None,
+            "instagram": str(company.instagram) if company.instagram else None,
+            "logo": company.logo_key,
+            "awards": company.awards,
+            "sectors": company.sectors,
+            "status": status,
+            "user_id": owner_id,
+            "view_count": 0,
+            "created_at": now,
+            "last_updated": now,
+        }
+        for _, company, owner_id in chunk
+    ]
+    result = await session.execute(
+        insert(Company).returning(Company.id, sort_by_parameter_order=True),
+        company_rows,
+    )
+    ids = list(result.scalars().all())
+
+    score_rows = [
+        {
+            "company_id": company_id,
+            "year": score.year,
+            "score": score.score,
+            "score_type": score.score_type,
+            "file": score.file_key,
+            "created_at": now,
+        }
+        for company_id, (_, company, _) in zip(ids, chunk)
+        for score in company.scores or []
+    ]
+    if score_rows:
+        await session.execute(insert(Score), score_rows)
+    return ids
@@ -0,0 +1,143 @@
+# app/services/company_moderation_service.py
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, String, any_, column, literal, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.Company import Company
+from app.models.Notification import NotificationType
+from app.schemas.company import CompanyModerationItem, CompanyModerationResponse, CompanyModerationResult
+from app.services.http_cache import invalidate_company
+from app.services.notification_service import notification_writer
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_company_status(old_status: str, decision: str) -> str:
+    """
+    The status a company moves to when an admin approves or rejects it.
+
+    - Approving always sets `"approved"`.
+    - Rejecting an `"approved"` company sets `"re-evaluation"`.
+    - Rejecting a `"pending"`, `"re-evaluation"` or `"revision-requested"` company sets `"rejected"`.
+    - Anything else is left unchanged.
+    """
+    if decision == "approved":
+        return "approved"
+    if old_status == "approved":
+        return "re-evaluation"
+    if old_status in ["pending", "re-evaluation", "revision-requested"]:
+        return "rejected"
+    return old_status
+
+
+def status_change_message(company_name: str, new_status: str, rejection_reason: Optional[str]) -> str:
+    return f"Your company '{company_name}' is now {new_status}." + (f" Reason: {rejection_reason}" if rejection_reason else "")
+
+
+async def moderate_companies(session: AsyncSession, items: List[CompanyModerationItem], admin_email: str) -> CompanyModerationResponse:
+    """
+    Apply a batch of admin decisions with the same rules as a single validation.
+
+    The affected companies are locked and read with one SELECT ... FOR UPDATE, the
+    new statuses are written with one UPDATE ... FROM (VALUES ...) in a single
+    transaction, and owners are notified through the buffered notification writer.
+    Results are returned per item, in request order.
+    """
+    results: Dict[int, CompanyModerationResult] = {}
+    decisions: Dict[int, CompanyModerationItem] = {}
+
+    occurrences = Counter(item.company_id for item in items)
+    for item in items:
+        if occurrences[item.company_id] > 1:
+            results[item.company_id] = CompanyModerationResult(
+                company_id=item.company_id, result="invalid", message="Company appears more than once in the batch.",
+            )
+        elif item.decision == "rejected" and not item.reason:
+            results[item.company_id] = CompanyModerationResult(
+                company_id=item.company_id, result="invalid", message="Rejection reason is required for rejection.",
+            )
+        else:
+            decisions[item.company_id] = item
+
+    companies = {}
+    if decisions:
+        result = await session.execute(
+            select(Company.id, Company.name, Company.user_id, Company.status, Company.rejection_reason, Company.last_updated)
+            .where(Company.id == any_(literal(list(decisions), ARRAY(Integer))))
+            .order_by(Company.id)  # Consistent lock order across concurrent batches
+            .with_for_update()
+        )
+        companies = {row.id: row for row in result.all()}
+
+    now = datetime.utcnow()
+    changes = []
+    for company_id, item in decisions.items():
+        company = companies.get(company_id)
+        if company is None:
+            results[company_id] = CompanyModerationResult(company_id=company_id, result="not_found", message="Company not found.")
+            continue
+
+        new_status = resolve_company_status(company.status, item.decision)
+        if new_status == company.status:
+            results[company_id] = CompanyModerationResult(
+                company_id=company_id,
+                result="unchanged",
+                message=f"Company '{company.name}' is already {new_status}.",
+                old_status=company.status,
+                new_status=new_status,
+                rejection_reason=company.rejection_reason,
+                last_updated=company.last_updated,
+            )
+            continue
+
+        rejection_reason = item.reason if new_status == "rejected" else None
+        changes.append((company_id, new_status, rejection_reason))
+        results[company_id] = CompanyModerationResult(
+            company_id=company_id,
+            result="updated",
+            message=f"Company '{company.name}' status changed from '{company.status}' to '{new_status}'.",
+            old_status=company.status,
+            new_status=new_status,
+            rejection_reason=rejection_reason,
+            last_updated=now,
+        )
+
+    if changes:
+        decided = values(
+            column("company_id", Integer),
+            column("status", String),
+            column("rejection_reason", String),
+            name="decisions",
+        ).data(changes)
+        await session.execute(
+            update(Company)
+            .where(Company.id == decided.c.company_id)
+            .values(status=decided.c.status, rejection_reason=decided.c.rejection_reason, last_updated=now)
+            .execution_options(synchronize_session=False)
+        )
+    # Commit even without changes to release the row locks
+    await session.commit()
+
+    for company_id, new_status, rejection_reason in changes:
+        invalidate_company(company_id)
+        company = companies[company_id]
+        notification_writer.enqueue(
+            company.user_id,
+            "Company status updated",
+            status_change_message(company.name, new_status, rejection_reason),
+            NotificationType.SYSTEM,
+        )
+
+    ordered = [results[item.company_id] for item in items]
+    counts = Counter(entry.result for entry in ordered)
+    logger.info(f"Admin {admin_email} moderated {len(items)} companies: {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return CompanyModerationResponse(
+        updated=counts["updated"],
+        unchanged=counts["unchanged"],
+        failed=len(ordered) - counts["updated"] - counts["unchanged"],
+        results=ordered,
+    )
@@ -0,0 +1,94 @@
+# app/services/company_profile.py
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+from app.models.Company import Company
+from app.schemas.company import CompanyResponse, FileResponse, ScoreResponse
+from app.services.http_cache import company_profile_cache, presign_epoch
+
+
+class CompanyProfileVersion(NamedTuple):
+    """
+    The per-request part of a company profile: owner for the access check,
+    version for the ETag and the cache, and the live view counter.
+    """
+    user_id: int
+    last_updated: datetime
+    view_count: int
+
+
+async def get_company_profile_version(session: AsyncSession, company_id: int) -> Optional[CompanyProfileVersion]:
+    result = await session.execute(
+        select(Company.user_id, Company.last_updated, Company.view_count).where(Company.id == company_id)
+    )
+    row = result.first()
+    return CompanyProfileVersion(*row) if row else None
+
+
+async def load_company_profile(session: AsyncSession, company_id: int, sign_url: Callable[[str], str]) -> Optional[CompanyResponse]:
+    """
+    Company with its scores and pre-signed logo / score file URLs, without view_count.
+    """
+    result = await session.execute(
+        select(Company).where(Company.id == company_id).options(joinedload(Company.scores))
+    )
+    company = result.scalars().first()
+    if not company:
+        return None
+    return CompanyResponse(
+        id=company.id,
+        name=company.name,
+        email=company.email,
+        phone_number=company.phone_number,
+        cr=company.cr,
+        website=company.website,
+        description=company.description,
+        tagline=company.tagline,
+        linkedin=company.linkedin,
+        facebook=company.facebook,
+        twitter=company.twitter,
+        instagram=company.instagram,
+        logo=FileResponse(url=sign_url(company.logo), key=company.logo) if company.logo else None,
+        awards=company.awards,
+        sectors=company.sectors,
+        created_at=company.created_at,
+        last_updated=company.last_updated,
+        scores=[
+            ScoreResponse(
+                id=score.id,
+                year=score.year,
+                score=score.score,
+                score_type=score.score_type,
+                file=FileResponse(url=sign_url(score.file), key=score.file) if score.file else None,
+            )
+            for score in company.scores
+        ],
+        status=company.status,
+        rejection_reason=company.rejection_reason,
+    )
+
+
+async def get_company_profile(
+    session: AsyncSession,
+    company_id: int,
+    version: CompanyProfileVersion,
+    sign_url: Callable[[str], str],
+) -> Optional[CompanyResponse]:
+    """
+    The hydrated profile from the per-worker cache, loaded and signed on a miss.
+
+    Entries are keyed by company id and versioned by last_updated plus the
+    pre-sign epoch, so a company write or an aging URL is a miss. view_count
+    changes with every batch of views without bumping last_updated; it is
+    overlaid from `version` (the company row) instead of being cached.
+    """
+    cache_version = (version.last_updated, presign_epoch())
+    profile = company_profile_cache.get(company_id, cache_version)
+    if profile is None:
+        profile = await load_company_profile(session, company_id, sign_url)
+        if profile is None:
+            return None
+        company_profile_cache.set(company_id, cache_version, profile)
+    return profile.model_copy(update={"view_count": version.view_count})
@@ -0,0 +1,31 @@
+# app/services/company_update_service.py
+from typing import Any, Dict, Mapping
+
+
+def resolve_edit_status(old_status: str) -> str:
+    """
+    The status a company moves to when its owner changes it.
+
+    - `"approved"` → `"re-evaluation"`
+    - `"rejected"` → `"revision-requested"`
+    - Anything else is left unchanged.
+    """
+    if old_status == "approved":
+        return "re-evaluation"
+    if old_status == "rejected":
+        return "revision-requested"
+    return old_status
+
+
+def changed_fields(current: Mapping[str, Any], incoming: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    The submitted fields that differ from the stored row.
+
+    Empty values (None, "", []) mean "not submitted" and never clear a field,
+    as form updates have always behaved.
+    """
+    return {
+        field: value
+        for field, value in incoming.items()
+        if value and value != current[field]
+    }
@@ -0,0 +1,41 @@
+# app/services/company_view_service.py
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, column, func, insert, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.Company import Company
+from app.models.CompanyView import CompanyView
+from app.services.background_jobs import BatchWriter, background_jobs
+
+
+class CompanyViewWriter(BatchWriter):
+    """
+    Buffers company views and writes each batch as one multi-row INSERT into
+    company_views plus one UPDATE ... FROM (VALUES ...) of Company.view_count.
+    """
+
+    name = "company_views"
+
+    def enqueue(self, company_id: int, viewer_id: Optional[int]) -> None:
+        """
+        Record a view at the current time. Must be called from the event loop.
+        """
+        self._add({"company_id": company_id, "viewer_id": viewer_id, "viewed_at": datetime.utcnow()})
+
+    async def write_batch(self, session: AsyncSession, batch: List[Dict]) -> None:
+        await session.execute(insert(CompanyView), batch)
+
+        per_company = Counter(item["company_id"] for item in batch)
+        increments = values(
+            column("company_id", Integer), column("views", Integer), name="increments"
+        ).data(sorted(per_company.items()))
+        await session.execute(
+            update(Company)
+            .where(Company.id == increments.c.company_id)
+            .values(view_count=func.coalesce(Company.view_count, 0) + increments.c.views)
+            .execution_options(synchronize_session=False)
+        )
+
+
+company_view_writer = background_jobs.register_writer(CompanyViewWriter())
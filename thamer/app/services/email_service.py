@@ -1,40 +1,53 @@
 # app/services/email_service.py
-import boto3
+import asyncio
+import logging
 import os
+from typing import Any, Dict, Optional
 from botocore.exceptions import ClientError
 from jinja2 import Environment, FileSystemLoader
 from fastapi import BackgroundTasks, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.services import services
+from app.core.tracing import span
+from app.services.task_queue import task
+
+logger = logging.getLogger(__name__)
+
+# Shared by all EmailService instances so compiled templates are cached across requests
+template_env = Environment(loader=FileSystemLoader("app/templates/email/"))
+
+
+class EmailMessage(BaseModel):
+    """
+    Payload of the email.send task; `context` must be JSON-serializable.
+    """
+    to_email: str
+    subject: str
+    template_name: Optional[str] = None
+    context: Dict[str, Any] = {}
+
 
 class EmailService:
     def __init__(self):
         """
-        Initialize the EmailService with credentials from environment variables.
+        Initialize the EmailService. The SES client is shared and created on first send.
         """
-        self.aws_access_key = os.getenv("AWS_ACCESS_KEY")
-        self.aws_secret_key = os.getenv("AWS_SECRET_KEY")
-        self.region = os.getenv("AWS_REGION", "us-east-1")
         self.source_email = os.getenv("SOURCE_EMAIL", "no-reply@thamerweb.com")
+        self.template_env = template_env
 
-        if not all([self.aws_access_key, self.aws_secret_key, self.region, self.source_email]):
-            raise ValueError("Missing required environment variables for email service.")
-
-        self.client = boto3.client(
-            "ses",
-            aws_access_key_id=self.aws_access_key,
-            aws_secret_access_key=self.aws_secret_key,
-            region_name=self.region,
-        )
-
-        # Initialize Jinja2 template environment
-        self.template_env = Environment(loader=FileSystemLoader("app/templates/email/"))
+    @property
+    def client(self):
+        return services.ses
 
 
     def render_template(self, template_name: str, context: dict) -> str:
         """
         Render an HTML template with the given context.
         """
-        template = self.template_env.get_template(template_name)
-        return template.render(context)
+        with span("template.render", **{"template.name": template_name}):
+            template = self.template_env.get_template(template_name)
+            return template.render(context)
 
     def send_email(
         self,
@@ -48,9 +61,8 @@ class EmailService:
         Send an email using AWS SES with a rendered template.
         """
 
-        print(f"EmailService: Sending email to {to_email} with subject '{subject}'")
-        print(f"Context: {context}")
-        print(f"Background tasks: {background_tasks}")
+        # The context is not logged: it carries OTPs
+        logger.debug("Sending email %r to %s", subject, to_email)
 
         # html_content = self.render_template(template_name, context)
         # Prepare email content
@@ -72,9 +84,9 @@ class EmailService:
                         "Body": {"Html": {"Data": html_content}},
                     },
                 )
-                print(f"Email sent! Message ID: {response['MessageId']}")
+                logger.info("Email %r sent to %s", subject, to_email, extra={"message_id": response["MessageId"]})
             except ClientError as e:
-                print(f"Error sending email: {e}")
+                logger.error("Sending email %r to %s failed: %s", subject, to_email, e)
                 raise HTTPException(status_code=500, detail="Failed to send email.")
 
         # Schedule the email sending as a background task
@@ -82,4 +94,36 @@ class EmailService:
             background_tasks.add_task(send)
         else:
             send()
-    
\ No newline at end of file
+
+    @staticmethod
+    async def queue_email(
+        to_email: str,
+        subject: str,
+        template_name: str = None,
+        context: dict = None,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """
+        Send the email from a task worker (with retries) instead of the request.
+
+        Pass `session` to enqueue in the caller's transaction: the email then
+        goes out only if the transaction commits.
+        """
+        await send_email_task.enqueue(
+            EmailMessage(to_email=to_email, subject=subject, template_name=template_name, context=context or {}),
+            session=session,
+        )
+
+
+# The SES client gives up well before the timeout (see SES_CLIENT_TIMEOUTS), so a slow
+# call is not still sending when the task is retried
+@task("email.send", queue="email", max_attempts=5, timeout=30)
+async def send_email_task(message: EmailMessage) -> None:
+    # boto3 is blocking; one SES call per worker thread
+    await asyncio.to_thread(
+        EmailService().send_email,
+        to_email=message.to_email,
+        subject=message.subject,
+        template_name=message.template_name,
+        context=message.context,
+    )
@@ -0,0 +1,187 @@
+# app/services/export_service.py
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+from app.core.db import async_session
+from app.core.responses import dumps
+from app.models.Company import Company
+from app.models.Score import Score
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_ROWS = 1000
+
+# Leading characters that make spreadsheet applications evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_csv_formula(value: str) -> str:
+    """
+    Prefix user-supplied text that a spreadsheet would run as a formula (`=HYPERLINK(...)`) with a quote.
+    """
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return escape_csv_formula(";".join(str(item) for item in value))
+    if isinstance(value, str):
+        return escape_csv_formula(value)
+    return value
+
+
+async def stream_rows(stmt: Select, chunk_rows: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[Sequence]:
+    """
+    Yield batches of rows for `stmt` from a server-side cursor.
+
+    Runs on its own session: the response body is produced after the endpoint has
+    returned, when the request-scoped session may already be closed.
+    """
+    async with async_session() as session:
+        result = await session.stream(stmt.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def encode_csv(columns: List[str], records: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in records:
+        for record in batch:
+            writer.writerow([_csv_value(record.get(column)) for column in columns])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(records: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    async for batch in records:
+        if batch:
+            yield b"".join(dumps(record) + b"\n" for record in batch)
+
+
+async def map_rows(stmt: Select, to_record: Callable) -> AsyncIterator[List[Dict]]:
+    async for rows in stream_rows(stmt):
+        yield [to_record(row) for row in rows]
+
+
+async def group_rows(stmt: Select, key: Callable, to_record: Callable[[Iterable], Dict]) -> AsyncIterator[List[Dict]]:
+    """
+    Fold consecutive rows sharing `key` (e.g. one company joined to its scores) into one record.
+
+    `stmt` must be ordered by the grouping key. Only the group being built is kept in memory.
+    """
+    current_key, current_rows = None, []
+    async for rows in stream_rows(stmt):
+        batch = []
+        for row in rows:
+            row_key = key(row)
+            if current_rows and row_key != current_key:
+                batch.append(to_record(current_rows))
+                current_rows = []
+            current_key = row_key
+            current_rows.append(row)
+        if batch:
+            yield batch
+    if current_rows:
+        yield [to_record(current_rows)]
+
+
+def export_response(
+    export_format: str,
+    filename: str,
+    columns: List[str],
+    records: AsyncIterator[List[Dict]],
+    csv_records: Optional[AsyncIterator[List[Dict]]] = None,
+) -> StreamingResponse:
+    """
+    Stream `records` as CSV (flat `columns`) or NDJSON (one JSON object per line).
+
+    `csv_records` lets CSV use a flat shape when the NDJSON records are nested.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}.")
+
+    if export_format == "csv":
+        body = encode_csv(columns, csv_records or records)
+    else:
+        body = encode_ndjson(records)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+COMPANY_EXPORT_COLUMNS = [
+    "id", "name", "email", "phone_number", "cr", "website", "description", "tagline", "linkedin",
+    "facebook", "twitter", "instagram", "logo", "awards", "sectors", "status", "rejection_reason",
+    "view_count", "created_at", "last_updated",
+]
+SCORE_EXPORT_COLUMNS = ["score_id", "score_year", "score", "score_type", "score_file"]
+
+
+def company_scores_statement(filters: List) -> Select:
+    """
+    Companies matching `filters` left-joined to their scores, one row per (company, score).
+
+    File and logo columns are exported as S3 keys; bulk exports do not sign URLs.
+    """
+    return (
+        select(
+            *(getattr(Company, column) for column in COMPANY_EXPORT_COLUMNS),
+            Score.id.label("score_id"),
+            Score.year.label("score_year"),
+            Score.score,
+            Score.score_type,
+            Score.file.label("score_file"),
+        )
+        .select_from(Company)
+        .outerjoin(Score, Score.company_id == Company.id)
+        .where(*filters)
+        .order_by(Company.created_at.desc(), Company.id.desc(), Score.id)
+    )
+
+
+def company_with_scores_record(rows: List) -> Dict:
+    record = {column: getattr(rows[0], column) for column in COMPANY_EXPORT_COLUMNS}
+    record["scores"] = [
+        {"id": row.score_id, "year": row.score_year, "score": row.score, "score_type": row.score_type, "file": row.score_file}
+        for row in rows
+        if row.score_id is not None
+    ]
+    return record
+
+
+def export_companies_with_scores(export_format: str, filters: List, filename: str = "companies") -> StreamingResponse:
+    """
+    CSV: one line per company score (companies without scores get one line with empty score columns).
+    NDJSON: one object per company with a nested `scores` list.
+    """
+    stmt = company_scores_statement(filters)
+    return export_response(
+        export_format,
+        filename,
+        COMPANY_EXPORT_COLUMNS + SCORE_EXPORT_COLUMNS,
+        group_rows(stmt, key=lambda row: row.id, to_record=company_with_scores_record),
+        csv_records=map_rows(stmt, lambda row: row._asdict()),
+    )
@@ -0,0 +1,119 @@
+# app/services/http_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Hashable, Optional
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.Company import Company
+
+# Responses embed S3 pre-signed URLs valid for an hour. The ETag changes every
+# half hour so a body revalidated with 304 always has at least 30 minutes left on its URLs.
+PRESIGN_REFRESH_SECONDS = 1800
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def presign_epoch() -> int:
+    return int(time.time() // PRESIGN_REFRESH_SECONDS)
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr((*parts, presign_epoch())).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of `etag` against the request's If-None-Match header.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.headers.update(cache_headers(etag, last_modified))
+
+
+async def get_catalog_version(session: AsyncSession) -> Optional[datetime]:
+    """
+    Version of the company catalog: the latest Company.last_updated.
+
+    Every company or score write bumps last_updated (including status changes and
+    soft deletes), so this changes whenever any listing could change.
+    """
+    return await session.scalar(select(func.max(Company.last_updated)))
+
+
+class ResponseCache:
+    """
+    Small in-process LRU of built responses, keyed by request parameters.
+
+    Each entry stores the version it was built from; a lookup with a different
+    version is a miss, so entries never outlive the data they were built from.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, value: Any) -> None:
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+company_listing_cache = ResponseCache()
+# Hydrated company profiles (see app.services.company_profile), keyed by company id
+company_profile_cache = ResponseCache(max_entries=2048)
+
+
+def invalidate_company(company_id: int) -> None:
+    """
+    Drop cached responses that may contain the company.
+
+    Other workers pick the change up through the bumped Company.last_updated.
+    """
+    company_profile_cache.discard(company_id)
+    # A listing page can contain any company
+    company_listing_cache.clear()
@@ -0,0 +1,57 @@
+# app/services/login_activity_service.py
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import DateTime, Integer, String, column, insert, or_, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.login_history import LoginHistory
+from app.models.user import User
+from app.services.background_jobs import BatchWriter, background_jobs
+
+
+class LoginActivityWriter(BatchWriter):
+    """
+    Buffers successful logins and writes each batch as one multi-row INSERT into
+    login_history plus one UPDATE ... FROM (VALUES ...) of User.last_login /
+    last_login_ip, with the latest login per user. The login request itself
+    does not write the user row.
+    """
+
+    name = "login_activity"
+
+    def default_flush_interval(self) -> float:
+        return settings.LOGIN_ACTIVITY_FLUSH_SECONDS
+
+    def enqueue(self, user_id: int, ip_address: Optional[str], user_agent: Optional[str], method: str = "password") -> None:
+        """
+        Record a login at the current time. Must be called from the event loop.
+        """
+        self._add({
+            "user_id": user_id,
+            "logged_in_at": datetime.utcnow(),
+            "ip_address": ip_address,
+            "user_agent": user_agent[:255] if user_agent else None,
+            "method": method,
+        })
+
+    async def write_batch(self, session: AsyncSession, batch: List[Dict]) -> None:
+        await session.execute(insert(LoginHistory), batch)
+
+        latest: Dict[int, Dict] = {}
+        for item in batch:
+            if item["user_id"] not in latest or item["logged_in_at"] >= latest[item["user_id"]]["logged_in_at"]:
+                latest[item["user_id"]] = item
+        logins = values(
+            column("user_id", Integer), column("last_login", DateTime), column("last_login_ip", String), name="logins"
+        ).data(sorted((user_id, item["logged_in_at"], item["ip_address"]) for user_id, item in latest.items()))
+        await session.execute(
+            update(User)
+            .where(User.id == logins.c.user_id)
+            # Never move last_login backwards (batches from several workers may interleave)
+            .where(or_(User.last_login.is_(None), User.last_login < logins.c.last_login))
+            .values(last_login=logins.c.last_login, last_login_ip=logins.c.last_login_ip)
+            .execution_options(synchronize_session=False)
+        )
+
+
+login_activity_writer = background_jobs.register_writer(LoginActivityWriter())
@@ -0,0 +1,154 @@
+# app/services/notification_broker.py
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_CHANNEL = "notification_events"
+
+# pg_notify payloads are limited to 8000 bytes
+MAX_MESSAGE_LENGTH = 2000
+
+
+class NotificationHub:
+    """
+    In-process fan-out of notification events to the streams connected to this worker.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Register a queue that receives every event addressed to `user_id`.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def dispatch(self, event: dict) -> None:
+        for queue in self._subscribers.get(event.get("user_id"), ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop the event, it is still in the inbox
+                logger.warning(f"Dropping notification event for user {event.get('user_id')}: stream queue full")
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+def build_event(notification) -> dict:
+    return {
+        "user_id": notification.recipient_id,
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message[:MAX_MESSAGE_LENGTH],
+        "type": getattr(notification.type, "value", notification.type),
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+class InMemoryNotificationBroker:
+    """
+    Broker that delivers events straight to the local hub.
+
+    Used for single-process runs and tests; events are not shared between workers.
+    """
+
+    def __init__(self, hub: NotificationHub):
+        self.hub = hub
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, session: AsyncSession, events: List[dict]) -> None:
+        for event in events:
+            self.hub.dispatch(event)
+
+
+class PostgresNotificationBroker:
+    """
+    Broker backed by Postgres LISTEN/NOTIFY.
+
+    Events are published with pg_notify inside the writer's transaction, so they are
+    only delivered once the notifications are committed. Each worker holds one
+    listening connection and fans events out through its hub.
+    """
+
+    def __init__(self, hub: NotificationHub, reconnect_delay: float = 5.0):
+        self.hub = hub
+        self.reconnect_delay = reconnect_delay
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+
+    async def publish(self, session: AsyncSession, events: List[dict]) -> None:
+        if not events:
+            return
+        await session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS TEXT[])) AS payload"),
+            {"channel": NOTIFICATION_CHANNEL, "payloads": [json.dumps(event) for event in events]},
+        )
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self.hub.dispatch(json.loads(payload))
+        except ValueError:
+            logger.error(f"Ignoring malformed notification event: {payload[:200]}")
+
+    async def _listen_forever(self) -> None:
+        dsn = get_engine().url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                self._connection = await asyncpg.connect(dsn)
+                await self._connection.add_listener(NOTIFICATION_CHANNEL, self._on_notify)
+                logger.info("Listening for notification events")
+                # Block until the connection drops
+                while not self._connection.is_closed():
+                    await asyncio.sleep(self.reconnect_delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener error: {e}")
+            await asyncio.sleep(self.reconnect_delay)
+
+
+def create_broker(hub: NotificationHub):
+    if settings.NOTIFICATION_BROKER == "memory":
+        return InMemoryNotificationBroker(hub)
+    return PostgresNotificationBroker(hub)
+
+
+notification_hub = NotificationHub()
+# The broker is picked from settings on first use: services.notification_broker (app.core.services)
@@ -0,0 +1,190 @@
+# app/services/notification_service.py
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Integer, any_, delete, func, insert, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.Notification import Notification, NotificationCounter, NotificationType
+from app.services.background_jobs import BatchWriter, background_jobs
+from app.core.services import services
+from app.services.notification_broker import build_event
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    """
+    Notification writes that keep NotificationCounter in the same transaction.
+
+    Callers own the transaction and must commit.
+    """
+
+    @staticmethod
+    async def get_counts(session: AsyncSession, user_id: int) -> Tuple[int, int]:
+        """
+        Return (total, unread) for a user from the counter row.
+        """
+        result = await session.execute(
+            select(NotificationCounter.total_count, NotificationCounter.unread_count)
+            .where(NotificationCounter.user_id == user_id)
+        )
+        row = result.first()
+        return (row.total_count, row.unread_count) if row else (0, 0)
+
+    @staticmethod
+    async def create_many(session: AsyncSession, rows: List[Dict]) -> List[Notification]:
+        """
+        Insert notifications with one multi-row INSERT and bump each recipient's counters.
+
+        The new notifications are published to the notification stream in the same
+        transaction, so connected clients only see them once they are committed.
+
+        Args:
+            rows (List[Dict]): Column values with at least recipient_id, title and message.
+
+        Returns:
+            List[Notification]: The inserted notifications.
+        """
+        if not rows:
+            return []
+
+        notifications = list(await session.scalars(insert(Notification).returning(Notification), rows))
+
+        per_user = Counter(row["recipient_id"] for row in rows)
+        # Sorted so concurrent writers lock counter rows in the same order
+        stmt = pg_insert(NotificationCounter).values([
+            {"user_id": user_id, "total_count": count, "unread_count": count}
+            for user_id, count in sorted(per_user.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={
+                "total_count": NotificationCounter.total_count + stmt.excluded.total_count,
+                "unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count,
+            },
+        )
+        await session.execute(stmt)
+
+        await services.notification_broker.publish(session, [build_event(notification) for notification in notifications])
+        return notifications
+
+    @staticmethod
+    async def mark_read(session: AsyncSession, user_id: int, notification_ids: List[int]) -> Optional[int]:
+        """
+        Mark the given notifications as read with a single UPDATE ... WHERE id = ANY(...).
+
+        Returns:
+            Optional[int]: Number of notifications that were unread, or None if none of the ids belong to the user.
+        """
+        result = await session.execute(
+            update(Notification)
+            .where(
+                Notification.recipient_id == user_id,
+                Notification.id == any_(literal(list(notification_ids), ARRAY(Integer))),
+                Notification.is_read == False,
+            )
+            .values(is_read=True)
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = len(result.all())
+
+        if updated == 0:
+            # Distinguish "already read" from "not found"
+            exists = await session.scalar(
+                select(func.count()).where(
+                    Notification.recipient_id == user_id,
+                    Notification.id == any_(literal(list(notification_ids), ARRAY(Integer))),
+                )
+            )
+            return 0 if exists else None
+
+        await NotificationService._adjust_counts(session, user_id, unread_delta=-updated)
+        return updated
+
+    @staticmethod
+    async def mark_all_read(session: AsyncSession, user_id: int) -> int:
+        """
+        Mark every unread notification of a user as read.
+        """
+        result = await session.execute(
+            update(Notification)
+            .where(Notification.recipient_id == user_id, Notification.is_read == False)
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(unread_count=0)
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def delete(session: AsyncSession, user_id: int, notification_id: int) -> bool:
+        """
+        Delete one notification owned by the user.
+
+        Returns:
+            bool: False if the notification does not exist or belongs to someone else.
+        """
+        result = await session.execute(
+            delete(Notification)
+            .where(Notification.id == notification_id, Notification.recipient_id == user_id)
+            .returning(Notification.is_read)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.all()
+        if not deleted:
+            return False
+
+        was_unread = sum(1 for (is_read,) in deleted if not is_read)
+        await NotificationService._adjust_counts(session, user_id, total_delta=-len(deleted), unread_delta=-was_unread)
+        return True
+
+    @staticmethod
+    async def _adjust_counts(session: AsyncSession, user_id: int, total_delta: int = 0, unread_delta: int = 0) -> None:
+        await session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(
+                total_count=func.greatest(NotificationCounter.total_count + total_delta, 0),
+                unread_count=func.greatest(NotificationCounter.unread_count + unread_delta, 0),
+            )
+        )
+
+
+class NotificationWriter(BatchWriter):
+    """
+    Buffers notifications in memory and writes them in batches.
+    """
+
+    name = "notifications"
+
+    def enqueue(
+        self,
+        recipient_id: int,
+        title: str,
+        message: str,
+        notification_type: NotificationType = NotificationType.GENERAL,
+    ) -> None:
+        """
+        Queue a notification for the next batch. Must be called from the event loop.
+        """
+        self._add({
+            "recipient_id": recipient_id,
+            "title": title,
+            "message": message,
+            "type": notification_type,
+            "is_read": False,
+            "created_at": datetime.utcnow(),
+        })
+
+    async def write_batch(self, session: AsyncSession, batch: List[Dict]) -> None:
+        await NotificationService.create_many(session, batch)
+
+
+notification_writer = background_jobs.register_writer(NotificationWriter())
@@ -1,6 +1,6 @@
 # app/services/otp_service.py
 from datetime import datetime, timedelta
-from fastapi import HTTPException, BackgroundTasks
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.otp_rate_limit import OTPRateLimit
@@ -50,7 +50,7 @@ async def can_request_otp(identifier: str, session: AsyncSession) -> bool:
     await session.commit()
     return True
 
-async def send_otp_to_user(email: str, background_tasks: BackgroundTasks, session: AsyncSession):
+async def send_otp_to_user(email: str, session: AsyncSession):
     """
     Generate and send OTP to the user.
     """
@@ -66,24 +66,21 @@ async def send_otp_to_user(email: str, background_tasks: BackgroundTasks, sessio
     # Generate OTP
     otp = generate_otp(email)
     user.otp = otp
-    print("otp")
-    print(otp)
     user.otp_expiry = datetime.utcnow() + timedelta(minutes=10)  # Set OTP expiry time
 
-    # Commit changes to persist the OTP in the database
-    await session.commit()
-
-    # Send OTP email
-    email_service = EmailService()
-    email_service.send_email(
+    # Queue the OTP email in the same transaction as the OTP itself
+    await EmailService.queue_email(
         to_email=email,
         subject="Your OTP Code",
         template_name="otp_email.html",  # Template to use
         context={
-            "user": user,
+            "user": {"first_name": user.first_name},
             "purpose": "account verification",
             "otp": otp,
             "app_name": "Thamer",  # Your app name
         },
-        background_tasks=background_tasks,
-    )
\ No newline at end of file
+        session=session,
+    )
+
+    # Commit changes to persist the OTP in the database
+    await session.commit()
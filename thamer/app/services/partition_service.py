@@ -0,0 +1,248 @@
+# app/services/partition_service.py
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import Awaitable, Callable, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import async_session
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "company_views": "viewed_at",
+    "notification": "created_at",
+}
+
+# Arbitrary constant used to serialize maintenance across workers
+PARTITION_LOCK_KEY = 726101
+
+PARTITION_NAME_RE = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: datetime | date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def view_rollup_horizon(now: datetime) -> date:
+    """
+    First month whose company views are counted from company_views rather than company_view_monthly.
+
+    Months before it are closed for at least a month, so no late rows reach them
+    after they are rolled up; stats queries scan only the partitions from here on.
+    """
+    return add_months(month_start(now), -1)
+
+
+async def list_partitions(session: AsyncSession, table: str) -> List[Tuple[str, date]]:
+    """
+    List the monthly partitions attached to a table (the DEFAULT partition is skipped).
+
+    Returns:
+        List[Tuple[str, date]]: (partition name, first day of the month) sorted by month.
+    """
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for (name,) in result.all():
+        match = PARTITION_NAME_RE.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+async def ensure_partitions(session: AsyncSession, months_ahead: int = None) -> List[str]:
+    """
+    Create the current month's partition and the next `months_ahead` ones for every partitioned table.
+
+    Returns:
+        List[str]: Names of the partitions created.
+    """
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    created = []
+
+    for table in PARTITIONED_TABLES:
+        existing = {name for name, _ in await list_partitions(session, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            await create_partition(session, table, name, month)
+            created.append(name)
+
+    return created
+
+
+async def create_partition(session: AsyncSession, table: str, name: str, month: date) -> None:
+    """
+    Create and attach one monthly partition, moving rows the DEFAULT partition caught for that month into it.
+
+    `CREATE ... PARTITION OF` would fail while the DEFAULT partition holds rows
+    in the new range, so the partition is built as a plain table and attached
+    once those rows have moved.
+    """
+    key = PARTITIONED_TABLES[table]
+    # Bounds are generated from dates, never from user input
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    await session.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    moved = await session.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+            f"WHERE {key} >= '{lower}' AND {key} < '{upper}' RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        )
+    )
+    if moved.rowcount:
+        logger.warning(f"Moved {moved.rowcount} rows from the DEFAULT partition of {table} into {name}")
+    await session.execute(
+        text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (\'{lower}\') TO (\'{upper}\')')
+    )
+
+
+async def roll_up_company_views(session: AsyncSession) -> List[str]:
+    """
+    Roll up every company_views partition before the rollup horizon into company_view_monthly, once.
+
+    Returns:
+        List[str]: Names of the partitions rolled up.
+    """
+    horizon = view_rollup_horizon(datetime.utcnow())
+    result = await session.execute(text("SELECT DISTINCT month FROM company_view_monthly"))
+    rolled_up = set(result.scalars().all())
+    done = []
+
+    for name, month in await list_partitions(session, "company_views"):
+        if month >= horizon or month in rolled_up:
+            continue
+        await session.execute(
+            text(
+                "INSERT INTO company_view_monthly "
+                "(company_id, month, total_views, anonymous_views, authenticated_views) "
+                "SELECT company_id, CAST(:month AS DATE), count(*), "
+                "count(*) FILTER (WHERE viewer_id IS NULL), count(viewer_id) "
+                f'FROM "{name}" GROUP BY company_id '
+                "ON CONFLICT (company_id, month) DO NOTHING"
+            ),
+            {"month": month},
+        )
+        done.append(name)
+
+    return done
+
+
+async def apply_retention(session: AsyncSession) -> List[str]:
+    """
+    Drop partitions that fell out of the retention window.
+
+    company_views partitions are rolled up into company_view_monthly (see
+    `roll_up_company_views`) before being detached, so lifetime totals survive the drop;
+    notification partitions are subtracted from notification_counter.
+
+    Returns:
+        List[str]: Names of the partitions dropped.
+    """
+    now = datetime.utcnow()
+    current = month_start(now)
+    cutoffs = {
+        # Months from the rollup horizon on are still counted from company_views
+        "company_views": min(add_months(current, -settings.COMPANY_VIEWS_RETENTION_MONTHS), view_rollup_horizon(now)),
+        "notification": add_months(current, -settings.NOTIFICATION_RETENTION_MONTHS),
+    }
+    # Normally a no-op: the rollup step has already run, but a partition must never be dropped before it
+    await roll_up_company_views(session)
+    dropped = []
+
+    for table, cutoff in cutoffs.items():
+        for name, month in await list_partitions(session, table):
+            if month >= cutoff:
+                continue
+
+            if table == "notification":
+                # Keep per-user notification counters in step with the dropped rows
+                await session.execute(
+                    text(
+                        "UPDATE notification_counter c SET "
+                        "total_count = GREATEST(c.total_count - d.total, 0), "
+                        "unread_count = GREATEST(c.unread_count - d.unread, 0) "
+                        "FROM (SELECT recipient_id, count(*) AS total, count(*) FILTER (WHERE NOT is_read) AS unread "
+                        f'FROM "{name}" GROUP BY recipient_id) d '
+                        "WHERE c.user_id = d.recipient_id"
+                    )
+                )
+
+            await session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            await session.execute(text(f'DROP TABLE "{name}"'))
+            dropped.append(name)
+
+    return dropped
+
+
+async def run_maintenance_step(step: Callable[[AsyncSession], Awaitable[List[str]]]) -> List[str]:
+    """
+    Run one maintenance step in its own transaction, serialized across workers.
+
+    Returns:
+        List[str]: What the step returned, or an empty list if it failed.
+    """
+    async with async_session() as session:
+        try:
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+            done = await step(session)
+            await session.commit()
+            return done
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Partition maintenance step {step.__name__} failed: {e}")
+            return []
+
+
+async def run_partition_maintenance() -> None:
+    """
+    Create upcoming partitions, roll up closed company_views months and enforce retention.
+
+    Each step commits on its own, so a failure in one (say, a partition that
+    cannot be created) does not hold back the others.
+    """
+    created = await run_maintenance_step(ensure_partitions)
+    rolled_up = await run_maintenance_step(roll_up_company_views)
+    dropped = await run_maintenance_step(apply_retention)
+
+    if created or rolled_up or dropped:
+        logger.info(
+            f"Partition maintenance created {created or 'none'}, rolled up {rolled_up or 'none'}, dropped {dropped or 'none'}"
+        )
+
+
+async def partition_maintenance_loop() -> None:
+    """
+    Run partition maintenance at startup and then every PARTITION_MAINTENANCE_INTERVAL_SECONDS.
+    """
+    while True:
+        await run_partition_maintenance()
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
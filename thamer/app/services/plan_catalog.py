@@ -0,0 +1,122 @@
+# app/services/plan_catalog.py
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.responses import dumps
+from app.models.subscription_plan import SubscriptionPlan
+
+logger = logging.getLogger(__name__)
+
+# Unknown plan ids revalidate the catalog early, but not more often than this
+MIN_RECHECK_SECONDS = 1.0
+
+PLAN_COLUMNS = (
+    SubscriptionPlan.id, SubscriptionPlan.name, SubscriptionPlan.description, SubscriptionPlan.price,
+    SubscriptionPlan.duration_days, SubscriptionPlan.is_active, SubscriptionPlan.created_at, SubscriptionPlan.updated_at,
+)
+
+
+class PlanInfo(NamedTuple):
+    """
+    A subscription plan as the payment path and plan listings need it (shaped like SubscriptionPlanResponse).
+    """
+    id: int
+    name: str
+    description: Optional[str]
+    price: float
+    duration_days: int
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class PlanCatalog:
+    """
+    Per-worker read-through cache of the whole subscription plan catalog.
+
+    The catalog is a handful of rows that only admins change, so each worker
+    keeps all of it in memory together with the encoded public plan list and
+    its ETag. Every `ttl_seconds` one aggregate query compares the catalog
+    version (row count, max id, max updated_at) and reloads only if it moved;
+    `invalidate` makes this worker reload on its next lookup (plan writes),
+    and other workers follow within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self._ttl_seconds = ttl_seconds
+        self._lock = asyncio.Lock()
+        self._plans: Dict[int, PlanInfo] = {}
+        self._version: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self.public_body = b"[]"
+        self.etag = ""
+        self.last_modified: Optional[datetime] = None
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            self._ttl_seconds = settings.PLAN_CATALOG_TTL_SECONDS
+        return self._ttl_seconds
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def _stale(self, force: bool) -> bool:
+        if self._version is None:
+            return True
+        age = time.monotonic() - self._checked_at
+        return age >= (MIN_RECHECK_SECONDS if force else self.ttl_seconds)
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Revalidate against the database once the TTL expired (with `force`: once
+        MIN_RECHECK_SECONDS passed). Reloads the plans only if the version moved.
+        """
+        if not self._stale(force):
+            return
+        async with self._lock:
+            # Another request may have refreshed while this one waited
+            if not self._stale(force):
+                return
+            async with async_session() as session:
+                version = tuple((await session.execute(
+                    select(func.count(), func.max(SubscriptionPlan.id), func.max(SubscriptionPlan.updated_at))
+                )).one())
+                if version != self._version:
+                    rows = (await session.execute(select(*PLAN_COLUMNS).order_by(SubscriptionPlan.id))).all()
+                    self._load([PlanInfo(*row) for row in rows], version)
+            self._checked_at = time.monotonic()
+
+    def _load(self, plans: List[PlanInfo], version: Tuple) -> None:
+        self._plans = {plan.id: plan for plan in plans}
+        self._version = version
+        self.public_body = dumps([plan._asdict() for plan in plans if plan.is_active])
+        self.etag = f'"{hashlib.sha1(self.public_body).hexdigest()[:32]}"'
+        self.last_modified = max((plan.updated_at or plan.created_at for plan in plans), default=None)
+        logger.info(f"Plan catalog loaded: {len(plans)} plans, version {version}")
+
+    async def get(self, plan_id: int) -> Optional[PlanInfo]:
+        """
+        Plan by id (active or not), or None. Served from memory; an unknown id
+        revalidates early in case the plan was just created by another worker.
+        """
+        await self.refresh()
+        plan = self._plans.get(plan_id)
+        if plan is None:
+            await self.refresh(force=True)
+            plan = self._plans.get(plan_id)
+        return plan
+
+    async def active_plans(self) -> List[PlanInfo]:
+        await self.refresh()
+        return [plan for plan in self._plans.values() if plan.is_active]
+
+
+plan_catalog = PlanCatalog()
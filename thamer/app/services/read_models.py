@@ -0,0 +1,68 @@
+# app/services/read_models.py
+# Column-projected read models: hot paths load only the columns they return or check,
+# as plain tuples, instead of full Company / User entities (ARRAY columns, long text,
+# identity-map bookkeeping). Use the ORM entities when the handler modifies the row.
+from datetime import datetime
+from typing import NamedTuple, Optional
+from fastapi import HTTPException
+from sqlalchemy import exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.Company import Company
+from app.models.user import User, UserRole
+
+
+class CompanyCard(NamedTuple):
+    id: int
+    name: str
+    user_id: int
+    status: str
+    logo: Optional[str]
+    last_updated: datetime
+
+
+class UserPrincipal(NamedTuple):
+    """
+    The identity dependencies hand to endpoints that only need who is calling.
+    """
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+
+COMPANY_CARD_COLUMNS = (Company.id, Company.name, Company.user_id, Company.status, Company.logo, Company.last_updated)
+USER_PRINCIPAL_COLUMNS = (User.id, User.email, User.role, User.is_active)
+
+
+async def get_company_card(session: AsyncSession, company_id: int) -> Optional[CompanyCard]:
+    result = await session.execute(select(*COMPANY_CARD_COLUMNS).where(Company.id == company_id))
+    row = result.first()
+    return CompanyCard(*row) if row else None
+
+
+async def is_company_owner(session: AsyncSession, company_id: int, user_id: int) -> bool:
+    """
+    Ownership check as a single EXISTS; no company columns are transferred.
+    """
+    return bool(await session.scalar(
+        select(exists().where(Company.id == company_id, Company.user_id == user_id))
+    ))
+
+
+async def require_company_owner(session: AsyncSession, company_id: int, user_id: int) -> None:
+    """
+    Raise 404 unless `user_id` owns the company (unknown and foreign companies look the same).
+    """
+    if not await is_company_owner(session, company_id, user_id):
+        raise HTTPException(status_code=404, detail="Company not found or unauthorized")
+
+
+async def company_cr_exists(session: AsyncSession, cr: str) -> bool:
+    return bool(await session.scalar(select(exists().where(Company.cr == cr))))
+
+
+async def get_user_principal(session: AsyncSession, email: str) -> Optional[UserPrincipal]:
+    result = await session.execute(select(*USER_PRINCIPAL_COLUMNS).where(User.email == email))
+    row = result.first()
+    return UserPrincipal(*row) if row else None
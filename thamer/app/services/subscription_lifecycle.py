@@ -0,0 +1,163 @@
+# app/services/subscription_lifecycle.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List
+from sqlalchemy import Integer, any_, func, literal, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.db import async_session
+from app.models.Notification import NotificationType
+from app.models.Subscription import Subscription, SubscriptionStatus
+from app.models.user import User
+from app.services.email_service import EmailService
+from app.services.notification_service import notification_writer
+from app.services.plan_catalog import plan_catalog
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key: one worker runs each lifecycle pass
+SUBSCRIPTION_LIFECYCLE_LOCK_KEY = 726102
+
+
+async def refresh_entitlements(session: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Recompute User.subscription_expires_at for `user_ids` in one statement.
+
+    Call after any change to a user's subscriptions, in the same transaction.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    latest_end = (
+        select(func.max(Subscription.end_date))
+        .where(Subscription.user_id == User.id, Subscription.status == SubscriptionStatus.ACTIVE)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(User)
+        .where(User.id == any_(literal(user_ids, ARRAY(Integer))))
+        .values(subscription_expires_at=latest_end)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def expire_subscriptions(session: AsyncSession, now: datetime) -> List[int]:
+    """
+    Move every active subscription past its end date to EXPIRED (one set-based UPDATE).
+
+    Returns:
+        List[int]: Users whose entitlement was recomputed.
+    """
+    result = await session.execute(
+        update(Subscription)
+        .where(Subscription.status == SubscriptionStatus.ACTIVE, Subscription.end_date <= now)
+        .values(status=SubscriptionStatus.EXPIRED, updated_at=now)
+        .returning(Subscription.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    user_ids = sorted({row.user_id for row in result})
+    await refresh_entitlements(session, user_ids)
+    return user_ids
+
+
+async def claim_renewal_reminders(session: AsyncSession, now: datetime, limit: int):
+    """
+    Mark up to `limit` subscriptions ending within RENEWAL_REMINDER_DAYS as reminded.
+
+    Claiming and reading happen in one UPDATE ... RETURNING, so each
+    subscription is reminded at most once.
+
+    Returns:
+        Rows (user_id, plan_id, end_date, email, first_name).
+    """
+    due = (
+        select(Subscription.id)
+        .where(
+            Subscription.status == SubscriptionStatus.ACTIVE,
+            Subscription.end_date > now,
+            Subscription.end_date <= now + timedelta(days=settings.RENEWAL_REMINDER_DAYS),
+            Subscription.renewal_reminder_sent_at.is_(None),
+        )
+        .order_by(Subscription.end_date)
+        .limit(limit)
+    )
+    result = await session.execute(
+        update(Subscription)
+        .where(Subscription.id.in_(due), Subscription.user_id == User.id)
+        .values(renewal_reminder_sent_at=now)
+        .returning(Subscription.user_id, Subscription.plan_id, Subscription.end_date, User.email, User.first_name)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
+async def _try_lifecycle_lock(session: AsyncSession) -> bool:
+    return bool(await session.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SUBSCRIPTION_LIFECYCLE_LOCK_KEY}
+    ))
+
+
+async def run_subscription_lifecycle() -> None:
+    """
+    One lifecycle pass: expire ended subscriptions, then send renewal reminders in batches.
+
+    Workers race for an advisory lock per transaction; the others skip the pass.
+    """
+    now = datetime.utcnow()
+    async with async_session() as session:
+        if not await _try_lifecycle_lock(session):
+            return
+        expired_users = await expire_subscriptions(session, now)
+        await session.commit()
+    if expired_users:
+        logger.info(f"Expired subscriptions of {len(expired_users)} users")
+
+    batch_size = settings.RENEWAL_REMINDER_BATCH_SIZE
+    while True:
+        async with async_session() as session:
+            if not await _try_lifecycle_lock(session):
+                return
+            rows = await claim_renewal_reminders(session, now, batch_size)
+            notifications = []
+            for row in rows:
+                plan = await plan_catalog.get(row.plan_id)
+                plan_name = plan.name if plan else "Thamer"
+                end_date = f"{row.end_date:%Y-%m-%d}"
+                # Enqueued with the claim: the email is sent if and only if the reminder is marked sent
+                await EmailService.queue_email(
+                    to_email=row.email,
+                    subject="Your Thamer subscription ends soon",
+                    template_name="renewal_reminder_email.html",
+                    context={"first_name": row.first_name, "plan_name": plan_name, "end_date": end_date, "app_name": "Thamer"},
+                    session=session,
+                )
+                notifications.append((row.user_id, plan_name, end_date))
+            await session.commit()
+        if not rows:
+            return
+
+        for user_id, plan_name, end_date in notifications:
+            notification_writer.enqueue(
+                recipient_id=user_id,
+                title="Subscription ending soon",
+                message=f"Your {plan_name} subscription ends on {end_date}. Renew to keep your access.",
+                notification_type=NotificationType.ALERT,
+            )
+        logger.info(f"Queued {len(rows)} renewal reminders")
+        if len(rows) < batch_size:
+            return
+
+
+async def subscription_lifecycle_loop() -> None:
+    """
+    Run the lifecycle pass at startup and then every SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS.
+    """
+    while True:
+        try:
+            await run_subscription_lifecycle()
+        except Exception as e:
+            logger.error(f"Subscription lifecycle pass failed: {e}")
+        await asyncio.sleep(settings.SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS)
@@ -5,40 +5,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.Company import Company
 from app.models.Subscription import Subscription, SubscriptionStatus
-from app.models.payment import Payment
 from app.models.user import User
 from sqlalchemy.orm import joinedload
 from app.schemas.stats import SubscriptionStats
 import logging
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def is_subscription_active(user: User, session: AsyncSession) -> bool:
+def is_subscription_active(user: User) -> bool:
     """
     Check if the user has an active subscription.
 
+    Reads the denormalized User.subscription_expires_at (kept current by
+    app.services.subscription_lifecycle), so no query is needed.
+
     Args:
         user (User): The user object to check.
-        session (AsyncSession): The database session.
 
     Returns:
         bool: True if the user has an active subscription, False otherwise.
     """
-    if not user:
+    if not user or user.subscription_expires_at is None:
         return False
-
-    # Query the subscription table to check for active subscriptions
-    stmt = select(Subscription).where(
-        Subscription.user_id == user.id,
-        Subscription.end_date > datetime.utcnow()  # Active subscription
-    )
-    result = await session.execute(stmt)
-    subscription = result.scalars().first()
-
-
-    return subscription is not None
+    return user.subscription_expires_at > datetime.utcnow()
 
 
 async def get_subscription_stats(user: User, session: AsyncSession) -> SubscriptionStats:
@@ -49,8 +39,9 @@ async def get_subscription_stats(user: User, session: AsyncSession) -> Subscript
         select(Subscription)
         .where(
             Subscription.user_id == user.id,
-            Subscription.status == SubscriptionStatus.ACTIVE  # ✅ Use enum
+            Subscription.status == SubscriptionStatus.ACTIVE  # ✅ Use enum (expired by the lifecycle worker)
         )
+        .order_by(Subscription.end_date.desc())
         .options(joinedload(Subscription.plan))
     )
 
@@ -65,15 +56,6 @@ async def get_subscription_stats(user: User, session: AsyncSession) -> Subscript
     # ✅ Fetch Plan Name
     plan_name = subscription.plan.name if subscription.plan else "Unknown Plan"
 
-    # ✅ Fetch Payment History
-    payments = await session.execute(
-        select(Payment)
-        .where(Payment.user_id == user.id)
-        .order_by(Payment.created_at.desc())
-        .limit(5)
-    )
-
-
     return SubscriptionStats(
         plan_name=plan_name,
         renewal_date=subscription.end_date,
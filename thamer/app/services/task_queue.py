@@ -0,0 +1,478 @@
+# app/services/task_queue.py
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import socket
+import time
+import typing
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Generic, List, NamedTuple, Optional, Type, TypeVar
+from pydantic import BaseModel
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.services import services
+from app.core.tracing import CONSUMER, start_trace
+from app.models.task import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+PayloadT = TypeVar("PayloadT", bound=BaseModel)
+
+# Payload keys whose values are never shown outside the worker (dead-letter listings)
+SECRET_PAYLOAD_KEYS = frozenset({"otp", "password", "token", "secret"})
+
+
+class ClaimedTask(NamedTuple):
+    id: int
+    name: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class TaskDefinition(Generic[PayloadT]):
+    """
+    A task type: a coroutine taking one pydantic payload, plus its queue and retry policy.
+
+    Created with the `@task(...)` decorator. Calling the definition runs the handler
+    directly; `enqueue` hands the payload to the workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        queue: str,
+        handler: Callable[[PayloadT], Awaitable[None]],
+        payload_model: Type[PayloadT],
+        max_attempts: int,
+        timeout: float,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        self.name = name
+        self.queue = queue
+        self.handler = handler
+        self.payload_model = payload_model
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def __call__(self, payload: PayloadT) -> None:
+        await self.handler(payload)
+
+    async def enqueue(self, payload: PayloadT, session: Optional[AsyncSession] = None, delay: float = 0) -> None:
+        """
+        Queue one run of the task.
+
+        With `session`, the task is inserted in the caller's transaction and only
+        becomes visible to workers when the caller commits.
+        """
+        await services.task_queue.enqueue(self, payload, session=session, delay=delay)
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        Exponential backoff with jitter: base * 2^(attempts - 1), capped, scaled by 0.5-1.0.
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self, payload: Dict[str, Any]) -> None:
+        await asyncio.wait_for(self.handler(self.payload_model.model_validate(payload)), timeout=self.timeout)
+
+
+TASKS: Dict[str, TaskDefinition] = {}
+
+
+def redact_payload(value: Any) -> Any:
+    """
+    Copy of a task payload with the values of SECRET_PAYLOAD_KEYS (at any depth) masked.
+    """
+    if isinstance(value, dict):
+        return {
+            key: "***" if key.lower() in SECRET_PAYLOAD_KEYS else redact_payload(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_payload(item) for item in value]
+    return value
+
+
+def task(
+    name: str,
+    queue: str = "default",
+    max_attempts: int = 5,
+    timeout: float = 60,
+    backoff_base: float = 5,
+    backoff_max: float = 900,
+):
+    """
+    Register a task type. The handler's single parameter must be annotated with its pydantic payload model.
+    """
+
+    def register(handler: Callable[[PayloadT], Awaitable[None]]) -> TaskDefinition[PayloadT]:
+        hints = typing.get_type_hints(handler)
+        hints.pop("return", None)
+        if len(hints) != 1 or not issubclass(next(iter(hints.values())), BaseModel):
+            raise TypeError(f"Task {name}: handler must take exactly one pydantic payload argument")
+        if name in TASKS:
+            raise ValueError(f"Task {name} is already registered")
+        definition = TaskDefinition(
+            name, queue, handler, next(iter(hints.values())), max_attempts, timeout, backoff_base, backoff_max
+        )
+        TASKS[name] = definition
+        return definition
+
+    return register
+
+
+class PostgresTaskQueue:
+    """
+    Tasks live in the `task` table; workers claim them with FOR UPDATE SKIP LOCKED,
+    so any number of worker processes share a queue without double execution.
+    """
+
+    async def enqueue(self, definition: TaskDefinition, payload: BaseModel, session: Optional[AsyncSession] = None, delay: float = 0) -> None:
+        now = datetime.utcnow()
+        stmt = insert(Task).values(
+            queue=definition.queue,
+            name=definition.name,
+            payload=payload.model_dump(mode="json"),
+            status=TaskStatus.QUEUED,
+            attempts=0,
+            max_attempts=definition.max_attempts,
+            run_at=now + timedelta(seconds=delay),
+            created_at=now,
+        )
+        if session is not None:
+            await session.execute(stmt)
+            return
+        async with async_session() as own_session:
+            await own_session.execute(stmt)
+            await own_session.commit()
+
+    async def claim(self, queue: str, worker_id: str, limit: int) -> List[ClaimedTask]:
+        now = datetime.utcnow()
+        ready = (
+            select(Task.id)
+            .where(Task.queue == queue, Task.status == TaskStatus.QUEUED, Task.run_at <= now)
+            .order_by(Task.run_at, Task.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            result = await session.execute(
+                update(Task)
+                .where(Task.id.in_(ready))
+                .values(status=TaskStatus.RUNNING, attempts=Task.attempts + 1, locked_at=now, locked_by=worker_id)
+                .returning(Task.id, Task.name, Task.payload, Task.attempts, Task.max_attempts)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = [ClaimedTask(*row) for row in result]
+            await session.commit()
+        return claimed
+
+    async def complete(self, task: ClaimedTask) -> None:
+        async with async_session() as session:
+            await session.execute(delete(Task).where(Task.id == task.id))
+            await session.commit()
+
+    async def fail(self, task: ClaimedTask, error: str, retry_in: Optional[float]) -> None:
+        """
+        Reschedule after `retry_in` seconds, or dead-letter the task when it is None.
+        """
+        values = {"locked_at": None, "locked_by": None, "last_error": error[:4000]}
+        if retry_in is None:
+            values["status"] = TaskStatus.DEAD
+        else:
+            values.update(status=TaskStatus.QUEUED, run_at=datetime.utcnow() + timedelta(seconds=retry_in))
+        async with async_session() as session:
+            await session.execute(update(Task).where(Task.id == task.id).values(**values))
+            await session.commit()
+
+    async def requeue_stale(self, older_than: float) -> int:
+        """
+        Return tasks held longer than `older_than` seconds (their worker died) to the queue.
+
+        A task that has used all its attempts is dead-lettered instead, so a task
+        that keeps killing its worker does not circulate forever.
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                update(Task)
+                .where(Task.status == TaskStatus.RUNNING, Task.locked_at < datetime.utcnow() - timedelta(seconds=older_than))
+                .values(
+                    status=case((Task.attempts >= Task.max_attempts, TaskStatus.DEAD), else_=TaskStatus.QUEUED),
+                    locked_at=None,
+                    locked_by=None,
+                    last_error="Worker lost while running",
+                )
+                .returning(Task.id)
+                .execution_options(synchronize_session=False)
+            )
+            count = len(result.all())
+            await session.commit()
+        return count
+
+    async def retry_dead(self, task_id: int) -> bool:
+        async with async_session() as session:
+            result = await session.execute(
+                update(Task)
+                .where(Task.id == task_id, Task.status == TaskStatus.DEAD)
+                .values(status=TaskStatus.QUEUED, attempts=0, run_at=datetime.utcnow())
+                .returning(Task.id)
+            )
+            retried = result.first() is not None
+            await session.commit()
+        return retried
+
+    async def dead(self, limit: int) -> List[Dict[str, Any]]:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Task.id, Task.queue, Task.name, Task.payload, Task.attempts, Task.last_error, Task.created_at)
+                .where(Task.status == TaskStatus.DEAD)
+                .order_by(Task.id.desc())
+                .limit(limit)
+            )
+            return [{**row._mapping, "payload": redact_payload(row.payload)} for row in result]
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Task.queue, Task.status, func.count()).group_by(Task.queue, Task.status)
+            )
+            counts: Dict[str, Dict[str, int]] = {}
+            for queue, status, count in result:
+                counts.setdefault(queue, {})[status] = count
+        return counts
+
+
+class InMemoryTaskQueue:
+    """
+    Process-local queue with the same semantics (retries, backoff, dead-lettering)
+    for tests and single-process development; needs no database.
+
+    Tasks enqueued with a session are queued immediately, not on commit.
+    """
+
+    def __init__(self):
+        self._ready: Dict[str, list] = {}
+        self._tasks: Dict[int, dict] = {}
+        self._ids = itertools.count(1)
+
+    def _push(self, queue: str, run_at: float, task_id: int) -> None:
+        heapq.heappush(self._ready.setdefault(queue, []), (run_at, task_id))
+
+    async def enqueue(self, definition: TaskDefinition, payload: BaseModel, session: Optional[AsyncSession] = None, delay: float = 0) -> None:
+        task_id = next(self._ids)
+        self._tasks[task_id] = {
+            "queue": definition.queue, "name": definition.name, "payload": payload.model_dump(mode="json"),
+            "status": TaskStatus.QUEUED, "attempts": 0, "max_attempts": definition.max_attempts, "last_error": None,
+            "created_at": datetime.utcnow(),
+        }
+        self._push(definition.queue, time.monotonic() + delay, task_id)
+
+    async def claim(self, queue: str, worker_id: str, limit: int) -> List[ClaimedTask]:
+        ready = self._ready.get(queue, [])
+        claimed = []
+        now = time.monotonic()
+        while ready and ready[0][0] <= now and len(claimed) < limit:
+            _, task_id = heapq.heappop(ready)
+            task = self._tasks[task_id]
+            task["status"] = TaskStatus.RUNNING
+            task["attempts"] += 1
+            claimed.append(ClaimedTask(task_id, task["name"], task["payload"], task["attempts"], task["max_attempts"]))
+        return claimed
+
+    async def complete(self, task: ClaimedTask) -> None:
+        self._tasks.pop(task.id, None)
+
+    async def fail(self, task: ClaimedTask, error: str, retry_in: Optional[float]) -> None:
+        entry = self._tasks[task.id]
+        entry["last_error"] = error
+        if retry_in is None:
+            entry["status"] = TaskStatus.DEAD
+            return
+        entry["status"] = TaskStatus.QUEUED
+        self._push(entry["queue"], time.monotonic() + retry_in, task.id)
+
+    async def requeue_stale(self, older_than: float) -> int:
+        return 0
+
+    async def retry_dead(self, task_id: int) -> bool:
+        entry = self._tasks.get(task_id)
+        if entry is None or entry["status"] != TaskStatus.DEAD:
+            return False
+        entry.update(status=TaskStatus.QUEUED, attempts=0)
+        self._push(entry["queue"], time.monotonic(), task_id)
+        return True
+
+    async def dead(self, limit: int) -> List[Dict[str, Any]]:
+        dead = [
+            {"id": task_id, "queue": entry["queue"], "name": entry["name"], "payload": redact_payload(entry["payload"]),
+             "attempts": entry["attempts"], "last_error": entry["last_error"], "created_at": entry["created_at"]}
+            for task_id, entry in self._tasks.items() if entry["status"] == TaskStatus.DEAD
+        ]
+        return sorted(dead, key=lambda entry: entry["id"], reverse=True)[:limit]
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for entry in self._tasks.values():
+            queue_counts = counts.setdefault(entry["queue"], {})
+            queue_counts[entry["status"]] = queue_counts.get(entry["status"], 0) + 1
+        return counts
+
+
+def create_task_queue():
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        return InMemoryTaskQueue()
+    return PostgresTaskQueue()
+
+
+def check_task_timeouts() -> None:
+    """
+    Reject task types whose timeout reaches TASK_VISIBILITY_TIMEOUT_SECONDS.
+
+    The reaper requeues a task running longer than the visibility timeout, so
+    such a task could run a second time while the first run is still going.
+    Checked when a worker starts rather than in `@task`, which runs at import.
+
+    Raises:
+        ValueError: Naming the offending task types.
+    """
+    limit = settings.TASK_VISIBILITY_TIMEOUT_SECONDS
+    too_long = sorted(f"{name} ({definition.timeout}s)" for name, definition in TASKS.items() if definition.timeout >= limit)
+    if too_long:
+        raise ValueError(
+            f"Task timeouts must be below TASK_VISIBILITY_TIMEOUT_SECONDS ({limit}s): {', '.join(too_long)}"
+        )
+
+
+def parse_concurrency(value: str) -> Dict[str, int]:
+    """
+    "default=4,email=8" -> {"default": 4, "email": 8}
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        queue, _, limit = item.partition("=")
+        limits[queue.strip()] = int(limit or 1)
+    return limits
+
+
+class TaskWorker:
+    """
+    Runs claimed tasks with a fixed concurrency per queue.
+
+    One fetch loop per queue claims as many tasks as it has free slots, so an
+    idle queue costs one claim query per poll interval. Failed tasks are
+    retried with the task's backoff until max_attempts, then dead-lettered.
+    `stop` stops claiming and waits for running tasks.
+    """
+
+    def __init__(self, queue, concurrency: Dict[str, int], poll_interval: Optional[float] = None):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval if poll_interval is not None else settings.TASK_POLL_INTERVAL_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"[:64]
+        self._stopping = asyncio.Event()
+        self._running: Dict[str, set] = {queue_name: set() for queue_name in concurrency}
+        self._slot_freed: Dict[str, asyncio.Event] = {queue_name: asyncio.Event() for queue_name in concurrency}
+        self._loops: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._loops:
+            check_task_timeouts()
+            self._loops = [asyncio.create_task(self._fetch_loop(queue_name)) for queue_name in self.concurrency]
+            self._loops.append(asyncio.create_task(self._reap_loop()))
+            logger.info(f"Task worker {self.worker_id} consuming {self.concurrency}")
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _fetch_loop(self, queue_name: str) -> None:
+        limit = self.concurrency[queue_name]
+        running = self._running[queue_name]
+        slot_freed = self._slot_freed[queue_name]
+        while not self._stopping.is_set():
+            free = limit - len(running)
+            if free <= 0:
+                slot_freed.clear()
+                await slot_freed.wait()
+                continue
+            try:
+                claimed = await self.queue.claim(queue_name, self.worker_id, free)
+            except Exception as e:
+                logger.error(f"Claiming from queue {queue_name} failed: {e}")
+                claimed = []
+            if not claimed:
+                await self._sleep(self.poll_interval)
+                continue
+            for claimed_task in claimed:
+                execution = asyncio.create_task(self._execute(claimed_task))
+                running.add(execution)
+                execution.add_done_callback(lambda done, queue_name=queue_name: self._finished(queue_name, done))
+
+    def _finished(self, queue_name: str, execution: asyncio.Task) -> None:
+        self._running[queue_name].discard(execution)
+        self._slot_freed[queue_name].set()
+
+    async def _execute(self, claimed: ClaimedTask) -> None:
+        definition = TASKS.get(claimed.name)
+        if definition is None:
+            await self.queue.fail(claimed, f"Unknown task type {claimed.name}", retry_in=None)
+            logger.error(f"Task {claimed.id}: unknown task type {claimed.name}, dead-lettered")
+            return
+        try:
+            with start_trace(f"task {claimed.name}", kind=CONSUMER, **{"task.id": claimed.id, "task.attempt": claimed.attempts}):
+                await definition.run(claimed.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            retry_in = definition.retry_delay(claimed.attempts) if claimed.attempts < claimed.max_attempts else None
+            try:
+                await self.queue.fail(claimed, error, retry_in)
+            except Exception as fail_error:
+                logger.error(f"Task {claimed.id}: recording failure failed: {fail_error}")
+            if retry_in is None:
+                logger.error(f"Task {claimed.id} ({claimed.name}) dead-lettered after {claimed.attempts} attempts: {error}")
+            else:
+                logger.warning(f"Task {claimed.id} ({claimed.name}) attempt {claimed.attempts} failed, retry in {retry_in:.0f}s: {error}")
+            return
+        try:
+            await self.queue.complete(claimed)
+        except Exception as e:
+            # The task ran; it may run again once the reaper requeues it
+            logger.error(f"Task {claimed.id}: marking complete failed: {e}")
+
+    async def _reap_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                requeued = await self.queue.requeue_stale(settings.TASK_VISIBILITY_TIMEOUT_SECONDS)
+                if requeued:
+                    logger.warning(f"Requeued or dead-lettered {requeued} tasks from lost workers")
+            except Exception as e:
+                logger.error(f"Requeueing stale tasks failed: {e}")
+            await self._sleep(settings.TASK_VISIBILITY_TIMEOUT_SECONDS / 2)
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop claiming, then wait up to `timeout` seconds for running tasks (they are requeued later if cut off).
+        """
+        self._stopping.set()
+        for slot_freed in self._slot_freed.values():
+            slot_freed.set()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        running = [execution for executions in self._running.values() for execution in executions]
+        if running:
+            done, pending = await asyncio.wait(running, timeout=timeout)
+            for execution in pending:
+                execution.cancel()
@@ -0,0 +1,86 @@
+# app/services/token_state.py
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.security import TokenClaims
+from app.models.user import User
+
+
+class TokenState(NamedTuple):
+    token_version: int
+    is_active: bool
+
+
+class TokenStateCache:
+    """
+    Per-worker TTL cache of each user's current token version and is_active flag.
+
+    Access tokens are revoked by bumping User.token_version. Requests compare their
+    token's version against this cache, so authorization needs at most one small
+    query per user every `ttl_seconds`. `invalidate` applies a revocation in this
+    worker immediately; other workers pick it up when their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 10000):
+        self._ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            self._ttl_seconds = settings.TOKEN_STATE_CACHE_SECONDS
+        return self._ttl_seconds
+
+    async def get(self, user_id: int) -> Optional[TokenState]:
+        """
+        Returns:
+            TokenState, or None if the user no longer exists.
+        """
+        entry = self._entries.get(user_id)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        async with async_session() as session:
+            result = await session.execute(select(User.token_version, User.is_active).where(User.id == user_id))
+            row = result.first()
+        state = TokenState(row.token_version or 0, row.is_active) if row else None
+
+        self._entries[user_id] = (now + self.ttl_seconds, state)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return state
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_states = TokenStateCache()  # TTL: settings.TOKEN_STATE_CACHE_SECONDS
+
+
+async def is_token_current(claims: TokenClaims) -> bool:
+    """
+    False when the token was revoked (older token version) or the account is inactive.
+    """
+    if not claims.is_active:
+        return False
+    if claims.user_id is None:
+        # Pre-claims tokens are checked against the loaded user instead
+        return True
+    state = await token_states.get(claims.user_id)
+    return state is not None and state.is_active and state.token_version == claims.token_version
+
+
+def revoke_user_tokens(user: User) -> None:
+    """
+    Invalidate every access token issued to `user` so far. Takes effect when the caller commits.
+    """
+    user.token_version = (user.token_version or 0) + 1
@@ -0,0 +1,83 @@
+# app/worker.py
+"""
+Task worker process: runs the tasks that web workers enqueue (emails, ...).
+
+Claims tasks from the `task` table with FOR UPDATE SKIP LOCKED, so any number
+of worker processes can run side by side. Concurrency is per queue and per
+process; the default comes from TASK_QUEUE_CONCURRENCY. SIGTERM / SIGINT stop
+claiming and wait up to --grace seconds for running tasks; tasks cut off are
+requeued by the other workers after TASK_VISIBILITY_TIMEOUT_SECONDS.
+
+Usage (from the thamer/ directory):
+    python -m app.worker
+    python -m app.worker --queues email=8,default=2 --grace 60
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.core.db import dispose_engine, get_engine, use_task_worker_pool
+from app.core.logging_config import configure_logging
+from app.core.services import services
+from app.core.tracing import shutdown_tracing
+from app.services.background_jobs import background_jobs
+from app.services.task_queue import TASKS, TaskWorker, parse_concurrency
+
+# Modules defining @task handlers; importing them registers the task types
+TASK_MODULES = (
+    "app.services.email_service",
+)
+
+logger = logging.getLogger("app.worker")
+
+
+async def run(concurrency: dict, grace: float) -> None:
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    logger.info(f"Registered tasks: {', '.join(sorted(TASKS))}")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    worker = TaskWorker(services.task_queue, concurrency)
+    worker.start()
+    try:
+        await stopping.wait()
+        logger.info("Stopping task worker")
+    finally:
+        await worker.stop(timeout=grace)
+        # Task handlers may buffer notifications through the batch writers
+        await background_jobs.close()
+        services.close()
+        await dispose_engine()
+        shutdown_tracing()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queues", default=None, help='Queues and concurrency, e.g. "email=8,default=2"')
+    parser.add_argument("--grace", type=float, default=30.0, help="Seconds to wait for running tasks on shutdown")
+    args = parser.parse_args()
+
+    configure_logging()
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        parser.error("TASK_QUEUE_BACKEND=memory runs tasks inside the web process; a separate worker needs postgres")
+    use_task_worker_pool()
+    try:
+        get_engine()
+    except ValueError as e:
+        parser.error(str(e))
+    asyncio.run(run(parse_concurrency(args.queues or settings.TASK_QUEUE_CONCURRENCY), args.grace))
+
+
+if __name__ == "__main__":
+    main()
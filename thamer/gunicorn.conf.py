@@ -0,0 +1,33 @@
+# gunicorn.conf.py
+# Production serving profile: gunicorn supervising uvicorn workers (uvloop + httptools).
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#
+# Worker count follows the container's CPU quota; override with WEB_CONCURRENCY.
+# Each worker sizes its database pool from its share of DB_MAX_CONNECTIONS, after the task
+# worker's DB_TASK_WORKER_CONNECTIONS and one LISTEN connection per worker (see app.core.db);
+# a worker fails to boot when the budget cannot give it a pooled connection.
+import os
+
+from app.core.server import worker_count
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = worker_count()
+worker_class = "app.core.workers.UvicornWorker"
+
+# Workers read this to size their connection pools
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Each worker is its own event loop and engine: never fork after the app (and its pool) exists
+preload_app = False
+
+# SIGTERM: stop accepting, let in-flight requests finish and the lifespan flush
+# buffered writers (notifications, company views, logins) before the hard kill
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+backlog = 2048
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
@@ -0,0 +1,133 @@
+# scripts/bench_serialization.py
+"""
+Serialization benchmark for the company listing response.
+
+Compares, for one page of companies with nested scores:
+
+  models    the previous path: build CompanyResponse/ScoreResponse/FileResponse
+            models, then let FastAPI dump and re-validate them against
+            response_model and encode with pydantic (what the route did for
+            every request)
+  rows      the current path: turn rows into plain dicts and encode with orjson
+
+S3 signing and database time are excluded; both paths get the same rows.
+
+Usage (from the thamer/ directory):
+    python -m scripts.bench_serialization
+    python -m scripts.bench_serialization --page-size 100 --scores 6 --repeat 200
+"""
+import argparse
+import sys
+import timeit
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from app.core.responses import dumps
+from app.schemas.company import CompanyResponse, CompanyScorePaginationResponse, FileResponse, ScoreResponse
+
+COMPANY_FIELDS = (
+    "id", "name", "email", "phone_number", "cr", "website", "description", "tagline", "linkedin",
+    "facebook", "twitter", "instagram", "logo", "awards", "sectors", "created_at", "last_updated",
+    "status", "rejection_reason",
+)
+CompanyRow = namedtuple("CompanyRow", COMPANY_FIELDS)
+ScoreRow = namedtuple("ScoreRow", ("company_id", "id", "year", "score", "score_type", "file"))
+
+
+def make_rows(page_size: int, scores_per_company: int):
+    now = datetime(2025, 1, 1)
+    companies = [
+        CompanyRow(
+            id=i, name=f"Company {i}", email=f"info{i}@example.com", phone_number="+966500000000",
+            cr=f"10{i:08d}", website=f"https://company{i}.example.com", description="Lorem ipsum " * 20,
+            tagline="Building things", linkedin=f"https://linkedin.com/company/{i}", facebook=None,
+            twitter=None, instagram=None, logo=f"logos/{i}.png", awards=["ISO 9001", "Best Local Content"],
+            sectors=["oil-gas", "construction"], created_at=now - timedelta(days=i), last_updated=now,
+            status="approved", rejection_reason=None,
+        )
+        for i in range(1, page_size + 1)
+    ]
+    scores = [
+        ScoreRow(company.id, company.id * 100 + j, 2018 + j, 41.5 + j, "iktva", f"scores/{company.id}/{j}.pdf")
+        for company in companies
+        for j in range(scores_per_company)
+    ]
+    return companies, scores
+
+
+def sign(key):
+    return f"https://bucket.s3.amazonaws.com/{key}?X-Amz-Signature=0"
+
+
+def models_path(companies, scores, adapter: TypeAdapter) -> bytes:
+    by_company = {}
+    for score in scores:
+        by_company.setdefault(score.company_id, []).append(score)
+
+    data = [
+        CompanyResponse(
+            **{field: getattr(company, field) for field in COMPANY_FIELDS if field != "logo"},
+            logo=FileResponse(url=sign(company.logo), key=company.logo),
+            scores=[
+                ScoreResponse(
+                    id=score.id, year=score.year, score=score.score, score_type=score.score_type,
+                    file=FileResponse(url=sign(score.file), key=score.file),
+                )
+                for score in by_company.get(company.id, [])
+            ],
+        )
+        for company in companies
+    ]
+    listing = CompanyScorePaginationResponse(total=1000, page=1, page_size=len(companies), total_pages=10, data=data)
+
+    # FastAPI dumps the returned model, validates it against response_model, then encodes
+    value = adapter.validate_python(listing.model_dump())
+    return adapter.dump_json(value)
+
+
+def rows_path(companies, scores) -> bytes:
+    by_company = {company.id: [] for company in companies}
+    for score in scores:
+        by_company[score.company_id].append({
+            "id": score.id, "year": score.year, "score": score.score, "score_type": score.score_type,
+            "file": {"url": sign(score.file), "key": score.file},
+        })
+
+    data = []
+    for company in companies:
+        payload = company._asdict()
+        payload["logo"] = {"url": sign(company.logo), "key": company.logo}
+        payload["scores"] = by_company[company.id]
+        data.append(payload)
+    return dumps({"total": 1000, "page": 1, "page_size": len(companies), "total_pages": 10, "data": data})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--scores", type=int, default=5, help="Scores per company")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    companies, scores = make_rows(args.page_size, args.scores)
+    adapter = TypeAdapter(CompanyScorePaginationResponse)
+
+    paths = {
+        "models": lambda: models_path(companies, scores, adapter),
+        "rows": lambda: rows_path(companies, scores),
+    }
+    print(f"page_size={args.page_size}, scores/company={args.scores}, repeat={args.repeat}")
+    timings = {}
+    for name, run in paths.items():
+        size = len(run())
+        best = min(timeit.repeat(run, number=args.repeat, repeat=3)) / args.repeat
+        timings[name] = best
+        print(f"  {name:<7} {best * 1000:8.3f} ms/response  {size:>8} bytes")
+    print(f"  speed-up {timings['models'] / timings['rows']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# scripts/bench_startup.py
+"""
+Startup (import-time) benchmark for the API.
+
+Imports the app in a fresh interpreter under `python -X importtime` and reports
+the total import time plus the modules with the largest cumulative cost. Each
+run is a new process, so nothing is served from the previous run's imports
+(bytecode caches do apply, as they do when a worker boots).
+
+The import runs with an empty environment: importing the app must not load
+settings, build the engine or create clients, so a module that reads
+`settings` at import time fails the benchmark.
+
+Usage (from the thamer/ directory):
+    python -m scripts.bench_startup
+    python -m scripts.bench_startup --module app.main --repeat 5 --top 15
+    python -m scripts.bench_startup --max-ms 1500   # exit 1 when slower (CI guard)
+    python -m scripts.bench_startup --inherit-env   # keep the current environment
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+def import_times(module: str, inherit_env: bool = False):
+    """
+    Import `module` once in a subprocess, with an empty environment unless `inherit_env`.
+
+    Returns:
+        (total_us, {module: cumulative_us}) from the -X importtime report.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy() if inherit_env else {},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative.get(module, max(cumulative.values(), default=0)), cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail when the best total exceeds this")
+    parser.add_argument("--inherit-env", action="store_true", help="Import with the current environment instead of an empty one")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module, args.inherit_env) for _ in range(args.repeat)]
+    totals = [total for total, _ in runs]
+    best_total, best_modules = min(runs, key=lambda run: run[0])
+
+    print(f"import {args.module}: repeat={args.repeat}")
+    print(f"  best {best_total / 1000:8.1f} ms   median {statistics.median(totals) / 1000:8.1f} ms")
+    print("  slowest modules (cumulative, best run):")
+    top_level = sorted(
+        ((name, us) for name, us in best_modules.items() if name != args.module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, us in top_level[:args.top]:
+        print(f"    {us / 1000:8.1f} ms  {name}")
+
+    if args.max_ms is not None and best_total / 1000 > args.max_ms:
+        print(f"  FAIL: {best_total / 1000:.1f} ms > {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
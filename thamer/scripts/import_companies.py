@@ -0,0 +1,65 @@
+# scripts/import_companies.py
+"""
+Bulk-import companies and scores from CSV or JSON Lines.
+
+Same pipeline as POST /api/v1/admin/companies/import: validation of all rows,
+one query for CR uniqueness, concurrent S3 checks, chunked INSERT ... RETURNING.
+Prints the per-row error report as JSON and exits non-zero when any row failed.
+
+Usage (from the thamer/ directory, with the API's environment loaded):
+    python -m scripts.import_companies companies.csv --importer-email admin@thamer.com
+    python -m scripts.import_companies companies.jsonl --importer-email admin@thamer.com --status approved
+    python -m scripts.import_companies companies.csv --importer-email admin@thamer.com --dry-run
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy.future import select
+
+from app.api.v1.endpoints.user import validate_s3_object_exists
+from app.core.db import async_session
+from app.models.user import User, UserRole
+from app.services.company_import_service import import_companies
+
+
+async def run(args) -> int:
+    extension = Path(args.file).suffix.lstrip(".").lower()
+    import_format = args.format or ("jsonl" if extension == "ndjson" else extension)
+    content = Path(args.file).read_text(encoding="utf-8-sig")
+
+    async with async_session() as session:
+        importer = (await session.execute(select(User).where(User.email == args.importer_email))).scalars().first()
+        if importer is None or importer.role != UserRole.ADMIN:
+            print(f"{args.importer_email} is not an admin user", file=sys.stderr)
+            return 2
+
+        report = await import_companies(
+            session,
+            content,
+            import_format,
+            importer,
+            validate_s3_object_exists,
+            status=args.status,
+            dry_run=args.dry_run,
+            chunk_size=args.chunk_size,
+        )
+
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="CSV or JSONL file")
+    parser.add_argument("--importer-email", required=True, help="Admin recorded as importer and default owner")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--status", default="pending", choices=["pending", "approved"])
+    parser.add_argument("--chunk-size", type=int, default=500, help="Companies per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
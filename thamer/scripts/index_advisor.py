@@ -0,0 +1,193 @@
+# scripts/index_advisor.py
+"""
+Index advisor: EXPLAIN the API's hot query shapes and report how they are served.
+
+For every query shape the script prints the plan's scan nodes (which index, or a
+sequential scan) and flags sequential scans on the large tables. It also reports
+indexes that have never been scanned and, when pg_stat_statements is installed,
+the most expensive production statements with their plans.
+
+Requires PostgreSQL 16+ (EXPLAIN GENERIC_PLAN explains parameterized SQL without values).
+
+Usage (from the thamer/ directory):
+    python -m scripts.index_advisor --database-url postgresql://admin:...@db/thamer
+    python -m scripts.index_advisor --top-statements 20
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterator, List
+
+from sqlalchemy import create_engine, text
+
+# Large, fast-growing tables where a sequential scan on a hot path is a problem
+LARGE_TABLES = {"company_views", "notification", "company", "score", "subscription", "payment", "user"}
+
+# Query shapes issued by the API, with the handler they come from
+QUERY_SHAPES: Dict[str, str] = {
+    "track_company_view: duplicate-view check": """
+        SELECT id FROM company_views
+        WHERE company_id = $1 AND viewer_id = $2 AND viewed_at > $3
+        LIMIT 1
+    """,
+    "get_view_statistics: aggregate": """
+        SELECT count(*),
+               count(*) FILTER (WHERE viewed_at >= $2),
+               count(*) FILTER (WHERE viewed_at >= $3),
+               count(*) FILTER (WHERE viewer_id IS NULL),
+               count(viewer_id)
+        FROM company_views WHERE company_id = $1
+    """,
+    "get_company_viewers: page": """
+        SELECT v.viewer_id, v.viewed_at, u.first_name, u.last_name, u.email
+        FROM company_views v LEFT JOIN "user" u ON u.id = v.viewer_id
+        WHERE v.company_id = $1
+        ORDER BY v.viewed_at DESC
+        LIMIT $2 OFFSET $3
+    """,
+    "get_company_stats: monthly views": """
+        SELECT to_char(viewed_at, 'YYYY-MM') AS month, count(id)
+        FROM company_views
+        WHERE company_id = $1 AND viewed_at >= $2
+        GROUP BY month ORDER BY month
+    """,
+    "get_notifications: page": """
+        SELECT id, title, message, type, is_read, created_at
+        FROM notification
+        WHERE recipient_id = $1
+        ORDER BY created_at DESC
+        LIMIT $2 OFFSET $3
+    """,
+    "get_notifications: unread count": """
+        SELECT count(*) FROM notification WHERE recipient_id = $1 AND is_read = false
+    """,
+    "is_subscription_active": """
+        SELECT id FROM subscription WHERE user_id = $1 AND end_date > $2 LIMIT 1
+    """,
+    "get_subscription_stats: active subscription": """
+        SELECT id, plan_id, end_date FROM subscription
+        WHERE user_id = $1 AND status = $2
+        LIMIT 1
+    """,
+    "get_companies_with_scores: page": """
+        SELECT id FROM company WHERE status = 'approved'
+        ORDER BY created_at DESC
+        LIMIT $1 OFFSET $2
+    """,
+    "get_pending_companies (admin)": """
+        SELECT id FROM company ORDER BY created_at DESC LIMIT $1 OFFSET $2
+    """,
+    "register_company: CR uniqueness": """
+        SELECT id FROM company WHERE cr = $1 LIMIT 1
+    """,
+    "get_user_companies": """
+        SELECT id FROM company WHERE user_id = $1
+    """,
+    "company scores load": """
+        SELECT id, year, score, score_type, file FROM score WHERE company_id = $1
+    """,
+}
+
+
+def iter_scan_nodes(plan: dict) -> Iterator[dict]:
+    """
+    Yield every scan node in an EXPLAIN (FORMAT JSON) plan tree.
+    """
+    if "Scan" in plan.get("Node Type", ""):
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_scan_nodes(child)
+
+
+def explain(conn, sql: str) -> dict:
+    row = conn.exec_driver_sql(f"EXPLAIN (GENERIC_PLAN, FORMAT JSON) {sql}").scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def describe_plan(plan: dict) -> List[str]:
+    lines = [f"total cost {plan.get('Total Cost')}"]
+    for node in iter_scan_nodes(plan):
+        relation = node.get("Relation Name", "?")
+        index = node.get("Index Name")
+        description = f"{node['Node Type']} on {relation}" + (f" using {index}" if index else "")
+        if node["Node Type"] == "Seq Scan" and relation.split("_p")[0] in LARGE_TABLES:
+            description += "   <-- sequential scan on a large table"
+        lines.append(description)
+    return lines
+
+
+def report_query_shapes(conn) -> None:
+    print("== Query shapes ==")
+    for name, sql in QUERY_SHAPES.items():
+        print(f"\n{name}")
+        try:
+            for line in describe_plan(explain(conn, sql)):
+                print(f"    {line}")
+        except Exception as e:
+            print(f"    EXPLAIN failed: {e}")
+            # The failed statement aborts the transaction; later shapes and reports need a new one
+            conn.rollback()
+
+
+def report_unused_indexes(conn) -> None:
+    print("\n== Indexes never scanned since the last stats reset ==")
+    rows = conn.execute(text(
+        "SELECT relname, indexrelname, pg_size_pretty(pg_relation_size(indexrelid)) "
+        "FROM pg_stat_user_indexes s JOIN pg_index i USING (indexrelid) "
+        "WHERE s.idx_scan = 0 AND NOT i.indisprimary AND NOT i.indisunique "
+        "ORDER BY pg_relation_size(indexrelid) DESC"
+    )).all()
+    if not rows:
+        print("    none")
+    for table, index, size in rows:
+        print(f"    {table}.{index} ({size})")
+
+
+def report_top_statements(conn, limit: int) -> None:
+    print(f"\n== Top {limit} statements by total execution time (pg_stat_statements) ==")
+    installed = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")).scalar()
+    if not installed:
+        print("    pg_stat_statements is not installed; skipping")
+        return
+
+    rows = conn.execute(text(
+        "SELECT query, calls, round(total_exec_time::numeric, 1), round(mean_exec_time::numeric, 2) "
+        "FROM pg_stat_statements WHERE query ILIKE 'select%' "
+        "ORDER BY total_exec_time DESC LIMIT :limit"
+    ), {"limit": limit}).all()
+    for query, calls, total_ms, mean_ms in rows:
+        print(f"\n{calls} calls, {total_ms} ms total, {mean_ms} ms mean")
+        print(f"    {' '.join(query.split())[:200]}")
+        try:
+            for line in describe_plan(explain(conn, query)):
+                print(f"    {line}")
+        except Exception as e:
+            print(f"    EXPLAIN failed: {e}")
+            conn.rollback()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL", "").replace("+asyncpg", ""),
+        help="Synchronous SQLAlchemy URL (defaults to DATABASE_URL without the asyncpg driver)",
+    )
+    parser.add_argument("--top-statements", type=int, default=10, help="Number of pg_stat_statements entries to explain")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as conn:
+        report_query_shapes(conn)
+        report_unused_indexes(conn)
+        report_top_statements(conn, args.top_statements)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
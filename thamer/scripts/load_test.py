@@ -0,0 +1,220 @@
+# scripts/load_test.py
+"""
+HTTP load test and worker-scaling check for the production serving profile.
+
+  run     drive an already running server with keep-alive connections and
+          report requests/s and latency percentiles
+  scale   start `gunicorn -c gunicorn.conf.py app.main:app` with 1, 2, ... N
+          workers, run the same load against each and report the speed-up
+          over one worker; exits 1 when scaling up to the core count falls
+          below --min-efficiency (speed-up / workers)
+
+The load generator runs in --clients processes with --connections keep-alive
+connections each. Give the server the cores you are measuring: on one host,
+pin the two apart (taskset) or run the client from another machine.
+
+Usage (from the thamer/ directory):
+    python -m scripts.load_test run --url http://127.0.0.1:8000/api/v1/health/live
+    python -m scripts.load_test run --url http://127.0.0.1:8000/api/v1/plans -H "Authorization: Bearer ..."
+    python -m scripts.load_test scale --workers 1,2,4 --path /api/v1/health/live --duration 15
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from app.core.server import available_cpus
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        if b":" in line:
+            name, value = line.split(b":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get(b"content-length", b"0")))
+    return status, headers.get(b"connection") == b"close"
+
+
+async def _connection(host: str, port: int, request: bytes, deadline: float, latencies: list, stats: dict) -> None:
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, close = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            stats["ok" if status < 400 else "failed"] += 1
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            stats["errors"] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+def _client(args: tuple) -> tuple:
+    url, headers, connections, duration = args
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = "".join(
+        [f"GET {path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept-Encoding: gzip, br\r\n"]
+        + [f"{header}\r\n" for header in headers]
+        + ["\r\n"]
+    ).encode()
+    latencies, stats = [], {"ok": 0, "failed": 0, "errors": 0}
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _connection(parts.hostname, parts.port or 80, request, deadline, latencies, stats)
+            for _ in range(connections)
+        ))
+
+    asyncio.run(run())
+    return stats, latencies
+
+
+def run_load(url: str, headers: list, clients: int, connections: int, duration: float) -> dict:
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(_client, [(url, headers, connections, duration)] * clients)
+    latencies = sorted(latency for _, client_latencies in results for latency in client_latencies)
+    totals = {key: sum(stats[key] for stats, _ in results) for key in ("ok", "failed", "errors")}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        **totals,
+        "rps": totals["ok"] / duration,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def print_result(label: str, result: dict) -> None:
+    print(
+        f"  {label:<12} {result['rps']:10.0f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+        f"p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+        f"failed {result['failed']}  errors {result['errors']}"
+    )
+
+
+def wait_until_up(url: str, timeout: float) -> None:
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = asyncio.run(_probe(parts.hostname, parts.port or 80, parts.path))
+            if status == 200:
+                return
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} did not answer 200 within {timeout}s")
+
+
+async def _probe(host: str, port: int, path: str) -> tuple:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        return await _read_response(reader)
+    finally:
+        writer.close()
+
+
+def scale(args) -> int:
+    cores = available_cpus()
+    counts = [int(n) for n in args.workers.split(",")] if args.workers else sorted({1, 2, cores})
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    ready_url = f"http://127.0.0.1:{args.port}{args.ready_path}"
+    print(f"cores={cores} workers={counts} clients={args.clients}x{args.connections} duration={args.duration}s")
+
+    results = {}
+    for count in counts:
+        env = {**os.environ, "WEB_CONCURRENCY": str(count), "BIND": f"127.0.0.1:{args.port}", "ACCESS_LOG": ""}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL if not args.verbose else None,
+        )
+        try:
+            wait_until_up(ready_url, args.startup_timeout)
+            run_load(url, args.header, args.clients, args.connections, min(2.0, args.duration))  # warm-up
+            results[count] = run_load(url, args.header, args.clients, args.connections, args.duration)
+            print_result(f"{count} worker(s)", results[count])
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    base = results[counts[0]]["rps"] / counts[0]
+    failed = False
+    print("  scaling (speed-up over the per-worker throughput of the first run):")
+    for count, result in results.items():
+        speed_up = result["rps"] / base if base else 0.0
+        efficiency = speed_up / count
+        below = count <= cores and efficiency < args.min_efficiency
+        failed |= below
+        print(f"    {count:>3} workers  speed-up {speed_up:5.2f}x  efficiency {efficiency:5.0%}"
+              f"{'  BELOW TARGET' if below else ''}")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--clients", type=int, default=max(1, available_cpus() // 2), help="Load generator processes")
+    common.add_argument("--connections", type=int, default=32, help="Keep-alive connections per client process")
+    common.add_argument("--duration", type=float, default=10.0)
+    common.add_argument("-H", "--header", action="append", default=[], help='Extra header, e.g. "Authorization: Bearer ..."')
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", parents=[common])
+    run.add_argument("--url", required=True)
+
+    scaling = commands.add_parser("scale", parents=[common])
+    scaling.add_argument("--workers", help="Comma-separated worker counts (default: 1, 2 and the core count)")
+    scaling.add_argument("--path", default="/api/v1/health/live")
+    scaling.add_argument("--ready-path", default="/api/v1/health/live",
+                         help="Polled before each run; /api/v1/health/ready needs the database")
+    scaling.add_argument("--port", type=int, default=8765)
+    scaling.add_argument("--startup-timeout", type=float, default=60.0)
+    scaling.add_argument("--min-efficiency", type=float, default=0.7)
+    scaling.add_argument("--verbose", action="store_true", help="Show the server's log")
+    args = parser.parse_args()
+
+    if args.command == "scale":
+        return scale(args)
+    print(f"{args.url} clients={args.clients}x{args.connections} duration={args.duration}s")
+    print_result("result", run_load(args.url, args.header, args.clients, args.connections, args.duration))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# scripts/precompress_static.py
+"""
+Write .gz (and .br when brotli is installed) siblings for compressible files under app/static.
+
+PrecompressedStaticFiles serves these instead of compressing on every request.
+Already-compressed formats (PNG, JPEG, ...) are skipped, as are outputs that
+would not be smaller than the original.
+
+Usage (from the thamer/ directory, e.g. during the image build):
+    python -m scripts.precompress_static
+    python -m scripts.precompress_static --directory app/static
+"""
+import argparse
+import gzip
+import mimetypes
+import sys
+from pathlib import Path
+
+from app.core.compression import brotli, is_compressible
+
+
+def write_if_smaller(path: Path, data: bytes, original_size: int) -> bool:
+    if len(data) >= original_size:
+        if path.exists():
+            path.unlink()
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default="app/static")
+    args = parser.parse_args()
+
+    for path in sorted(Path(args.directory).rglob("*")):
+        if not path.is_file() or path.suffix in (".gz", ".br"):
+            continue
+        content_type = mimetypes.guess_type(path.name)[0] or ""
+        if not is_compressible(content_type):
+            continue
+
+        data = path.read_bytes()
+        written = []
+        if write_if_smaller(path.with_name(path.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0), len(data)):
+            written.append("gz")
+        if brotli and write_if_smaller(path.with_name(path.name + ".br"), brotli.compress(data, quality=11), len(data)):
+            written.append("br")
+        print(f"{path}: {', '.join(written) or 'not worth compressing'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())